@@ -1,54 +1,127 @@
-import json
-from typing import List, Dict
-from pathlib import Path
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Optional
+import numpy as np
 from .models import (
-    RenovationPlan, AnalysisResult, Warning, RiskLevel,
-    WallType, RoomType, RenovationAction
+    Action, ActionData, AnalysisResult, ChangeWindowData, CombineRoomsData, DoorActionData,
+    RenovationAction, Room, RoomType, Warning, RiskLevel, WallActionData, WallType
 )
+from .compact import ROOM_TYPE_CODES, AnyRenovationPlan, CompactFloorPlan
+from .geometry import PlanGeometry
+from .rules_store import RulesSnapshot, RulesStore, get_rules_store
 
+# Минимальная площадь жилой комнаты, м²
+MIN_LIVING_AREA = 9
 
-class RenovationAnalyzer:
-    def __init__(self):
-        # Загрузка правил из JSON
-        rules_path = Path(__file__).parent.parent / "data" / "renovation_rules.json"
-        with open(rules_path, 'r', encoding='utf-8') as f:
-            self.rules = json.load(f)
+LIVING_CODE = ROOM_TYPE_CODES[RoomType.LIVING]
+KITCHEN_CODE = ROOM_TYPE_CODES[RoomType.KITCHEN]
+BATHROOM_CODE = ROOM_TYPE_CODES[RoomType.BATHROOM]
+TOILET_CODE = ROOM_TYPE_CODES[RoomType.TOILET]
 
-    def analyze(self, plan: RenovationPlan) -> AnalysisResult:
-        """Анализ плана перепланировки на соответствие законодательству"""
-        warnings = []
-        requires_approval = False
-        is_legal = True
-        recommendations = []
 
-        # Анализируем каждое действие
-        for action in plan.actions:
-            action_type = action.get('type')
-            action_data = action.get('data', {})
+def _has_gas_supply(plan: AnyRenovationPlan) -> bool:
+    floor_plan = plan.originalPlan
+    if isinstance(floor_plan, CompactFloorPlan):
+        return floor_plan.has_gas_supply
+    return floor_plan.hasGasSupply
 
-            if action_type == 'remove_wall':
-                wall_warnings = self._check_wall_removal(action_data, plan)
-                warnings.extend(wall_warnings)
 
-            elif action_type == 'move_kitchen':
-                kitchen_warnings = self._check_kitchen_relocation(action_data, plan)
-                warnings.extend(kitchen_warnings)
+# Проверка действия: данные действия, план и его геометрический индекс
+ActionChecker = Callable[[ActionData, AnyRenovationPlan, PlanGeometry], List[Warning]]
 
-            elif action_type == 'move_bathroom' or action_type == 'expand_bathroom':
-                bathroom_warnings = self._check_bathroom_relocation(action_data, plan)
-                warnings.extend(bathroom_warnings)
 
-            elif action_type == 'combine_rooms':
-                combine_warnings = self._check_room_combination(action_data, plan)
-                warnings.extend(combine_warnings)
+class RenovationAnalyzer:
+    def __init__(self, rules_store: Optional[RulesStore] = None):
+        # Правила из общего хранилища (перезагружаются при изменении файла)
+        self.rules_store = rules_store or get_rules_store()
+        self._pinned = threading.local()
+        # Проверки по типу действия (добавление стены и остекление балкона не проверяются)
+        self._action_checkers: Dict[RenovationAction, ActionChecker] = {
+            RenovationAction.REMOVE_WALL: self._check_wall_removal,
+            RenovationAction.MOVE_DOOR: self._check_door_relocation,
+            RenovationAction.MOVE_KITCHEN: self._check_kitchen_relocation,
+            RenovationAction.MOVE_BATHROOM: self._check_bathroom_relocation,
+            RenovationAction.EXPAND_BATHROOM: self._check_bathroom_relocation,
+            RenovationAction.COMBINE_ROOMS: self._check_room_combination,
+            RenovationAction.CHANGE_WINDOW: self._check_window_changes,
+        }
+
+    @property
+    def rules(self) -> dict:
+        """Правила зафиксированного снимка или текущей версии хранилища"""
+        return self.rules_snapshot().data
+
+    def rules_snapshot(self) -> RulesSnapshot:
+        snapshot = getattr(self._pinned, 'snapshot', None)
+        return snapshot if snapshot is not None else self.rules_store.snapshot()
+
+    @contextmanager
+    def pinned_rules(self) -> Iterator[RulesSnapshot]:
+        """
+        Фиксация одного снимка правил в текущем потоке
+
+        Все проверки внутри блока видят одну версию правил, даже если
+        файл перезагружается параллельно. Вложенные блоки используют
+        внешний снимок.
+        """
+        snapshot = getattr(self._pinned, 'snapshot', None)
+        if snapshot is not None:
+            yield snapshot
+            return
+        self._pinned.snapshot = snapshot = self.rules_store.snapshot()
+        try:
+            yield snapshot
+        finally:
+            self._pinned.snapshot = None
+
+    def analyze(self, plan: AnyRenovationPlan) -> AnalysisResult:
+        """Анализ плана перепланировки на соответствие законодательству"""
+        with self.pinned_rules():
+            # Компактное представление плана общее для всех проверок
+            geometry = PlanGeometry(plan.originalPlan)
+
+            # Анализируем каждое действие
+            warnings = self.check_actions(plan, geometry)
+
+            # Проверка общих требований
+            general_warnings = self._check_general_requirements(geometry.plan)
+            warnings.extend(general_warnings)
 
-            elif action_type == 'change_window':
-                window_warnings = self._check_window_changes(action_data, plan)
-                warnings.extend(window_warnings)
+            return self.build_result(plan, warnings)
+
+    def check_actions(self, plan: AnyRenovationPlan, geometry: Optional[PlanGeometry] = None) -> List[Warning]:
+        """Проверка всех действий плана с общим геометрическим индексом"""
+        warnings = []
+        if geometry is None:
+            geometry = PlanGeometry(plan.originalPlan)
+        for action in plan.actions:
+            warnings.extend(self.check_action(action, plan, geometry))
+        return warnings
 
-        # Проверка общих требований
-        general_warnings = self._check_general_requirements(plan)
-        warnings.extend(general_warnings)
+    def check_action(
+        self,
+        action: Action,
+        plan: AnyRenovationPlan,
+        geometry: Optional[PlanGeometry] = None
+    ) -> List[Warning]:
+        """
+        Проверка одного действия перепланировки
+
+        geometry - геометрический индекс плана; передается, чтобы не строить
+        его заново для каждого действия.
+        """
+        checker = self._action_checkers.get(action.type)
+        if checker is None:
+            return []
+        if geometry is None:
+            geometry = PlanGeometry(plan.originalPlan)
+        return checker(action.data, plan, geometry)
+
+    def build_result(self, plan: AnyRenovationPlan, warnings: List[Warning]) -> AnalysisResult:
+        """Итоговый результат анализа по собранным предупреждениям"""
+        requires_approval = False
+        is_legal = True
+        recommendations = []
 
         # Определяем требуется ли согласование
         for warning in warnings:
@@ -63,7 +136,7 @@ class RenovationAnalyzer:
             recommendations.append("Потребуется проект перепланировки от организации с допуском СРО")
             recommendations.append("После завершения работ необходим акт приемочной комиссии")
 
-        if plan.originalPlan.hasGasSupply:
+        if _has_gas_supply(plan):
             recommendations.append("При наличии газа обязательно согласование с газовой службой")
 
         # Оценка сроков и стоимости
@@ -79,22 +152,20 @@ class RenovationAnalyzer:
             estimatedCost=estimated_cost
         )
 
-    def _check_wall_removal(self, action_data: dict, plan: RenovationPlan) -> List[Warning]:
+    def _check_wall_removal(
+        self, action_data: WallActionData, plan: AnyRenovationPlan, geometry: PlanGeometry
+    ) -> List[Warning]:
         """Проверка демонтажа стен"""
         warnings = []
-        wall_id = action_data.get('wallId')
 
         # Находим стену в плане
-        wall = None
-        for w in plan.originalPlan.walls:
-            if w.id == wall_id:
-                wall = w
-                break
+        index = geometry.plan.find_wall(action_data.wallId)
 
-        if not wall:
+        if index < 0:
             return warnings
 
-        if wall.type == WallType.LOAD_BEARING:
+        wall_type = geometry.plan.wall_type(index)
+        if wall_type == WallType.LOAD_BEARING:
             rule = self.rules['rules']['loadBearingWalls']
             warnings.append(Warning(
                 level=RiskLevel.CRITICAL,
@@ -104,7 +175,7 @@ class RenovationAnalyzer:
                 recommendations=rule['requirements'],
                 actionRequired=True
             ))
-        elif wall.type == WallType.NON_LOAD_BEARING:
+        elif wall_type == WallType.NON_LOAD_BEARING:
             warnings.append(Warning(
                 level=RiskLevel.LOW,
                 title="Демонтаж ненесущей перегородки",
@@ -133,7 +204,45 @@ class RenovationAnalyzer:
 
         return warnings
 
-    def _check_kitchen_relocation(self, action_data: dict, plan: RenovationPlan) -> List[Warning]:
+    def _check_door_relocation(
+        self, action_data: DoorActionData, plan: AnyRenovationPlan, geometry: PlanGeometry
+    ) -> List[Warning]:
+        """
+        Проверка переноса или устройства дверного проема
+
+        Стена проема берется по wallId, а при его отсутствии - ближайшая
+        к точке (x, y) стена в пределах ее толщины.
+        """
+        warnings = []
+
+        index = geometry.plan.find_wall(action_data.wallId)
+        x, y = action_data.x, action_data.y
+        if index < 0 and x is not None and y is not None:
+            nearest = geometry.grid.nearest(x, y, max_distance=geometry.grid.max_thickness / 2)
+            if nearest is not None:
+                index = nearest[0]
+
+        if index >= 0 and geometry.plan.wall_type(index) == WallType.LOAD_BEARING:
+            rule = self.rules['rules']['loadBearingWalls']
+            warnings.append(Warning(
+                level=RiskLevel.HIGH,
+                title="Проем в несущей стене",
+                description=f"Новый дверной проем устраивается в несущей стене {geometry.plan.wall_ids[index]}",
+                law=rule['law'],
+                recommendations=[
+                    "Требуется проект с расчетом несущей способности стены",
+                    "Проем необходимо усилить металлоконструкциями",
+                    "Требуется согласование с проектной организацией - автором проекта дома",
+                    "В панельных домах устройство новых проемов часто запрещено"
+                ],
+                actionRequired=True
+            ))
+
+        return warnings
+
+    def _check_kitchen_relocation(
+        self, action_data: ActionData, plan: AnyRenovationPlan, geometry: PlanGeometry
+    ) -> List[Warning]:
         """Проверка переноса кухни"""
         warnings = []
         rule = self.rules['rules']['wetRooms']
@@ -152,7 +261,7 @@ class RenovationAnalyzer:
             actionRequired=True
         ))
 
-        if plan.originalPlan.hasGasSupply:
+        if _has_gas_supply(plan):
             gas_rule = self.rules['rules']['gasEquipment']
             warnings.append(Warning(
                 level=RiskLevel.CRITICAL,
@@ -165,7 +274,9 @@ class RenovationAnalyzer:
 
         return warnings
 
-    def _check_bathroom_relocation(self, action_data: dict, plan: RenovationPlan) -> List[Warning]:
+    def _check_bathroom_relocation(
+        self, action_data: ActionData, plan: AnyRenovationPlan, geometry: PlanGeometry
+    ) -> List[Warning]:
         """Проверка переноса/расширения санузла"""
         warnings = []
         rule = self.rules['rules']['wetRooms']
@@ -187,15 +298,17 @@ class RenovationAnalyzer:
 
         return warnings
 
-    def _check_room_combination(self, action_data: dict, plan: RenovationPlan) -> List[Warning]:
+    def _check_room_combination(
+        self, action_data: CombineRoomsData, plan: AnyRenovationPlan, geometry: PlanGeometry
+    ) -> List[Warning]:
         """Проверка объединения комнат"""
         warnings = []
 
-        room1_type = action_data.get('room1Type')
-        room2_type = action_data.get('room2Type')
+        room1_type = action_data.room1Type
+        room2_type = action_data.room2Type
 
         # Проверка объединения кухни с газом и жилой комнаты
-        if plan.originalPlan.hasGasSupply:
+        if _has_gas_supply(plan):
             if (room1_type == RoomType.KITCHEN and room2_type == RoomType.LIVING) or \
                (room2_type == RoomType.KITCHEN and room1_type == RoomType.LIVING):
                 gas_rule = self.rules['rules']['gasEquipment']
@@ -232,12 +345,14 @@ class RenovationAnalyzer:
 
         return warnings
 
-    def _check_window_changes(self, action_data: dict, plan: RenovationPlan) -> List[Warning]:
+    def _check_window_changes(
+        self, action_data: ChangeWindowData, plan: AnyRenovationPlan, geometry: PlanGeometry
+    ) -> List[Warning]:
         """Проверка изменения окон"""
         warnings = []
         rule = self.rules['rules']['windows']
 
-        if action_data.get('changeSize', False):
+        if action_data.changeSize:
             warnings.append(Warning(
                 level=RiskLevel.HIGH,
                 title="Изменение размера оконного проема",
@@ -254,20 +369,28 @@ class RenovationAnalyzer:
 
         return warnings
 
-    def _check_general_requirements(self, plan: RenovationPlan) -> List[Warning]:
-        """Проверка общих требований"""
-        warnings = []
+    def _check_general_requirements(self, plan: CompactFloorPlan) -> List[Warning]:
+        """Проверка общих требований по колонкам помещений"""
+        rooms = plan.rooms
+        types = rooms['type']
 
         # Проверка вентиляции
-        vent_rule = self.rules['rules']['ventilation']
-        has_bathroom_vent = False
-        has_kitchen_vent = False
+        has_bathroom_vent = bool(np.any(rooms['ventilation'] & ((types == BATHROOM_CODE) | (types == TOILET_CODE))))
+        has_kitchen_vent = bool(np.any(rooms['ventilation'] & (types == KITCHEN_CODE)))
 
-        for room in plan.originalPlan.rooms:
-            if room.type in [RoomType.BATHROOM, RoomType.TOILET]:
-                has_bathroom_vent = has_bathroom_vent or room.hasVentilation
-            if room.type == RoomType.KITCHEN:
-                has_kitchen_vent = has_kitchen_vent or room.hasVentilation
+        warnings = self.check_ventilation(has_bathroom_vent, has_kitchen_vent)
+
+        # Проверка жилых комнат: модели создаются только для нарушающих помещений
+        failing = (types == LIVING_CODE) & ((rooms['area'] < MIN_LIVING_AREA) | ~rooms['light'])
+        for index in np.flatnonzero(failing).tolist():
+            warnings.extend(self.check_room(plan.room(index)))
+
+        return warnings
+
+    def check_ventilation(self, has_bathroom_vent: bool, has_kitchen_vent: bool) -> List[Warning]:
+        """Проверка наличия вентиляции в санузле и на кухне"""
+        warnings = []
+        vent_rule = self.rules['rules']['ventilation']
 
         if not has_bathroom_vent or not has_kitchen_vent:
             warnings.append(Warning(
@@ -279,36 +402,40 @@ class RenovationAnalyzer:
                 actionRequired=True
             ))
 
-        # Проверка жилых комнат
+        return warnings
+
+    def check_room(self, room: Room) -> List[Warning]:
+        """Проверка требований к отдельному помещению"""
+        warnings = []
         living_rule = self.rules['rules']['livingSpace']
-        for room in plan.originalPlan.rooms:
-            if room.type == RoomType.LIVING:
-                if room.area < 9:
-                    warnings.append(Warning(
-                        level=RiskLevel.MEDIUM,
-                        title="Площадь жилой комнаты",
-                        description=f"Комната площадью {room.area} м² меньше минимальной нормы",
-                        law=living_rule['law'],
-                        recommendations=[
-                            "Минимальная площадь жилой комнаты - 9 м²",
-                            "Минимальная площадь спальни - 8 м²",
-                            "Комнаты меньшей площади могут не считаться жилыми"
-                        ],
-                        actionRequired=False
-                    ))
-
-                if not room.hasNaturalLight:
-                    warnings.append(Warning(
-                        level=RiskLevel.CRITICAL,
-                        title="Естественное освещение",
-                        description="Жилая комната должна иметь естественное освещение (окно)",
-                        law=living_rule['law'],
-                        recommendations=[
-                            "Обязательно окно в жилой комнате",
-                            "Помещение без окна не может быть жилой комнатой"
-                        ],
-                        actionRequired=True
-                    ))
+
+        if room.type == RoomType.LIVING:
+            if room.area < MIN_LIVING_AREA:
+                warnings.append(Warning(
+                    level=RiskLevel.MEDIUM,
+                    title="Площадь жилой комнаты",
+                    description=f"Комната площадью {room.area} м² меньше минимальной нормы",
+                    law=living_rule['law'],
+                    recommendations=[
+                        "Минимальная площадь жилой комнаты - 9 м²",
+                        "Минимальная площадь спальни - 8 м²",
+                        "Комнаты меньшей площади могут не считаться жилыми"
+                    ],
+                    actionRequired=False
+                ))
+
+            if not room.hasNaturalLight:
+                warnings.append(Warning(
+                    level=RiskLevel.CRITICAL,
+                    title="Естественное освещение",
+                    description="Жилая комната должна иметь естественное освещение (окно)",
+                    law=living_rule['law'],
+                    recommendations=[
+                        "Обязательно окно в жилой комнате",
+                        "Помещение без окна не может быть жилой комнатой"
+                    ],
+                    actionRequired=True
+                ))
 
         return warnings
 
@@ -324,7 +451,7 @@ class RenovationAnalyzer:
         else:
             return "1-3 месяца (стандартная процедура)"
 
-    def _estimate_costs(self, plan: RenovationPlan, warnings: List[Warning]) -> str:
+    def _estimate_costs(self, plan: AnyRenovationPlan, warnings: List[Warning]) -> str:
         """Оценка стоимости согласования"""
         requires_approval = any(w.level in [RiskLevel.CRITICAL, RiskLevel.HIGH] for w in warnings)
 
@@ -0,0 +1,182 @@
+"""
+Пакетный анализ планов перепланировки в пуле рабочих процессов
+"""
+
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Deque, List, Optional, Union
+
+from pydantic import ValidationError
+
+from .analyzer import RenovationAnalyzer
+from .binary_plan import validate_plan
+from .columnar import analyze_many
+from .compact import AnyRenovationPlan
+from .models import BatchAnalysisItem, RenovationPlan
+
+logger = logging.getLogger(__name__)
+
+# Анализатор рабочего процесса (создается один раз на процесс)
+_worker_analyzer: Optional[RenovationAnalyzer] = None
+
+
+def _init_worker() -> None:
+    """Инициализация рабочего процесса: загрузка правил один раз"""
+    global _worker_analyzer
+    _worker_analyzer = RenovationAnalyzer()
+
+
+def _get_worker_analyzer() -> RenovationAnalyzer:
+    if _worker_analyzer is None:
+        _init_worker()
+    return _worker_analyzer
+
+
+def _format_validation_error(exc: ValidationError) -> List[str]:
+    """Преобразование ошибок валидации в список строк"""
+    errors = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error.get("loc", ()))
+        errors.append(f"{location}: {error.get('msg')}" if location else error.get("msg", ""))
+    return errors
+
+
+def _validate_item(index: int, raw_plan: Any) -> Union[AnyRenovationPlan, BatchAnalysisItem]:
+    """
+    План (из объекта или JSON-строки) или элемент результата с ошибками валидации
+
+    Объекты из MessagePack могут содержать стены колонками (validate_plan).
+    """
+    try:
+        if isinstance(raw_plan, (bytes, str)):
+            return RenovationPlan.model_validate_json(raw_plan)
+        return validate_plan(raw_plan)
+    except ValidationError as e:
+        return BatchAnalysisItem(index=index, errors=_format_validation_error(e))
+
+
+def analyze_item(analyzer: RenovationAnalyzer, index: int, raw_plan: Any) -> BatchAnalysisItem:
+    """Валидация и анализ одного плана; ошибки остаются внутри элемента"""
+    plan = _validate_item(index, raw_plan)
+    if isinstance(plan, BatchAnalysisItem):
+        return plan
+
+    try:
+        return BatchAnalysisItem(index=index, result=analyzer.analyze(plan))
+    except Exception as e:
+        logger.error(f"Error analyzing plan #{index}: {e}", exc_info=True)
+        return BatchAnalysisItem(index=index, errors=[str(e)])
+
+
+def _analyze_chunk(start: int, raw_plans: List[Any]) -> List[BatchAnalysisItem]:
+    """
+    Анализ последовательного фрагмента пакета (выполняется в рабочем процессе)
+
+    Общие требования проверяются в колоночном режиме для всего фрагмента;
+    при ошибке фрагмент анализируется поштучно, чтобы ошибка осталась
+    в своем элементе.
+    """
+    analyzer = _get_worker_analyzer()
+    items: List[Union[AnyRenovationPlan, BatchAnalysisItem]] = [
+        _validate_item(start + offset, raw) for offset, raw in enumerate(raw_plans)
+    ]
+    valid = [
+        (offset, item)
+        for offset, item in enumerate(items)
+        if not isinstance(item, BatchAnalysisItem)
+    ]
+
+    try:
+        results = analyze_many(analyzer, [plan for _, plan in valid])
+    except Exception:
+        return [analyze_item(analyzer, start + offset, raw) for offset, raw in enumerate(raw_plans)]
+
+    for (offset, _), result in zip(valid, results):
+        items[offset] = BatchAnalysisItem(index=start + offset, result=result)
+    return items
+
+
+class BatchAnalyzer:
+    """Распределение анализа пакета планов по пулу процессов"""
+
+    def __init__(self, workers: int, chunk_size: int = 50):
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> Optional[Executor]:
+        """Ленивое создание пула (None - анализ в потоке текущего процесса)"""
+        if self.workers == 1:
+            return None
+        if self._pool is None:
+            logger.info(f"Starting batch analysis pool with {self.workers} workers")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._pool
+
+    async def analyze(self, raw_plans: List[Any]) -> List[BatchAnalysisItem]:
+        """Анализ пакета; результаты возвращаются в порядке входных планов"""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        tasks = [
+            loop.run_in_executor(
+                pool, _analyze_chunk, start, raw_plans[start : start + self.chunk_size]
+            )
+            for start in range(0, len(raw_plans), self.chunk_size)
+        ]
+        chunks = await asyncio.gather(*tasks)
+        return [item for chunk in chunks for item in chunk]
+
+    async def analyze_stream(
+        self, lines: AsyncIterable[bytes], max_in_flight: int, chunk_size: Optional[int] = None
+    ) -> AsyncIterator[BatchAnalysisItem]:
+        """
+        Потоковый анализ планов, поступающих строками JSON
+
+        Строки группируются во фрагменты по chunk_size (по умолчанию -
+        размер фрагмента пакета); одновременно в работе
+        не более max_in_flight фрагментов, поэтому чтение входа
+        приостанавливается, пока не будут отданы готовые результаты.
+        Результаты выдаются в порядке входных строк.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        chunk_size = max(1, chunk_size or self.chunk_size)
+        in_flight: Deque[asyncio.Future] = deque()
+        chunk: List[bytes] = []
+        start = 0
+
+        def submit() -> None:
+            nonlocal chunk, start
+            in_flight.append(loop.run_in_executor(pool, _analyze_chunk, start, chunk))
+            start += len(chunk)
+            chunk = []
+
+        try:
+            async for line in lines:
+                chunk.append(line)
+                if len(chunk) >= chunk_size:
+                    submit()
+                    while len(in_flight) >= max(1, max_in_flight):
+                        for item in await in_flight.popleft():
+                            yield item
+                # Готовые фрагменты отдаются сразу, не дожидаясь заполнения очереди
+                while in_flight and in_flight[0].done():
+                    for item in in_flight.popleft().result():
+                        yield item
+            if chunk:
+                submit()
+            while in_flight:
+                for item in await in_flight.popleft():
+                    yield item
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """Остановка пула рабочих процессов"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
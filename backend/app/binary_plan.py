@@ -0,0 +1,197 @@
+"""
+Бинарный формат плана перепланировки (MessagePack)
+
+Структура совпадает с JSON (RenovationPlan), но стены исходного плана
+можно передать колонками: список id, список типов и упакованные массивы
+float64 (little-endian) координат и толщин. Такие стены не превращаются
+в модели pydantic: массивы читаются через np.frombuffer и копируются
+один раз сразу в компактный план анализатора (CompactFloorPlan).
+
+Формат выбирается заголовком Content-Type (application/msgpack); тело
+с другим типом разбирается как JSON.
+"""
+
+from typing import Any, List, Literal, Optional
+
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError, model_validator
+
+from .compact import (
+    WALL_DTYPE,
+    WALL_TYPE_CODES,
+    AnyRenovationPlan,
+    CompactFloorPlan,
+    CompactRenovationPlan,
+)
+from .models import BatchAnalysisRequest, FloorPlan, RenovationPlan, WallType
+
+try:
+    import msgpack
+except ImportError:  # msgpack - необязательная зависимость
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+# Байт на стену в упакованных колонках
+COORDS_ITEM_SIZE = 4 * 8
+THICKNESS_ITEM_SIZE = 8
+DEFAULT_THICKNESS = 200
+
+# Значения WallType: проверка Literal выполняется в pydantic-core и для
+# десятков тысяч стен на порядок быстрее проверки Enum
+WallTypeValue = Literal[tuple(wall_type.value for wall_type in WallType)]
+
+
+class BinaryFormatError(ValueError):
+    """Тело запроса не является корректным MessagePack"""
+
+
+class WallColumns(BaseModel):
+    """Стены плана колонками (coords - x1, y1, x2, y2 каждой стены подряд)"""
+
+    id: List[str]
+    type: List[WallTypeValue]
+    coords: bytes
+    thickness: Optional[bytes] = None
+
+    @model_validator(mode="after")
+    def check_sizes(self) -> "WallColumns":
+        count = len(self.id)
+        if len(self.type) != count:
+            raise ValueError(f"type: ожидается {count} значений, получено {len(self.type)}")
+        if len(self.coords) != count * COORDS_ITEM_SIZE:
+            raise ValueError(
+                f"coords: ожидается {count * COORDS_ITEM_SIZE} байт, получено {len(self.coords)}"
+            )
+        expected = count * THICKNESS_ITEM_SIZE
+        if self.thickness is not None and len(self.thickness) != expected:
+            raise ValueError(
+                f"thickness: ожидается {expected} байт, получено {len(self.thickness)}"
+            )
+        # NaN и бесконечности не проходят в геометрическую сетку
+        for name in ("coords", "thickness"):
+            packed = getattr(self, name)
+            if packed is not None and not np.isfinite(np.frombuffer(packed, dtype="<f8")).all():
+                raise ValueError(f"{name}: значения должны быть конечными числами")
+        return self
+
+    def to_array(self) -> np.ndarray:
+        """Массив WALL_DTYPE (единственная копия упакованных данных)"""
+        coords = np.frombuffer(self.coords, dtype="<f8").reshape(-1, 4)
+        walls = np.empty(len(self.id), dtype=WALL_DTYPE)
+        for column, name in enumerate(("x1", "y1", "x2", "y2")):
+            walls[name] = coords[:, column]
+        if self.thickness is None:
+            walls["thickness"] = DEFAULT_THICKNESS
+        else:
+            walls["thickness"] = np.frombuffer(self.thickness, dtype="<f8")
+        codes = WALL_TYPE_CODES
+        walls["type"] = [codes[wall_type] for wall_type in self.type]
+        return walls
+
+
+class ColumnarFloorPlan(FloorPlan):
+    walls: WallColumns
+
+
+class ColumnarRenovationPlan(RenovationPlan):
+    originalPlan: ColumnarFloorPlan
+
+    def to_compact(self) -> CompactRenovationPlan:
+        floor_plan = self.originalPlan
+        compact = CompactFloorPlan.from_walls(
+            floor_plan, floor_plan.walls.id, floor_plan.walls.to_array()
+        )
+        return CompactRenovationPlan(compact, self.actions, self.description)
+
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    return media_type in MSGPACK_MEDIA_TYPES
+
+
+def unpack(body: bytes) -> Any:
+    """Разбор MessagePack (bin -> bytes, str -> str)"""
+    try:
+        return msgpack.unpackb(body, raw=False)
+    except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+        raise BinaryFormatError(f"Некорректный MessagePack: {e or type(e).__name__}") from e
+
+
+def validate_plan(raw: Any) -> AnyRenovationPlan:
+    """
+    План из разобранного MessagePack
+
+    Стены колонками дают план с компактным исходным планом, список стен -
+    обычную модель RenovationPlan.
+    """
+    floor_plan = raw.get("originalPlan") if isinstance(raw, dict) else None
+    if isinstance(floor_plan, dict) and isinstance(floor_plan.get("walls"), dict):
+        return ColumnarRenovationPlan.model_validate(raw).to_compact()
+    return RenovationPlan.model_validate(raw)
+
+
+def _request_validation_error(exc: ValidationError, binary: bool = False) -> RequestValidationError:
+    """
+    Ошибка тела запроса в формате ответа 422 FastAPI
+
+    Для MessagePack входные значения не возвращаются: они могут содержать
+    упакованные байты колонок.
+    """
+    errors = exc.errors(include_input=not binary)
+    return RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in errors])
+
+
+async def _unpack_body(request: Request) -> Any:
+    if msgpack is None:
+        raise HTTPException(
+            status_code=415, detail="Формат MessagePack не поддерживается: не установлен msgpack"
+        )
+    try:
+        return unpack(await request.body())
+    except BinaryFormatError as e:
+        raise RequestValidationError(
+            [{"type": "msgpack_invalid", "loc": ("body",), "msg": str(e)}]
+        ) from e
+
+
+async def read_plan(request: Request) -> AnyRenovationPlan:
+    """План из тела запроса (JSON или MessagePack по Content-Type)"""
+    binary = is_msgpack(request.headers.get("content-type"))
+    try:
+        if binary:
+            return validate_plan(await _unpack_body(request))
+        return RenovationPlan.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise _request_validation_error(e, binary) from e
+
+
+async def read_batch(request: Request) -> BatchAnalysisRequest:
+    """
+    Пакет планов из тела запроса (JSON или MessagePack по Content-Type)
+
+    Планы пакета проверяются позже, в рабочих процессах (validate_plan).
+    """
+    binary = is_msgpack(request.headers.get("content-type"))
+    try:
+        if binary:
+            return BatchAnalysisRequest.model_validate(await _unpack_body(request))
+        return BatchAnalysisRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise _request_validation_error(e, binary) from e
+
+
+def request_body(model: type) -> dict:
+    """Описание тела запроса для OpenAPI: JSON-схема модели и MessagePack"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": model.model_json_schema()},
+                MSGPACK_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    }
@@ -0,0 +1,184 @@
+"""
+Анализ подъезда целиком: размещение мокрых зон над жилыми комнатами
+
+Для каждого этажа заранее строится индекс контуров жилых комнат, поэтому
+каждая мокрая зона сравнивается только с комнатами нижнего этажа, чьи
+габариты пересекаются с ее габаритами.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+from .analyzer import RenovationAnalyzer
+from .geometry import Polygon, polygon_area, polygon_intersection_area
+from .models import (
+    BuildingAnalysisResult,
+    BuildingPlan,
+    FloorPlan,
+    RiskLevel,
+    Room,
+    RoomType,
+    StackingOverlap,
+    Warning,
+)
+
+WET_ROOM_TYPES = (RoomType.KITCHEN, RoomType.BATHROOM, RoomType.TOILET)
+
+ROOM_TYPE_NAMES = {
+    RoomType.KITCHEN: "Кухня",
+    RoomType.BATHROOM: "Ванная комната",
+    RoomType.TOILET: "Туалет",
+}
+
+# Минимальная доля площади мокрой зоны, учитываемая как перекрытие
+MIN_OVERLAP_RATIO = 0.01
+
+BBox = Tuple[float, float, float, float]
+
+
+def _polygon(room: Room) -> Optional[Polygon]:
+    if not room.polygon or len(room.polygon) < 3:
+        return None
+    return [(point.x, point.y) for point in room.polygon]
+
+
+def _bbox(polygon: Polygon) -> BBox:
+    xs = [x for x, _ in polygon]
+    ys = [y for _, y in polygon]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class FloorIndex:
+    """Индекс контуров жилых комнат одного этажа (равномерная сетка габаритов)"""
+
+    def __init__(self, plan: FloorPlan):
+        self.rooms: List[Tuple[Room, Polygon, BBox]] = []
+        for room in plan.rooms:
+            polygon = _polygon(room)
+            if room.type == RoomType.LIVING and polygon is not None:
+                self.rooms.append((room, polygon, _bbox(polygon)))
+
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        if not self.rooms:
+            self.cell_size = 1.0
+            return
+
+        min_x = min(bbox[0] for _, _, bbox in self.rooms)
+        min_y = min(bbox[1] for _, _, bbox in self.rooms)
+        max_x = max(bbox[2] for _, _, bbox in self.rooms)
+        max_y = max(bbox[3] for _, _, bbox in self.rooms)
+        extent = max(max_x - min_x, max_y - min_y, 1.0)
+        self.cell_size = extent / max(1, math.ceil(math.sqrt(len(self.rooms))))
+        # Ячейки, в которых есть комнаты: запрос не выходит за эти пределы
+        self._bounds = self._cell_range((min_x, min_y, max_x, max_y))
+
+        for index, (_, _, bbox) in enumerate(self.rooms):
+            for cell in self._cells_for(*self._cell_range(bbox)):
+                self._cells.setdefault(cell, []).append(index)
+
+    def _cell_range(self, bbox: BBox) -> Tuple[int, int, int, int]:
+        col1, row1 = int(bbox[0] // self.cell_size), int(bbox[1] // self.cell_size)
+        col2, row2 = int(bbox[2] // self.cell_size), int(bbox[3] // self.cell_size)
+        return col1, row1, col2, row2
+
+    def _cells_for(self, col1: int, row1: int, col2: int, row2: int):
+        for col in range(col1, col2 + 1):
+            for row in range(row1, row2 + 1):
+                yield col, row
+
+    def candidates(self, bbox: BBox) -> List[Tuple[Room, Polygon]]:
+        """Жилые комнаты, чьи габариты пересекаются с bbox"""
+        if not self.rooms:
+            return []
+        # Габарит большой мокрой зоны обрезается по ячейкам индекса: иначе
+        # перебор ячеек растет с ее площадью, а не с числом комнат
+        col1, row1, col2, row2 = self._cell_range(bbox)
+        min_col, min_row, max_col, max_row = self._bounds
+        found = set()
+        for cell in self._cells_for(
+            max(col1, min_col), max(row1, min_row), min(col2, max_col), min(row2, max_row)
+        ):
+            found.update(self._cells.get(cell, ()))
+
+        result = []
+        for index in sorted(found):
+            room, polygon, room_bbox = self.rooms[index]
+            if (
+                room_bbox[0] < bbox[2]
+                and bbox[0] < room_bbox[2]
+                and room_bbox[1] < bbox[3]
+                and bbox[1] < room_bbox[3]
+            ):
+                result.append((room, polygon))
+        return result
+
+
+class BuildingAnalyzer:
+    """Поиск мокрых зон над жилыми комнатами нижних этажей"""
+
+    def __init__(self, analyzer: RenovationAnalyzer, min_overlap_ratio: float = MIN_OVERLAP_RATIO):
+        self.analyzer = analyzer
+        self.min_overlap_ratio = min_overlap_ratio
+
+    def find_overlaps(self, building: BuildingPlan) -> List[StackingOverlap]:
+        """Перекрытия мокрых зон и жилых комнат соседнего нижнего этажа"""
+        floors: Dict[int, FloorPlan] = {}
+        for plan in building.floors:
+            if plan.floor in floors:
+                raise ValueError(f"Duplicate floor {plan.floor}")
+            floors[plan.floor] = plan
+
+        indexes = {number: FloorIndex(plan) for number, plan in floors.items()}
+        overlaps = []
+        for number in sorted(floors):
+            below = indexes.get(number - 1)
+            if below is None or not below.rooms:
+                continue
+            for room in floors[number].rooms:
+                polygon = _polygon(room)
+                if room.type not in WET_ROOM_TYPES or polygon is None:
+                    continue
+                min_area = polygon_area(polygon) * self.min_overlap_ratio
+                for below_room, below_polygon in below.candidates(_bbox(polygon)):
+                    area = polygon_intersection_area(polygon, below_polygon)
+                    if area > min_area:
+                        overlaps.append(
+                            StackingOverlap(
+                                floor=number,
+                                roomId=room.id,
+                                roomType=room.type,
+                                belowFloor=number - 1,
+                                belowRoomId=below_room.id,
+                                overlapArea=round(area, 3),
+                            )
+                        )
+        return overlaps
+
+    def analyze(self, building: BuildingPlan) -> BuildingAnalysisResult:
+        """Анализ размещения мокрых зон по всем этажам подъезда"""
+        overlaps = self.find_overlaps(building)
+        rule = self.analyzer.rules["rules"]["wetRooms"]
+
+        warnings = [
+            Warning(
+                level=RiskLevel.CRITICAL,
+                title="Мокрая зона над жилой комнатой",
+                description=(
+                    f"{ROOM_TYPE_NAMES[overlap.roomType]} ({overlap.roomId}, этаж {overlap.floor}) "
+                    f"расположена над жилой комнатой {overlap.belowRoomId} "
+                    f"(этаж {overlap.belowFloor})"
+                ),
+                law=rule["law"],
+                recommendations=rule["requirements"],
+                actionRequired=False,
+            )
+            for overlap in overlaps
+        ]
+
+        return BuildingAnalysisResult(
+            isLegal=not warnings,
+            requiresApproval=bool(warnings),
+            warnings=warnings,
+            overlaps=overlaps,
+            floorsAnalyzed=len(building.floors),
+        )
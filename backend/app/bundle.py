@@ -0,0 +1,63 @@
+"""
+Потоковая сборка ZIP-архива с документами
+
+Архив пишется в поток без перемотки: каждый файл записывается с
+дескриптором данных (размер и CRC после содержимого), поэтому байты
+файла отдаются клиенту сразу после его сжатия. В памяти находится только
+текущий файл (или фрагмент файла с диска), оглавление архива отправляется
+последним.
+"""
+
+import time
+import zipfile
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Tuple, Union
+
+from .rendering import CHUNK_SIZE
+
+ZIP_MEDIA_TYPE = "application/zip"
+
+
+class _ChunkSink:
+    """Файлоподобный приемник без tell/seek: накапливает байты до выдачи"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def stream_zip(
+    members: AsyncIterable[Tuple[str, Union[str, BinaryIO]]],
+) -> AsyncIterator[bytes]:
+    """ZIP из пар (имя файла, текст или открытый файл) по мере их поступления
+
+    Текст отдается одним фрагментом, файл читается и отдается фрагментами
+    по CHUNK_SIZE байт и закрывается после записи.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        async for name, content in members:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            if isinstance(content, str):
+                archive.writestr(info, content.encode("utf-8"))
+                yield sink.drain()
+                continue
+            with content, archive.open(info, mode="w") as member:
+                while chunk := content.read(CHUNK_SIZE):
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,216 @@
+"""
+Кэширование результатов анализа в памяти процесса
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from .compact import AnyRenovationPlan, CompactRenovationPlan
+from .models import AnalysisResult
+
+# Точность нормализации чисел с плавающей точкой в ключе кэша
+FLOAT_PRECISION = 6
+
+
+def _normalize(value: Any) -> Any:
+    """Приведение значения к каноническому виду (целые float -> int, округление)"""
+    if isinstance(value, float):
+        value = round(value, FLOAT_PRECISION)
+        if value.is_integer():
+            return int(value)
+        return value
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _canonical_json(value: Any) -> bytes:
+    return json.dumps(
+        _normalize(value), sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _array_bytes(array: np.ndarray) -> bytes:
+    """Байты массива по колонкам; числа с плавающей точкой округлены как в _normalize"""
+    if array.dtype.names is None:
+        columns = [array]
+    else:
+        columns = [array[name] for name in array.dtype.names]
+    parts = []
+    for column in columns:
+        if column.dtype.kind == "f":
+            # + 0.0 приводит -0.0 к 0.0
+            column = np.round(column, FLOAT_PRECISION) + 0.0
+        parts.append(np.ascontiguousarray(column).tobytes())
+    return b"".join(parts)
+
+
+def _compact_fingerprint(plan: CompactRenovationPlan) -> str:
+    """Хэш плана с компактным исходным планом: массивы хэшируются целиком, без моделей"""
+    floor_plan = plan.originalPlan
+    digest = hashlib.sha256(b"compact:")
+    digest.update(
+        _canonical_json(
+            {
+                "wallIds": floor_plan.wall_ids,
+                "doorIds": floor_plan.doors.ids,
+                "doorWallIds": floor_plan.doors.missing_wall_ids,
+                "windowIds": floor_plan.windows.ids,
+                "windowWallIds": floor_plan.windows.missing_wall_ids,
+                "roomIds": floor_plan.room_ids,
+                "hasGasSupply": floor_plan.has_gas_supply,
+                "floor": floor_plan.floor,
+                "totalFloors": floor_plan.total_floors,
+                "buildingType": floor_plan.building_type,
+                "actions": [action.model_dump(mode="json") for action in plan.actions],
+                "description": plan.description,
+            }
+        )
+    )
+    for array in (
+        floor_plan.walls,
+        floor_plan.doors.data,
+        floor_plan.windows.data,
+        floor_plan.rooms,
+        floor_plan.polygon_points,
+    ):
+        digest.update(_array_bytes(array))
+    return digest.hexdigest()
+
+
+def plan_fingerprint(plan: AnyRenovationPlan) -> str:
+    """Канонический хэш плана: сортированные ключи и нормализованные числа"""
+    if isinstance(plan, CompactRenovationPlan):
+        return _compact_fingerprint(plan)
+    return hashlib.sha256(_canonical_json(plan.model_dump(mode="json"))).hexdigest()
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Дешевая подпись файла для обнаружения изменений (inode, размер, mtime)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш с ограничением размера и временем жизни записей"""
+
+    def __init__(
+        self, maxsize: int, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Получить значение (None при промахе или истекшем сроке жизни)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранить значение, вытесняя самые давние записи"""
+        if self.maxsize <= 0:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> bool:
+        """Удалить запись; True, если она была в кэше"""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Очистить кэш (счетчики сохраняются)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов для подбора размера кэша"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class AnalysisCache(LRUCache):
+    """
+    Кэш результатов анализа по каноническому хэшу плана
+
+    Кэш автоматически сбрасывается при изменении версии правил,
+    которую возвращает функция rules_version.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float],
+        rules_version: Callable[[], Hashable],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(maxsize, ttl, clock)
+        self._rules_version = rules_version
+        self._current_version = rules_version()
+        self.invalidations = 0
+
+    def _check_rules(self) -> Hashable:
+        version = self._rules_version()
+        if version != self._current_version:
+            self.clear()
+            self._current_version = version
+            self.invalidations += 1
+        return version
+
+    def get_result(self, plan: AnyRenovationPlan) -> Tuple[Hashable, Optional[AnalysisResult]]:
+        """
+        Ключ плана и закэшированный результат (если есть)
+
+        Ключ включает версию правил, поэтому результат, посчитанный
+        по старым правилам, не попадет в кэш после их изменения.
+        """
+        key = (self._check_rules(), plan_fingerprint(plan))
+        return key, self.get(key)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["invalidations"] = self.invalidations
+        return stats
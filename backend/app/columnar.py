@@ -0,0 +1,106 @@
+"""
+Колоночный режим проверки общих требований для большого числа планов
+
+Атрибуты помещений из многих планов упаковываются в массивы NumPy, правила
+вентиляции, минимальной площади и естественного освещения вычисляются
+векторными масками, а предупреждения создаются только для строк,
+не прошедших проверку. Результат совпадает с поштучным анализом.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+from .analyzer import MIN_LIVING_AREA, RenovationAnalyzer
+from .compact import ROOM_TYPE_CODES, AnyRenovationPlan, CompactFloorPlan
+from .models import AnalysisResult, FloorPlan, Room, RoomType, Warning
+
+LIVING = ROOM_TYPE_CODES[RoomType.LIVING]
+KITCHEN = ROOM_TYPE_CODES[RoomType.KITCHEN]
+BATHROOMS = [ROOM_TYPE_CODES[RoomType.BATHROOM], ROOM_TYPE_CODES[RoomType.TOILET]]
+
+ROOM_DTYPE = np.dtype(
+    [("type", np.int8), ("area", np.float64), ("ventilation", bool), ("light", bool)]
+)
+
+
+class RoomColumns:
+    """Помещения нескольких планов в колоночном представлении"""
+
+    def __init__(self, floor_plans: Sequence[FloorPlan]):
+        self.plan_count = len(floor_plans)
+        self.rooms: List[Room] = [room for plan in floor_plans for room in plan.rooms]
+
+        self.plan_index = np.repeat(
+            np.arange(self.plan_count, dtype=np.int32), [len(plan.rooms) for plan in floor_plans]
+        )
+        # Один проход по помещениям: коды типов, площади и флаги
+        codes = ROOM_TYPE_CODES
+        packed = np.array(
+            [(codes[r.type], r.area, r.hasVentilation, r.hasNaturalLight) for r in self.rooms],
+            dtype=ROOM_DTYPE,
+        )
+        self.type_code = packed["type"]
+        self.area = packed["area"]
+        self.has_ventilation = packed["ventilation"]
+        self.has_natural_light = packed["light"]
+
+    def plans_with(self, mask: np.ndarray) -> np.ndarray:
+        """Флаг для каждого плана: есть ли в нем строка, удовлетворяющая маске"""
+        flags = np.zeros(self.plan_count, dtype=bool)
+        flags[self.plan_index[mask]] = True
+        return flags
+
+
+def check_general_requirements_columnar(
+    analyzer: RenovationAnalyzer, floor_plans: Sequence[FloorPlan]
+) -> List[List[Warning]]:
+    """Общие требования для каждого плана (как RenovationAnalyzer._check_general_requirements)"""
+    columns = RoomColumns(floor_plans)
+    warnings: List[List[Warning]] = [[] for _ in range(columns.plan_count)]
+
+    # Вентиляция: хотя бы один санузел и одна кухня с вентиляцией в плане
+    is_bathroom = np.isin(columns.type_code, BATHROOMS)
+    is_kitchen = columns.type_code == KITCHEN
+    bathroom_vent = columns.plans_with(is_bathroom & columns.has_ventilation)
+    kitchen_vent = columns.plans_with(is_kitchen & columns.has_ventilation)
+    for plan_index in np.flatnonzero(~(bathroom_vent & kitchen_vent)):
+        warnings[plan_index].extend(
+            analyzer.check_ventilation(
+                bool(bathroom_vent[plan_index]), bool(kitchen_vent[plan_index])
+            )
+        )
+
+    # Жилые комнаты: площадь и естественное освещение
+    is_living = columns.type_code == LIVING
+    failing = is_living & ((columns.area < MIN_LIVING_AREA) | ~columns.has_natural_light)
+    for row in np.flatnonzero(failing):
+        warnings[columns.plan_index[row]].extend(analyzer.check_room(columns.rooms[row]))
+
+    return warnings
+
+
+def analyze_many(
+    analyzer: RenovationAnalyzer, plans: Sequence[AnyRenovationPlan]
+) -> List[AnalysisResult]:
+    """
+    Анализ набора планов с колоночной проверкой общих требований
+
+    Планы с компактным исходным планом (бинарный формат) уже хранят
+    помещения колонками и проверяются по отдельности.
+    """
+    with analyzer.pinned_rules():
+        model_plans = [
+            plan.originalPlan for plan in plans if isinstance(plan.originalPlan, FloorPlan)
+        ]
+        general = iter(check_general_requirements_columnar(analyzer, model_plans))
+
+        results = []
+        for plan in plans:
+            warnings = analyzer.check_actions(plan)
+            if isinstance(plan.originalPlan, CompactFloorPlan):
+                warnings.extend(analyzer._check_general_requirements(plan.originalPlan))
+            else:
+                warnings.extend(next(general))
+            results.append(analyzer.build_result(plan, warnings))
+        return results
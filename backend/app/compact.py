@@ -0,0 +1,317 @@
+"""
+Компактное представление плана этажа (структура массивов)
+
+Вместо списков моделей pydantic стены, проемы и помещения хранятся
+в типизированных массивах NumPy: координаты и толщины стен, коды типов,
+площади и флаги помещений. Идентификаторы хранятся списками строк,
+а отображения id -> индекс строятся при первом обращении. Представление
+используется внутри анализатора и генератора документов и конвертируется
+в модели models.py и обратно без потерь.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from .models import (
+    Action,
+    Door,
+    FloorPlan,
+    Point,
+    RenovationPlan,
+    Room,
+    RoomType,
+    Wall,
+    WallType,
+    Window,
+)
+
+Opening = Union[Door, Window]
+
+WALL_TYPES: List[WallType] = list(WallType)
+WALL_TYPE_CODES = {wall_type: code for code, wall_type in enumerate(WALL_TYPES)}
+ROOM_TYPES: List[RoomType] = list(RoomType)
+ROOM_TYPE_CODES = {room_type: code for code, room_type in enumerate(ROOM_TYPES)}
+
+LOAD_BEARING = WALL_TYPE_CODES[WallType.LOAD_BEARING]
+
+WALL_DTYPE = np.dtype(
+    [
+        ("x1", np.float64),
+        ("y1", np.float64),
+        ("x2", np.float64),
+        ("y2", np.float64),
+        ("thickness", np.float64),
+        ("type", np.int8),
+    ]
+)
+# wall - индекс стены проема (-1, если стены с таким id нет в плане)
+OPENING_DTYPE = np.dtype([("wall", np.int32), ("position", np.float64), ("width", np.float64)])
+# polygon_start/polygon_size - срез контура в массиве точек (размер -1 - контура нет)
+ROOM_DTYPE = np.dtype(
+    [
+        ("type", np.int8),
+        ("area", np.float64),
+        ("gas", np.bool_),
+        ("ventilation", np.bool_),
+        ("light", np.bool_),
+        ("polygon_start", np.int32),
+        ("polygon_size", np.int32),
+    ]
+)
+
+
+def _index(ids: Sequence[str]) -> Dict[str, int]:
+    """Отображение id -> индекс (при повторяющихся id - первый элемент)"""
+    index: Dict[str, int] = {}
+    for position, item_id in enumerate(ids):
+        index.setdefault(item_id, position)
+    return index
+
+
+class CompactOpenings:
+    """Двери или окна плана в колоночном виде"""
+
+    __slots__ = ("ids", "data", "missing_wall_ids")
+
+    def __init__(self, ids: List[str], data: np.ndarray, missing_wall_ids: Dict[int, str]):
+        self.ids = ids
+        self.data = data
+        # id стен, которых нет в плане (остальные восстанавливаются по индексу стены)
+        self.missing_wall_ids = missing_wall_ids
+
+    @classmethod
+    def from_models(
+        cls, openings: Sequence[Opening], wall_index: Dict[str, int]
+    ) -> "CompactOpenings":
+        missing: Dict[int, str] = {}
+        rows = []
+        for position, opening in enumerate(openings):
+            wall = wall_index.get(opening.wallId, -1)
+            if wall < 0:
+                missing[position] = opening.wallId
+            rows.append((wall, opening.position, opening.width))
+        return cls(
+            [opening.id for opening in openings], np.array(rows, dtype=OPENING_DTYPE), missing
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def wall_id(self, position: int, wall_ids: List[str]) -> str:
+        wall = int(self.data["wall"][position])
+        return wall_ids[wall] if wall >= 0 else self.missing_wall_ids[position]
+
+
+class CompactFloorPlan:
+    """План этажа в виде типизированных массивов"""
+
+    __slots__ = (
+        "wall_ids",
+        "walls",
+        "doors",
+        "windows",
+        "room_ids",
+        "rooms",
+        "polygon_points",
+        "has_gas_supply",
+        "floor",
+        "total_floors",
+        "building_type",
+        "_wall_index",
+        "_room_index",
+    )
+
+    def __init__(
+        self,
+        wall_ids: List[str],
+        walls: np.ndarray,
+        doors: CompactOpenings,
+        windows: CompactOpenings,
+        room_ids: List[str],
+        rooms: np.ndarray,
+        polygon_points: np.ndarray,
+        has_gas_supply: bool = False,
+        floor: int = 1,
+        total_floors: int = 9,
+        building_type: str = "panel",
+        wall_index: Optional[Dict[str, int]] = None,
+    ):
+        self.wall_ids = wall_ids
+        self.walls = walls
+        self.doors = doors
+        self.windows = windows
+        self.room_ids = room_ids
+        self.rooms = rooms
+        self.polygon_points = polygon_points
+        self.has_gas_supply = has_gas_supply
+        self.floor = floor
+        self.total_floors = total_floors
+        self.building_type = building_type
+        self._wall_index = wall_index
+        self._room_index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_model(cls, plan: FloorPlan) -> "CompactFloorPlan":
+        """Конвертация из модели API (один проход по каждому списку)"""
+        wall_codes = WALL_TYPE_CODES
+        walls = np.array(
+            [(w.x1, w.y1, w.x2, w.y2, w.thickness, wall_codes[w.type]) for w in plan.walls],
+            dtype=WALL_DTYPE,
+        )
+        return cls.from_walls(plan, [w.id for w in plan.walls], walls)
+
+    @classmethod
+    def from_walls(
+        cls, plan: FloorPlan, wall_ids: List[str], walls: np.ndarray
+    ) -> "CompactFloorPlan":
+        """
+        Компактный план из уже упакованных стен (массив WALL_DTYPE)
+
+        Список plan.walls не используется: проемы, помещения и параметры
+        дома берутся из модели.
+        """
+        wall_index = _index(wall_ids)
+
+        room_codes = ROOM_TYPE_CODES
+        points: List[tuple] = []
+        rows = []
+        for room in plan.rooms:
+            if room.polygon is None:
+                start, size = 0, -1
+            else:
+                start, size = len(points), len(room.polygon)
+                points.extend((point.x, point.y) for point in room.polygon)
+            rows.append(
+                (
+                    room_codes[room.type],
+                    room.area,
+                    room.hasGas,
+                    room.hasVentilation,
+                    room.hasNaturalLight,
+                    start,
+                    size,
+                )
+            )
+
+        return cls(
+            wall_ids=wall_ids,
+            walls=walls,
+            doors=CompactOpenings.from_models(plan.doors, wall_index),
+            windows=CompactOpenings.from_models(plan.windows, wall_index),
+            room_ids=[room.id for room in plan.rooms],
+            rooms=np.array(rows, dtype=ROOM_DTYPE),
+            polygon_points=np.array(points, dtype=np.float64).reshape(-1, 2),
+            has_gas_supply=plan.hasGasSupply,
+            floor=plan.floor,
+            total_floors=plan.totalFloors,
+            building_type=plan.buildingType,
+            wall_index=wall_index,
+        )
+
+    @classmethod
+    def of(cls, plan: Union[FloorPlan, "CompactFloorPlan"]) -> "CompactFloorPlan":
+        """Компактный план из модели API или уже компактного плана"""
+        return plan if isinstance(plan, CompactFloorPlan) else cls.from_model(plan)
+
+    @property
+    def wall_index(self) -> Dict[str, int]:
+        """Индекс стены по id (при повторяющихся id - первая стена)"""
+        if self._wall_index is None:
+            self._wall_index = _index(self.wall_ids)
+        return self._wall_index
+
+    @property
+    def room_index(self) -> Dict[str, int]:
+        """Индекс помещения по id"""
+        if self._room_index is None:
+            self._room_index = _index(self.room_ids)
+        return self._room_index
+
+    def find_wall(self, wall_id: Optional[str]) -> int:
+        """Индекс стены по id или -1"""
+        return self.wall_index.get(wall_id, -1)
+
+    def wall_type(self, index: int) -> WallType:
+        return WALL_TYPES[self.walls["type"][index]]
+
+    def count_walls(self, wall_type: WallType) -> int:
+        return int(np.count_nonzero(self.walls["type"] == WALL_TYPE_CODES[wall_type]))
+
+    def wall(self, index: int) -> Wall:
+        """Модель стены по индексу"""
+        x1, y1, x2, y2, thickness, code = self.walls[index].tolist()
+        return Wall(
+            id=self.wall_ids[index],
+            type=WALL_TYPES[code],
+            x1=x1,
+            y1=y1,
+            x2=x2,
+            y2=y2,
+            thickness=thickness,
+        )
+
+    def polygon(self, index: int) -> Optional[List[Point]]:
+        size = int(self.rooms["polygon_size"][index])
+        if size < 0:
+            return None
+        start = int(self.rooms["polygon_start"][index])
+        return [Point(x=x, y=y) for x, y in self.polygon_points[start : start + size].tolist()]
+
+    def room(self, index: int) -> Room:
+        """Модель помещения по индексу"""
+        code, area, gas, ventilation, light, _, _ = self.rooms[index].tolist()
+        return Room(
+            id=self.room_ids[index],
+            type=ROOM_TYPES[code],
+            area=area,
+            hasGas=gas,
+            hasVentilation=ventilation,
+            hasNaturalLight=light,
+            polygon=self.polygon(index),
+        )
+
+    def door(self, index: int) -> Door:
+        """Модель двери по индексу"""
+        _, position, width = self.doors.data[index].tolist()
+        return Door(
+            id=self.doors.ids[index],
+            wallId=self.doors.wall_id(index, self.wall_ids),
+            position=position,
+            width=width,
+        )
+
+    def window(self, index: int) -> Window:
+        """Модель окна по индексу"""
+        _, position, width = self.windows.data[index].tolist()
+        return Window(
+            id=self.windows.ids[index],
+            wallId=self.windows.wall_id(index, self.wall_ids),
+            position=position,
+            width=width,
+        )
+
+    def to_model(self) -> FloorPlan:
+        """Обратная конвертация в модель API"""
+        return FloorPlan(
+            walls=[self.wall(index) for index in range(len(self.wall_ids))],
+            doors=[self.door(index) for index in range(len(self.doors))],
+            windows=[self.window(index) for index in range(len(self.windows))],
+            rooms=[self.room(index) for index in range(len(self.room_ids))],
+            hasGasSupply=self.has_gas_supply,
+            floor=self.floor,
+            totalFloors=self.total_floors,
+            buildingType=self.building_type,
+        )
+
+
+class CompactRenovationPlan(NamedTuple):
+    """План перепланировки с компактным исходным планом (поля как у RenovationPlan)"""
+
+    originalPlan: CompactFloorPlan
+    actions: List[Action]
+    description: str = ""
+
+
+# План из JSON (модели API) или из бинарного формата (компактный исходный план)
+AnyRenovationPlan = Union[RenovationPlan, CompactRenovationPlan]
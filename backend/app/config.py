@@ -1,7 +1,21 @@
+import os
+import sys
+from pathlib import Path
 from pydantic_settings import BaseSettings
 from typing import List
 
 
+def user_data_dir(app_name: str = "renovation-planner") -> Path:
+    """Каталог данных пользователя: доступен на запись и при установке только для чтения"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support"
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(base) / app_name
+
+
 class Settings(BaseSettings):
     """Настройки приложения"""
 
@@ -10,11 +24,87 @@ class Settings(BaseSettings):
     api_port: int = 8000
     api_reload: bool = True
 
+    # Production Server (python -m app.server: предзагрузка и fork рабочих процессов)
+    server_workers: int = 0  # 0 - по числу ядер
+    # перезапуск рабочего процесса после N запросов, 0 - без перезапуска
+    server_max_requests: int = 0
+    # случайная добавка к N: процессы не перезапускаются одновременно
+    server_max_requests_jitter: int = 0
+    # перезапуск при превышении резидентной памяти, 0 - без проверки
+    server_max_memory_mb: int = 0
+    server_memory_check_interval: float = 5.0  # секунды
+    # секунды на завершение запросов при остановке процесса
+    server_graceful_timeout: float = 30
+    server_backlog: int = 2048
+
+    # Application Data (очередь заданий, кэш документов)
+    # пусто - каталог данных пользователя (LOCALAPPDATA, ~/Library/Application Support,
+    # XDG_DATA_HOME): каталог установки может быть только для чтения
+    app_data_dir: str = ""
+
     # CORS Configuration
     allowed_origins: str = "http://localhost:5173,http://localhost:3000,http://localhost:5174"
 
     # Rate Limiting
+    # false - лимиты отключены (например, для нагрузочного тестирования)
+    rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 60
+    rate_limit_storage_uri: str = "memory://"  # shm:// - общие счетчики всех процессов хоста
+    rate_limit_strategy: str = "fixed-window"  # fixed-window или token-bucket (только shm://)
+    # заголовок ключа API (например, X-API-Key), пусто - отключено
+    rate_limit_api_key_header: str = ""
+    # разрешенные ключи через запятую: у каждого свой лимит в дополнение к лимиту адреса
+    rate_limit_api_keys: str = ""
+
+    # Batch Analysis
+    batch_workers: int = 0  # 0 - по числу ядер, 1 - без пула процессов
+    batch_chunk_size: int = 50
+    batch_max_plans: int = 5000
+
+    # Streaming Analysis (NDJSON)
+    stream_chunk_size: int = 20
+    stream_max_in_flight: int = 0  # 0 - по два фрагмента на рабочий процесс
+    stream_max_line_bytes: int = 16 * 1024 * 1024
+
+    # Analysis Executor (анализ и генерация документов вне цикла событий)
+    analysis_workers: int = 4
+    analysis_queue_size: int = 64  # задачи, ожидающие свободный поток
+    analysis_queue_timeout: float = 10.0  # секунды ожидания, затем 503
+
+    # Rules Store (перезагрузка renovation_rules.json при изменении)
+    rules_check_interval: float = 1.0  # секунды между проверками файла
+
+    # Analysis Cache (0 - кэш отключен)
+    analysis_cache_size: int = 1024
+    analysis_cache_ttl: float = 600  # секунды
+
+    # Quick Check
+    quick_check_batch_max: int = 500
+
+    # Editor Sessions
+    session_max_count: int = 1000
+    session_ttl: float = 1800  # секунды
+
+    # Document Templates (пустая строка - встроенные шаблоны data/templates)
+    document_templates_dir: str = ""
+    document_section_cache_size: int = 512  # готовые разделы документов, 0 - без кэша
+
+    # Document Rendering (PDF/DOCX и кэш готовых файлов на диске)
+    render_cache_dir: str = ""  # пусто - render-cache в каталоге данных приложения
+    render_cache_max_bytes: int = 256 * 1024 * 1024  # 0 - кэш отключен
+    document_font_path: str = ""  # TTF с кириллицей для PDF, пусто - поиск системного
+
+    # Document Jobs (очередь массовой генерации документов в SQLite)
+    jobs_db_path: str = ""  # пусто - jobs/jobs.sqlite3 в каталоге данных приложения
+    jobs_workers: int = 2
+    jobs_tenant_concurrency: int = 1  # одновременно выполняемые задания одного клиента
+    jobs_max_records: int = 1000
+    # аренда задания рабочим потоком, продлевается после каждой записи
+    jobs_lease_seconds: float = 30
+    jobs_retention: float = 86400  # секунды хранения завершенных заданий
+
+    # Fast JSON responses (сериализация pydantic-core без повторной валидации)
+    fast_json_responses: bool = False
 
     # Security
     secret_key: str = "dev-secret-key-change-in-production"
@@ -31,6 +121,39 @@ class Settings(BaseSettings):
         """Получить список разрешенных origins"""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
 
+    @property
+    def batch_worker_count(self) -> int:
+        """Фактическое число рабочих процессов пакетного анализа"""
+        if self.batch_workers > 0:
+            return self.batch_workers
+        return os.cpu_count() or 1
+
+    @property
+    def server_worker_count(self) -> int:
+        """Фактическое число рабочих процессов сервера"""
+        if self.server_workers > 0:
+            return self.server_workers
+        return os.cpu_count() or 1
+
+    @property
+    def data_path(self) -> Path:
+        """Каталог данных приложения"""
+        return Path(self.app_data_dir) if self.app_data_dir else user_data_dir()
+
+    @property
+    def render_cache_path(self) -> Path:
+        """Каталог кэша готовых PDF/DOCX"""
+        if self.render_cache_dir:
+            return Path(self.render_cache_dir)
+        return self.data_path / "render-cache"
+
+    @property
+    def jobs_database_path(self) -> Path:
+        """Файл очереди заданий"""
+        if self.jobs_db_path:
+            return Path(self.jobs_db_path)
+        return self.data_path / "jobs" / "jobs.sqlite3"
+
     @property
     def is_production(self) -> bool:
         """Проверка production окружения"""
@@ -0,0 +1,70 @@
+"""
+Быстрый запуск backend для настольного приложения (Electron)
+
+    python -m app.desktop --port 8000
+
+Один процесс без перезагрузки и без поддержки WebSocket (протокол не
+используется, а его библиотека заметно удлиняет запуск). PDF/DOCX-библиотеки
+импортируются при первом рендеринге; шаблоны документов, кэш PDF/DOCX и
+база очереди заданий создаются при первом обращении, поэтому запуск не
+пишет в каталог данных. Когда сокет слушает и запуск
+приложения (lifespan) завершен, на stdout печатается строка готовности:
+
+    RENOVATION_BACKEND_READY http://127.0.0.1:8000
+
+Оболочка ждет эту строку вместо опроса /health. При --port 0 порт
+выбирается системой и указывается в строке готовности. Время до первого
+ответа измеряет python -m benchmarks.cold_start.
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+READY_PREFIX = "RENOVATION_BACKEND_READY"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backend настольного приложения")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--port", type=int, default=None, help="по умолчанию API_PORT, 0 - свободный порт"
+    )
+    parser.add_argument("--log-level", default="warning")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    started = time.perf_counter()
+    args = parse_args(argv)
+
+    import uvicorn
+
+    from .config import settings
+    from .main import app
+
+    port = settings.api_port if args.port is None else args.port
+
+    class DesktopServer(uvicorn.Server):
+        async def startup(self, sockets=None) -> None:
+            await super().startup(sockets=sockets)
+            if not self.started:
+                return
+            bound_port = self.servers[0].sockets[0].getsockname()[1]
+            print(f"{READY_PREFIX} http://{args.host}:{bound_port}", flush=True)
+            print(
+                f"Backend ready in {time.perf_counter() - started:.2f}s",
+                file=sys.stderr,
+                flush=True,
+            )
+
+    DesktopServer(
+        uvicorn.Config(
+            app, host=args.host, port=port, ws="none", log_level=args.log_level, access_log=False
+        )
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
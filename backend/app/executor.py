@@ -0,0 +1,127 @@
+"""
+Ограниченный исполнитель для CPU-bound работы обработчиков
+
+Анализ плана и генерация документов - синхронный код. Вызванный прямо
+в async-обработчике, он останавливает цикл событий для всех клиентов.
+Исполнитель выполняет такие задачи в пуле потоков ограниченного размера.
+Задачи сверх числа потоков ждут в очереди ограниченной длины не дольше
+заданного времени. При переполнении очереди или истечении ожидания
+запрос сразу получает отказ (503), а цикл событий остается свободным.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class OverloadedError(Exception):
+    """Нет свободного исполнителя: очередь заполнена или истекло ожидание"""
+
+
+def _discard_result(discard: Callable[[Any], None], future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        discard(future.result())
+
+
+class AnalysisExecutor:
+    """Пул потоков с ограниченной очередью ожидания и таймаутом"""
+
+    def __init__(self, workers: int, queue_size: int, queue_timeout: float):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis")
+        # Занятые слоты и ожидающие задачи (изменяются только в потоке цикла событий);
+        # освободившийся слот передается первому ожидающему напрямую
+        self._running = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Число задач, ожидающих свободный поток"""
+        return len(self._waiters)
+
+    async def run(
+        self, func: Callable[..., T], *args: Any, discard: Optional[Callable[[T], None]] = None
+    ) -> T:
+        """Выполнить func(*args) в пуле; OverloadedError, если слот не получен
+
+        discard получает результат, который уже не будет получен: ожидание
+        отменено, а поток успел начать задачу (например, закрывает файл).
+        """
+        await self._acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool.submit(partial(func, *args))
+        except BaseException:
+            self._release()
+            raise
+        # Слот освобождается по завершении потока, даже если клиент отключился
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._finish))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if discard is not None:
+                future.add_done_callback(partial(_discard_result, discard))
+            raise
+
+    async def _acquire(self) -> None:
+        if self._running < self.workers and not self._waiters:
+            self._running += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise OverloadedError("Очередь анализа заполнена")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise OverloadedError(
+                f"Нет свободного исполнителя в течение {self.queue_timeout} с"
+            ) from None
+        except BaseException:
+            # Отмена после передачи слота: слот возвращается следующему
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _finish(self) -> None:
+        self.completed += 1
+        self._release()
+
+    def _release(self) -> None:
+        """Передать слот следующему ожидающему или освободить его"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Метрики загрузки: очередь, занятые потоки, отказы"""
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "queueDepth": self.queue_depth,
+            "queueSize": self.queue_size,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,35 @@
+"""
+Быстрая сериализация JSON-ответов
+
+Модели ответа (AnalysisResult и др.) уже провалидированы при создании.
+Обычный путь FastAPI проверяет их повторно по response_model и
+преобразует через jsonable_encoder перед json.dumps. Быстрый путь
+записывает объект сразу в байты сериализатором pydantic-core (Rust).
+Включается настройкой FAST_JSON_RESPONSES.
+"""
+
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+from .config import settings
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON-ответ, сериализуемый pydantic-core без повторной валидации"""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def json_response(content: Any, status_code: int = 200) -> Any:
+    """
+    Ответ эндпоинта с учетом настройки быстрой сериализации
+
+    При выключенной настройке содержимое возвращается как есть и
+    сериализуется FastAPI по response_model.
+    """
+    if not settings.fast_json_responses:
+        return content
+    return FastJSONResponse(content, status_code=status_code)
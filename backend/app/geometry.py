@@ -0,0 +1,427 @@
+"""
+Геометрия плана: пространственный индекс стен и проемов
+
+Стены индексируются равномерной сеткой, поэтому запросы "ближайшая стена",
+"стены рядом с точкой" и "стены, ограничивающие помещение" просматривают
+только соседние ячейки, а не все стены плана. Индекс строится над
+компактным представлением плана (массивы координат стен), ячейки
+хранятся в виде смещений в общем массиве индексов стен. Длинные стены,
+габарит которых занимает много ячеек, в сетку не попадают: они хранятся
+отдельным списком и проверяются каждым запросом.
+"""
+
+import math
+import sys
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .compact import LOAD_BEARING, CompactFloorPlan
+from .models import Door, FloorPlan, Room, Wall, Window
+
+Opening = Union[Door, Window]
+
+# Допуск по умолчанию при сопоставлении контуров с осями стен (в единицах плана)
+DEFAULT_TOLERANCE = 1.0
+
+# Размер сетки: не больше GRID_CELLS_PER_WALL ячеек в расчете на одну стену плана
+# (при малом cell_size ячейки укрупняются)
+GRID_CELLS_PER_WALL = 4
+
+# Стена, габарит которой занимает больше ячеек, попадает в список длинных стен,
+# а не в ячейки: память сетки растет линейно с числом стен
+MAX_WALL_CELLS = 16
+
+# До этого числа кандидатов расстояния считаются поэлементно: накладные расходы
+# векторных операций NumPy на малых массивах больше самих вычислений
+SCALAR_CANDIDATES = 32
+
+
+def point_segment_distance(
+    px: float, py: float, x1: float, y1: float, x2: float, y2: float
+) -> float:
+    """Расстояние от точки до отрезка"""
+    dx = x2 - x1
+    dy = y2 - y1
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(px - x1, py - y1)
+    t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq))
+    return math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+def segment_distances(px: float, py: float, walls: np.ndarray) -> np.ndarray:
+    """Расстояния от точки до осей стен (массив с полями x1, y1, x2, y2)"""
+    x1, y1 = walls["x1"], walls["y1"]
+    dx = walls["x2"] - x1
+    dy = walls["y2"] - y1
+    length_sq = dx * dx + dy * dy
+    # Для стен нулевой длины t = 0: расстояние до начала стены
+    t = ((px - x1) * dx + (py - y1) * dy) / np.where(length_sq > 0, length_sq, 1.0)
+    t = np.minimum(np.maximum(t, 0.0), 1.0)
+    return np.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+class SegmentGrid:
+    """Равномерная сетка над отрезками стен"""
+
+    def __init__(self, walls: np.ndarray, cell_size: Optional[float] = None):
+        self.walls = walls
+        count = len(walls)
+        x1, y1, x2, y2 = walls["x1"], walls["y1"], walls["x2"], walls["y2"]
+        if count:
+            self.min_x = float(min(x1.min(), x2.min()))
+            self.min_y = float(min(y1.min(), y2.min()))
+            max_x = float(max(x1.max(), x2.max()))
+            max_y = float(max(y1.max(), y2.max()))
+        else:
+            self.min_x = self.min_y = max_x = max_y = 0.0
+
+        extent = max(max_x - self.min_x, max_y - self.min_y, 1.0)
+        if not math.isfinite(extent):
+            # Размах координат не представим в float: одна ячейка на весь план
+            self.cell_size = sys.float_info.max
+            self.cols = self.rows = 1
+        else:
+            if cell_size is None:
+                # Около одной стены на ячейку при равномерном распределении
+                cell_size = extent / max(1, math.ceil(math.sqrt(count)))
+            self.cell_size = max(cell_size, 1e-9)
+            while True:
+                self.cols = int((max_x - self.min_x) // self.cell_size) + 1
+                self.rows = int((max_y - self.min_y) // self.cell_size) + 1
+                if self.cols * self.rows <= max(GRID_CELLS_PER_WALL * count, 1024):
+                    break
+                self.cell_size *= 2
+        self.max_thickness = float(walls["thickness"].max()) if count else 0.0
+        self._coords = np.column_stack((x1, y1, x2, y2))
+
+        # Стена попадает во все ячейки своего габаритного прямоугольника,
+        # длинная стена - в список _long_walls
+        col1, row1 = self._cells(np.minimum(x1, x2), np.minimum(y1, y2))
+        col2, row2 = self._cells(np.maximum(x1, x2), np.maximum(y1, y2))
+        widths = col2 - col1 + 1
+        spans = widths * (row2 - row1 + 1)
+        is_long = spans > MAX_WALL_CELLS
+        self._long_walls = np.flatnonzero(is_long).astype(np.int32)
+        spans[is_long] = 0
+        owner = np.repeat(np.arange(count, dtype=np.int32), spans)
+        local = np.arange(len(owner)) - np.repeat(np.cumsum(spans) - spans, spans)
+        cells = (
+            (row1[owner] + local // widths[owner]) * self.cols + col1[owner] + local % widths[owner]
+        )
+
+        # Стены ячейки c: _cell_walls[_cell_start[c]:_cell_start[c + 1]] в порядке индексов
+        order = np.argsort(cells, kind="stable")
+        self._cell_walls = owner[order]
+        self._cell_start = np.zeros(self.cols * self.rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.cols * self.rows), out=self._cell_start[1:])
+
+    def _cells(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Номера ограничиваются до приведения к int: разность координат
+        # может переполниться в inf
+        with np.errstate(invalid="ignore", over="ignore"):
+            dx, dy = xs - self.min_x, ys - self.min_y
+            cols = np.where(np.isfinite(dx), dx // self.cell_size, dx)
+            rows = np.where(np.isfinite(dy), dy // self.cell_size, dy)
+        return (
+            np.clip(cols, 0, self.cols - 1).astype(np.int64),
+            np.clip(rows, 0, self.rows - 1).astype(np.int64),
+        )
+
+    def _index(self, value: float, origin: float) -> float:
+        """Номер ячейки по оси без ограничения сеткой (±inf при переполнении)"""
+        delta = value - origin
+        return delta // self.cell_size if math.isfinite(delta) else delta
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        col = self._index(x, self.min_x)
+        row = self._index(y, self.min_y)
+        return int(min(max(col, 0), self.cols - 1)), int(min(max(row, 0), self.rows - 1))
+
+    def _row_span(self, row: int, col1: int, col2: int) -> np.ndarray:
+        """Стены ячеек строки row со столбцами col1..col2 (ячейки строки идут подряд)"""
+        base = row * self.cols
+        return self._cell_walls[self._cell_start[base + col1] : self._cell_start[base + col2 + 1]]
+
+    def query_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """Индексы стен (по возрастанию) из ячеек прямоугольника и все длинные стены"""
+        col1, row1 = self._cell(min_x, min_y)
+        col2, row2 = self._cell(max_x, max_y)
+        parts = [self._row_span(row, col1, col2) for row in range(row1, row2 + 1)]
+        return np.unique(np.concatenate(parts + [self._long_walls]))
+
+    def _ring(self, col: int, row: int, radius: int) -> np.ndarray:
+        """Стены в ячейках на границе квадрата радиуса radius вокруг (col, row)"""
+        if radius == 0:
+            return self._row_span(row, col, col)
+        parts = []
+        col1, col2 = max(col - radius, 0), min(col + radius, self.cols - 1)
+        for r in (row - radius, row + radius):
+            if 0 <= r < self.rows:
+                parts.append(self._row_span(r, col1, col2))
+        row1, row2 = max(row - radius + 1, 0), min(row + radius - 1, self.rows - 1)
+        for c in (col - radius, col + radius):
+            if 0 <= c < self.cols:
+                parts.extend(self._row_span(r, c, c) for r in range(row1, row2 + 1))
+        return np.concatenate(parts) if parts else self._cell_walls[:0]
+
+    def _closest(self, x: float, y: float, candidates: np.ndarray) -> Tuple[int, float]:
+        """Ближайшая к точке стена среди кандидатов"""
+        if len(candidates) <= SCALAR_CANDIDATES:
+            best = (-1, math.inf)
+            for index, (x1, y1, x2, y2) in zip(
+                candidates.tolist(), self._coords[candidates].tolist()
+            ):
+                distance = point_segment_distance(x, y, x1, y1, x2, y2)
+                if distance < best[1]:
+                    best = (index, distance)
+            return best
+        distances = segment_distances(x, y, self.walls[candidates])
+        closest = int(np.argmin(distances))
+        return int(candidates[closest]), float(distances[closest])
+
+    def nearest(
+        self, x: float, y: float, max_distance: Optional[float] = None
+    ) -> Optional[Tuple[int, float]]:
+        """Ближайшая стена к точке: (индекс, расстояние) или None"""
+        if not len(self.walls):
+            return None
+
+        col = self._index(x, self.min_x)
+        row = self._index(y, self.min_y)
+        # Точка вне сетки: поиск начинается с ближайшей ячейки сетки
+        start_col, start_row = self._cell(x, y)
+        offset = max(abs(col - start_col), abs(row - start_row))
+        max_radius = max(self.cols, self.rows)
+
+        best: Optional[Tuple[int, float]] = None
+        if len(self._long_walls):
+            best = self._closest(x, y, self._long_walls)
+        for radius in range(max_radius + 1):
+            # Стены в ячейках кольца не ближе (max(offset, radius) - 1) * cell_size
+            lower_bound = (max(offset, radius) - 1) * self.cell_size
+            if best is not None and best[1] <= lower_bound:
+                break
+            if max_distance is not None and lower_bound > max_distance:
+                break
+            candidates = self._ring(start_col, start_row, radius)
+            if not len(candidates):
+                continue
+            closest = self._closest(x, y, candidates)
+            if best is None or closest[1] < best[1]:
+                best = closest
+
+        if best is None or (max_distance is not None and best[1] > max_distance):
+            return None
+        return best
+
+
+class PlanGeometry:
+    """
+    Геометрический индекс одного плана
+
+    Работает над компактным представлением плана; пространственная
+    сетка строится лениво, при первом обращении. Запросы возвращают
+    модели стен только для найденных стен.
+    """
+
+    def __init__(self, plan: Union[FloorPlan, CompactFloorPlan], cell_size: Optional[float] = None):
+        self.plan = CompactFloorPlan.of(plan)
+        self._cell_size = cell_size
+        self._grid: Optional[SegmentGrid] = None
+
+    @property
+    def grid(self) -> SegmentGrid:
+        if self._grid is None:
+            self._grid = SegmentGrid(self.plan.walls, self._cell_size)
+        return self._grid
+
+    def wall(self, wall_id: Optional[str]) -> Optional[Wall]:
+        """Стена по id (при повторяющихся id - первая стена)"""
+        index = self.plan.find_wall(wall_id)
+        return self.plan.wall(index) if index >= 0 else None
+
+    def opening_point(self, opening: Opening) -> Optional[Tuple[float, float]]:
+        """Координаты центра проема на оси его стены"""
+        index = self.plan.find_wall(opening.wallId)
+        if index < 0:
+            return None
+        x1, y1, x2, y2 = self.plan.walls[["x1", "y1", "x2", "y2"]][index].tolist()
+        t = min(max(opening.position, 0.0), 1.0)
+        return x1 + (x2 - x1) * t, y1 + (y2 - y1) * t
+
+    def openings_on_load_bearing_walls(self) -> List[Tuple[Opening, Wall]]:
+        """Двери и окна, расположенные в несущих стенах"""
+        plan = self.plan
+        found = []
+        for openings, model in ((plan.doors, plan.door), (plan.windows, plan.window)):
+            walls = openings.data["wall"]
+            on_wall = walls >= 0
+            load_bearing = np.zeros(len(walls), dtype=bool)
+            load_bearing[on_wall] = plan.walls["type"][walls[on_wall]] == LOAD_BEARING
+            for position in np.flatnonzero(load_bearing).tolist():
+                found.append((model(position), plan.wall(int(walls[position]))))
+        return found
+
+    def nearest_wall(
+        self, x: float, y: float, max_distance: Optional[float] = None
+    ) -> Optional[Tuple[Wall, float]]:
+        """Ближайшая к точке стена и расстояние до ее оси"""
+        found = self.grid.nearest(x, y, max_distance)
+        if found is None:
+            return None
+        index, distance = found
+        return self.plan.wall(index), distance
+
+    def walls_near(self, x: float, y: float, radius: float) -> List[Wall]:
+        """Стены, ось которых проходит не дальше radius от точки"""
+        candidates = self.grid.query_box(x - radius, y - radius, x + radius, y + radius)
+        distances = segment_distances(x, y, self.plan.walls[candidates])
+        return [self.plan.wall(index) for index in candidates[distances <= radius].tolist()]
+
+    def walls_bounding_room(self, room: Room, tolerance: float = DEFAULT_TOLERANCE) -> List[Wall]:
+        """
+        Стены, ограничивающие помещение
+
+        Стена ограничивает помещение, если ее ось лежит на стороне контура
+        (с допуском в половину толщины стены) и перекрывается с ней.
+        """
+        if not room.polygon or len(room.polygon) < 2:
+            return []
+
+        grid = self.grid
+        points = room.polygon
+        reach = tolerance + grid.max_thickness / 2
+        found = set()
+        for start, end in zip(points, points[1:] + points[:1]):
+            edge_length = math.hypot(end.x - start.x, end.y - start.y)
+            if edge_length == 0:
+                continue
+            ux = (end.x - start.x) / edge_length
+            uy = (end.y - start.y) / edge_length
+            candidates = grid.query_box(
+                min(start.x, end.x) - reach,
+                min(start.y, end.y) - reach,
+                max(start.x, end.x) + reach,
+                max(start.y, end.y) + reach,
+            )
+            walls = self.plan.walls[candidates]
+            limit = tolerance + walls["thickness"] / 2
+            # Оба конца оси стены лежат на прямой стороны контура
+            offset1 = np.abs((walls["x1"] - start.x) * uy - (walls["y1"] - start.y) * ux)
+            offset2 = np.abs((walls["x2"] - start.x) * uy - (walls["y2"] - start.y) * ux)
+            # Проекции стены и стороны контура перекрываются
+            t1 = (walls["x1"] - start.x) * ux + (walls["y1"] - start.y) * uy
+            t2 = (walls["x2"] - start.x) * ux + (walls["y2"] - start.y) * uy
+            overlap = np.minimum(np.maximum(t1, t2), edge_length) - np.maximum(
+                np.minimum(t1, t2), 0.0
+            )
+            found.update(
+                candidates[(offset1 <= limit) & (offset2 <= limit) & (overlap > tolerance)].tolist()
+            )
+
+        return [self.plan.wall(index) for index in sorted(found)]
+
+
+Polygon = List[Tuple[float, float]]
+
+
+def polygon_area(polygon: Polygon) -> float:
+    """Площадь многоугольника (формула шнурования)"""
+    area = 0.0
+    for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+        area += x1 * y2 - x2 * y1
+    return abs(area) / 2
+
+
+def is_counter_clockwise(polygon: Polygon) -> bool:
+    """Обход многоугольника против часовой стрелки"""
+    area = 0.0
+    for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+        area += x1 * y2 - x2 * y1
+    return area > 0
+
+
+def _cross(o: Tuple[float, float], a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def is_convex(polygon: Polygon) -> bool:
+    """Проверка выпуклости многоугольника"""
+    sign = 0
+    size = len(polygon)
+    for i in range(size):
+        cross = _cross(polygon[i], polygon[(i + 1) % size], polygon[(i + 2) % size])
+        if cross != 0:
+            if sign == 0:
+                sign = 1 if cross > 0 else -1
+            elif (cross > 0) != (sign > 0):
+                return False
+    return True
+
+
+def convex_hull(polygon: Polygon) -> Polygon:
+    """Выпуклая оболочка (алгоритм Эндрю), обход против часовой стрелки"""
+    points = sorted(set(polygon))
+    if len(points) <= 2:
+        return points
+    lower: Polygon = []
+    for point in points:
+        while len(lower) >= 2 and _cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    upper: Polygon = []
+    for point in reversed(points):
+        while len(upper) >= 2 and _cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    return lower[:-1] + upper[:-1]
+
+
+def clip_polygon(subject: Polygon, clip: Polygon) -> Polygon:
+    """Отсечение многоугольника выпуклым многоугольником (Сазерленд - Ходжман)"""
+    if not is_counter_clockwise(clip):
+        clip = clip[::-1]
+    output = subject
+    for edge_start, edge_end in zip(clip, clip[1:] + clip[:1]):
+        if not output:
+            break
+        source = output
+        output = []
+        for current, following in zip(source, source[1:] + source[:1]):
+            current_inside = _cross(edge_start, edge_end, current) >= 0
+            following_inside = _cross(edge_start, edge_end, following) >= 0
+            if current_inside:
+                output.append(current)
+            if current_inside != following_inside:
+                output.append(_intersection(edge_start, edge_end, current, following))
+    return output
+
+
+def _intersection(
+    a: Tuple[float, float], b: Tuple[float, float], c: Tuple[float, float], d: Tuple[float, float]
+) -> Tuple[float, float]:
+    """Точка пересечения прямой ab и отрезка cd"""
+    cross_c = _cross(a, b, c)
+    cross_d = _cross(a, b, d)
+    t = cross_c / (cross_c - cross_d)
+    return c[0] + (d[0] - c[0]) * t, c[1] + (d[1] - c[1]) * t
+
+
+def polygon_intersection_area(subject: Polygon, clip: Polygon) -> float:
+    """
+    Площадь пересечения двух многоугольников
+
+    Отсечение выполняется выпуклым многоугольником. Если ни один из двух
+    не выпуклый, используется выпуклая оболочка clip - оценка сверху,
+    безопасная для проверок запретов.
+    """
+    if not is_convex(clip):
+        if is_convex(subject):
+            subject, clip = clip, subject
+        else:
+            clip = convex_hull(clip)
+    if len(clip) < 3 or len(subject) < 3:
+        return 0.0
+    return polygon_area(clip_polygon(subject, clip))
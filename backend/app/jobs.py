@@ -0,0 +1,441 @@
+"""
+Очередь заданий на массовую генерацию документов
+
+Задание - список квартир (DocumentJobRecord) и типы документов. Для каждой
+записи выполняется анализ плана и генерируются документы; результаты
+сохраняются по мере готовности и забираются клиентом порциями по курсору.
+
+Очередь хранится в SQLite (WAL), поэтому задания переживают перезапуск
+процесса. Рабочий поток берет задание в аренду на lease_seconds и продлевает
+ее после каждой записи; задание с истекшей арендой (процесс остановлен
+или упал) забирает любой рабочий поток, обработка продолжается с первой
+необработанной записи. Результат записи и продление аренды сохраняются
+одной транзакцией, поэтому запись не теряется и не дублируется. Данные
+квартиры и владельца хранятся только до обработки записи: обработанные
+записи и записи отмененного задания очищаются.
+У одного клиента (tenant) одновременно выполняется не больше
+tenant_concurrency заданий, остальные ждут в очереди.
+"""
+
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+from pydantic import ValidationError
+
+from .analyzer import RenovationAnalyzer
+from .batch import _format_validation_error
+from .document_generator import DocumentGenerator
+from .models import DocumentData, DocumentJobRecord, DocumentJobStatus
+from .rendering import DocumentRenderer
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL = 60  # секунды между удалениями старых заданий
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    status TEXT NOT NULL,
+    document_types TEXT NOT NULL,
+    format TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    seq INTEGER,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS job_items_by_seq ON job_items (job_id, seq);
+CREATE TABLE IF NOT EXISTS job_documents (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    content BLOB NOT NULL,
+    PRIMARY KEY (job_id, idx, name)
+);
+"""
+
+# Результат записи: (имя файла, содержимое) документов и ошибка
+ItemResult = Tuple[List[Tuple[str, bytes]], Optional[str]]
+
+
+class JobQueue:
+    """Очередь заданий в SQLite с пулом рабочих потоков"""
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        analyzer: RenovationAnalyzer,
+        generator: DocumentGenerator,
+        renderer: DocumentRenderer,
+        workers: int = 2,
+        tenant_concurrency: int = 1,
+        lease_seconds: float = 30,
+        retention: float = 86400,
+        poll_interval: float = 1.0,
+    ):
+        self.db_path = Path(db_path)
+        self.analyzer = analyzer
+        self.generator = generator
+        self.renderer = renderer
+        self.workers = max(1, workers)
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self.lease_seconds = lease_seconds
+        self.retention = retention
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._purged_at = 0.0
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _initialize(self) -> None:
+        """Каталог и схема базы при первом обращении: запуск приложения диск не трогает"""
+        with self._init_lock:
+            if self._initialized:
+                return
+            # В базе данные владельцев: каталог доступен только пользователю
+            self.db_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            finally:
+                conn.close()
+            self._initialized = True
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Отдельное соединение на операцию: потоки не делят соединения"""
+        if not self._initialized:
+            self._initialize()
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Транзакция с блокировкой записи с самого начала (BEGIN IMMEDIATE)"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def submit(
+        self, tenant: str, records: Sequence[Any], document_types: Sequence[str], file_format: str
+    ) -> str:
+        """Постановка задания в очередь; записи проверяются при обработке"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, tenant, status, document_types, format, total, created_at,"
+                " updated_at)"
+                " VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    tenant,
+                    json.dumps(list(document_types)),
+                    file_format,
+                    len(records),
+                    now,
+                    now,
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO job_items (job_id, idx, record) VALUES (?, ?, ?)",
+                (
+                    (job_id, idx, json.dumps(record, ensure_ascii=False))
+                    for idx, record in enumerate(records)
+                ),
+            )
+        self._wake.set()
+        return job_id
+
+    def status(self, job_id: str, tenant: str) -> Optional[DocumentJobStatus]:
+        """Состояние задания клиента (None - нет такого задания)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, total, completed, failed, created_at, updated_at FROM jobs"
+                " WHERE id = ? AND tenant = ?",
+                (job_id, tenant),
+            ).fetchone()
+        if row is None:
+            return None
+        status, total, completed, failed, created_at, updated_at = row
+        return DocumentJobStatus(
+            jobId=job_id,
+            status=status,
+            total=total,
+            completed=completed,
+            failed=failed,
+            resultsCursor=completed + failed,
+            createdAt=created_at,
+            updatedAt=updated_at,
+        )
+
+    def cancel(self, job_id: str, tenant: str) -> Optional[DocumentJobStatus]:
+        """Отмена задания: необработанные записи не обрабатываются
+
+        Рабочий поток узнает об отмене при сохранении текущей записи.
+        """
+        with self._transaction() as conn:
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', lease_owner = NULL, lease_until = 0,"
+                " updated_at = ?"
+                " WHERE id = ? AND tenant = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id, tenant),
+            ).rowcount
+            if cancelled:
+                conn.execute(
+                    "UPDATE job_items SET record = '' WHERE job_id = ? AND status = 'pending'",
+                    (job_id,),
+                )
+        return self.status(job_id, tenant)
+
+    def results_cursor(self, job_id: str, after: int, limit: int) -> int:
+        """Курсор конца порции: номер последней из limit записей после after"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MAX(seq) FROM (SELECT seq FROM job_items WHERE job_id = ? AND seq > ?"
+                " ORDER BY seq LIMIT ?)",
+                (job_id, after, limit),
+            ).fetchone()
+        return row[0] if row[0] is not None else after
+
+    def results(
+        self, job_id: str, after: int, until: int
+    ) -> List[Tuple[int, Optional[str], List[Tuple[str, bytes]]]]:
+        """Обработанные записи с номерами after < seq <= until: (индекс, ошибка, документы)"""
+        with self._connect() as conn:
+            items = conn.execute(
+                "SELECT idx, error FROM job_items WHERE job_id = ? AND seq > ? AND seq <= ?"
+                " ORDER BY seq",
+                (job_id, after, until),
+            ).fetchall()
+            results = []
+            for idx, error in items:
+                documents = conn.execute(
+                    "SELECT name, content FROM job_documents WHERE job_id = ? AND idx = ?"
+                    " ORDER BY rowid",
+                    (job_id, idx),
+                ).fetchall()
+                results.append((idx, error, documents))
+        return results
+
+    def work_once(self) -> bool:
+        """Обработка одного задания из очереди; False - брать нечего"""
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        job_id, lease_owner, document_types, file_format = claimed
+        logger.info(f"Document job {job_id} started")
+
+        while not self._stop.is_set():
+            with self._connect() as conn:
+                item = conn.execute(
+                    "SELECT idx, record FROM job_items WHERE job_id = ? AND status = 'pending'"
+                    " ORDER BY idx LIMIT 1",
+                    (job_id,),
+                ).fetchone()
+            if item is None:
+                with self._transaction() as conn:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'completed', lease_owner = NULL, lease_until = 0,"
+                        " updated_at = ?"
+                        " WHERE id = ? AND lease_owner = ?",
+                        (time.time(), job_id, lease_owner),
+                    )
+                logger.info(f"Document job {job_id} completed")
+                return True
+
+            idx, record = item
+            documents, error = self._process(idx, record, document_types, file_format)
+            if not self._save(job_id, lease_owner, idx, documents, error):
+                logger.info(f"Document job {job_id} cancelled or lease lost")
+                return True
+
+        # Остановка: аренда отпускается, задание продолжит другой процесс
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET lease_owner = NULL, lease_until = 0 WHERE id = ?"
+                " AND lease_owner = ?",
+                (job_id, lease_owner),
+            )
+        return True
+
+    def _claim(self) -> Optional[Tuple[str, str, List[str], str]]:
+        """Аренда самого старого доступного задания с учетом лимита клиента"""
+        lease_owner = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, document_types, format FROM jobs"
+                " WHERE (status = 'queued' OR (status = 'running' AND lease_until < :now))"
+                " AND tenant NOT IN ("
+                "  SELECT tenant FROM jobs WHERE status = 'running' AND lease_until >= :now"
+                "  GROUP BY tenant HAVING COUNT(*) >= :limit)"
+                " ORDER BY created_at LIMIT 1",
+                {"now": now, "limit": self.tenant_concurrency},
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, document_types, file_format = row
+            conn.execute(
+                "UPDATE jobs SET status = 'running', lease_owner = ?, lease_until = ?,"
+                " updated_at = ? WHERE id = ?",
+                (lease_owner, now + self.lease_seconds, now, job_id),
+            )
+        return job_id, lease_owner, json.loads(document_types), file_format
+
+    def _process(
+        self, idx: int, record: str, document_types: List[str], file_format: str
+    ) -> ItemResult:
+        """Анализ плана и документы одной записи; ошибки остаются в записи"""
+        try:
+            job_record = DocumentJobRecord.model_validate_json(record)
+        except ValidationError as e:
+            return [], "; ".join(_format_validation_error(e))
+
+        try:
+            data = DocumentData(
+                apartment_data=job_record.apartment_data,
+                owner_data=job_record.owner_data,
+                plan=job_record.plan.originalPlan,
+                analysis=self.analyzer.analyze(job_record.plan),
+                completion_date=job_record.completion_date,
+                format=file_format,
+            )
+            documents = []
+            for document_type in document_types:
+                text = self.generator.generate(document_type, data)
+                if file_format == "txt":
+                    content = text.encode("utf-8")
+                else:
+                    with self.renderer.open(text, file_format) as file:
+                        content = file.read()
+                documents.append((f"{document_type}.{file_format}", content))
+            return documents, None
+        except Exception as e:
+            logger.error(f"Error processing job record #{idx}: {e}", exc_info=True)
+            return [], str(e)
+
+    def _save(
+        self,
+        job_id: str,
+        lease_owner: str,
+        idx: int,
+        documents: List[Tuple[str, bytes]],
+        error: Optional[str],
+    ) -> bool:
+        """Сохранение результата записи и продление аренды; False - аренда потеряна"""
+        now = time.time()
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET completed = completed + ?, failed = failed + ?, lease_until = ?,"
+                " updated_at = ?"
+                " WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (
+                    error is None,
+                    error is not None,
+                    now + self.lease_seconds,
+                    now,
+                    job_id,
+                    lease_owner,
+                ),
+            ).rowcount
+            if not updated:
+                return False
+            # Запись больше не нужна: данные владельца не хранятся до удаления задания
+            conn.execute(
+                "UPDATE job_items SET status = ?, error = ?, record = '',"
+                " seq = (SELECT COALESCE(MAX(seq), 0) + 1 FROM job_items WHERE job_id = ?)"
+                " WHERE job_id = ? AND idx = ?",
+                ("failed" if error else "done", error, job_id, job_id, idx),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO job_documents (job_id, idx, name, content)"
+                " VALUES (?, ?, ?, ?)",
+                ((job_id, idx, name, content) for name, content in documents),
+            )
+        return True
+
+    def purge(self) -> int:
+        """Удаление завершенных и отмененных заданий старше retention секунд"""
+        with self._transaction() as conn:
+            expired = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT id FROM jobs WHERE status IN ('completed', 'cancelled')"
+                    " AND updated_at < ?",
+                    (time.time() - self.retention,),
+                )
+            ]
+            for table, column in (
+                ("job_documents", "job_id"),
+                ("job_items", "job_id"),
+                ("jobs", "id"),
+            ):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE {column} = ?", ((job_id,) for job_id in expired)
+                )
+        return len(expired)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Базы еще нет - нет и заданий: до первого задания рабочий поток
+                # базу не создает, запуск сервера не пишет на диск
+                if self._initialized or self.db_path.exists():
+                    if self.work_once():
+                        continue
+                    if time.monotonic() - self._purged_at > PURGE_INTERVAL:
+                        self._purged_at = time.monotonic()
+                        self.purge()
+            except Exception as e:
+                logger.error(f"Document job worker error: {e}", exc_info=True)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Запуск рабочих потоков"""
+        self._stop.clear()
+        for number in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._run, name=f"document-jobs-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Остановка после текущей записи; аренды заданий отпускаются"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
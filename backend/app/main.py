@@ -1,16 +1,41 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse, JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from fastapi.responses import PlainTextResponse, JSONResponse, StreamingResponse
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from .models import RenovationPlan, AnalysisResult, FloorPlan, DocumentRequest, OwnerData, ApartmentData
+from starlette.requests import ClientDisconnect
+from .models import (
+    RenovationPlan, AnalysisResult, DocumentData, DocumentRequest, DocumentBundleRequest, OwnerData, ApartmentData,
+    BatchAnalysisRequest, BatchAnalysisResponse, PlanDelta, SessionAnalysisResponse,
+    BuildingPlan, BuildingAnalysisResult, QuickCheckBatchRequest, DocumentJobRequest, DocumentJobStatus
+)
 from .analyzer import RenovationAnalyzer
-from .document_generator import DocumentGenerator
+from .batch import BatchAnalyzer
+from .binary_plan import read_batch, read_plan, request_body
+from .building import BuildingAnalyzer
+from .bundle import ZIP_MEDIA_TYPE, stream_zip
+from .cache import AnalysisCache
+from .compact import AnyRenovationPlan
+from .executor import AnalysisExecutor, OverloadedError
+from .jobs import JobQueue
+from .rendering import MEDIA_TYPES, DocumentRenderer, RenderCache, iter_file
+from .rules_store import get_rules_store
+from .precomputed import PrecomputedCache, PrecomputedJSON
+from .fast_json import json_response
+from .sessions import AnalysisSession, SessionStore
+from .quick_check import VerdictTable
+from .rate_limit import KeyedLimiter, client_identity, rate_limit_key
+from .streaming import NDJSON_MEDIA_TYPE, LineTooLongError, NDJSONStreamingResponse, iter_lines
+from .document_generator import DocumentGenerator, UnknownDocumentTypeError
 from .config import settings
+from contextlib import asynccontextmanager
+from typing import BinaryIO, Optional, Tuple, Union
+import asyncio
+import io
 import json
 import logging
-from pathlib import Path
+import threading
 
 # Настройка логирования
 logging.basicConfig(
@@ -19,13 +44,115 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Rate limiter: по адресу клиента и для разрешенных ключей API - по ключу;
+# счетчики в памяти процесса или общие для процессов хоста (shm://)
+limiter = KeyedLimiter(
+    key_func=rate_limit_key,
+    storage_uri=settings.rate_limit_storage_uri,
+    strategy=settings.rate_limit_strategy,
+    enabled=settings.rate_limit_enabled
+)
+
+# Общее хранилище правил: анализатор и эндпоинты правил читают один снимок
+rules_store = get_rules_store()
+
+# Инициализация анализатора и генератора документов
+analyzer = RenovationAnalyzer(rules_store)
+analysis_cache = AnalysisCache(
+    maxsize=settings.analysis_cache_size,
+    ttl=settings.analysis_cache_ttl,
+    rules_version=lambda: analyzer.rules_snapshot().version
+)
+building_analyzer = BuildingAnalyzer(analyzer)
+verdict_table = VerdictTable(analyzer)
+session_store = SessionStore(
+    analyzer,
+    maxsize=settings.session_max_count,
+    ttl=settings.session_ttl
+)
+# Предвычисленные ответы с правилами (пересобираются при смене версии правил)
+rules_responses = PrecomputedCache()
+batch_analyzer = BatchAnalyzer(
+    workers=settings.batch_worker_count,
+    chunk_size=settings.batch_chunk_size
+)
+# Пул потоков для анализа и генерации документов: цикл событий не блокируется
+analysis_executor = AnalysisExecutor(
+    workers=settings.analysis_workers,
+    queue_size=settings.analysis_queue_size,
+    queue_timeout=settings.analysis_queue_timeout
+)
+
+# Генератор документов, рендерер PDF/DOCX с кэшем на диске и очередь заданий
+# создаются при первом обращении: импорт приложения и запуск сервера не
+# загружают шаблоны и не трогают каталог данных
+_doc_generator: Optional[DocumentGenerator] = None
+_document_renderer: Optional[DocumentRenderer] = None
+_job_queue: Optional[JobQueue] = None
+_lazy_lock = threading.Lock()
+
+
+def get_doc_generator() -> DocumentGenerator:
+    """Генератор текстов документов по шаблонам"""
+    global _doc_generator
+    if _doc_generator is None:
+        with _lazy_lock:
+            if _doc_generator is None:
+                _doc_generator = DocumentGenerator(
+                    settings.document_templates_dir, settings.document_section_cache_size
+                )
+    return _doc_generator
+
+
+def get_document_renderer() -> DocumentRenderer:
+    """Рендерер документов с кэшем готовых файлов"""
+    global _document_renderer
+    if _document_renderer is None:
+        with _lazy_lock:
+            if _document_renderer is None:
+                _document_renderer = DocumentRenderer(
+                    RenderCache(settings.render_cache_path, settings.render_cache_max_bytes)
+                    if settings.render_cache_max_bytes > 0 else None,
+                    font_path=settings.document_font_path
+                )
+    return _document_renderer
+
+
+def get_job_queue() -> JobQueue:
+    """Очередь заданий массовой генерации документов (SQLite, переживает перезапуск)"""
+    global _job_queue
+    if _job_queue is None:
+        generator, renderer = get_doc_generator(), get_document_renderer()
+        with _lazy_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(
+                    settings.jobs_database_path,
+                    analyzer,
+                    generator,
+                    renderer,
+                    workers=settings.jobs_workers,
+                    tenant_concurrency=settings.jobs_tenant_concurrency,
+                    lease_seconds=settings.jobs_lease_seconds,
+                    retention=settings.jobs_retention
+                )
+    return _job_queue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Жизненный цикл приложения: запуск очереди заданий, остановка пулов при завершении"""
+    get_job_queue().start()
+    yield
+    get_job_queue().shutdown()
+    batch_analyzer.shutdown()
+    analysis_executor.shutdown()
+
 
 app = FastAPI(
     title="Планировщик ремонта API",
     description="API для анализа перепланировок квартир по российскому законодательству",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Добавляем rate limiter в state
@@ -37,15 +164,11 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST"],
+    allow_methods=["GET", "POST", "DELETE"],
     allow_headers=["*"],
     max_age=3600,
 )
 
-# Инициализация анализатора и генератора документов
-analyzer = RenovationAnalyzer()
-doc_generator = DocumentGenerator()
-
 
 # Глобальная обработка исключений
 @app.exception_handler(Exception)
@@ -76,6 +199,17 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     )
 
 
+@app.exception_handler(OverloadedError)
+async def overloaded_exception_handler(request: Request, exc: OverloadedError):
+    """Перегрузка исполнителя анализа: быстрый отказ вместо ожидания"""
+    logger.warning(f"HTTP 503: {exc} - {request.url}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
+
 @app.get("/")
 @limiter.limit("30/minute")
 async def root(request: Request):
@@ -84,38 +218,210 @@ async def root(request: Request):
         "version": "1.0.0",
         "endpoints": {
             "analyze": "/api/analyze",
+            "analyze_batch": "/api/analyze/batch",
             "rules": "/api/rules",
             "examples": "/api/examples"
         }
     }
 
 
-@app.post("/api/analyze", response_model=AnalysisResult)
+def analyze_cached(plan: AnyRenovationPlan) -> AnalysisResult:
+    """Анализ с кэшем результатов (выполняется в исполнителе анализа)"""
+    # Ключ кэша и анализ используют одну версию правил
+    with analyzer.pinned_rules():
+        cache_key, result = analysis_cache.get_result(plan)
+        if result is None:
+            result = analyzer.analyze(plan)
+            analysis_cache.set(cache_key, result)
+    return result
+
+
+@app.post("/api/analyze", response_model=AnalysisResult, openapi_extra=request_body(RenovationPlan))
 @limiter.limit("20/minute")
-async def analyze_renovation(request: Request, plan: RenovationPlan):
+async def analyze_renovation(request: Request):
     """
     Анализ плана перепланировки на соответствие законодательству РФ
+
+    Тело - RenovationPlan в JSON или MessagePack (Content-Type: application/msgpack).
     """
+    plan = await read_plan(request)
     try:
         logger.info(f"Analyzing renovation plan: {plan.description}")
-        result = analyzer.analyze(plan)
+        result = await analysis_executor.run(analyze_cached, plan)
         logger.info(f"Analysis complete. Legal: {result.isLegal}, Requires approval: {result.requiresApproval}")
-        return result
+        return json_response(result)
+    except OverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing plan: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/analyze/batch", response_model=BatchAnalysisResponse, openapi_extra=request_body(BatchAnalysisRequest))
+@limiter.limit("5/minute")
+async def analyze_batch(request: Request):
+    """
+    Пакетный анализ планов перепланировки в пуле рабочих процессов
+
+    Результаты возвращаются в порядке входных планов; ошибки валидации
+    и анализа указываются для каждого плана отдельно. Тело - JSON или
+    MessagePack (Content-Type: application/msgpack).
+    """
+    batch = await read_batch(request)
+    if len(batch.plans) > settings.batch_max_plans:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком много планов в пакете (максимум {settings.batch_max_plans})"
+        )
+
+    logger.info(f"Analyzing batch of {len(batch.plans)} plans")
+    results = await batch_analyzer.analyze(batch.plans)
+    failed = sum(1 for item in results if item.errors)
+    logger.info(f"Batch analysis complete. Total: {len(results)}, failed: {failed}")
+    return json_response(BatchAnalysisResponse(results=results, total=len(results), failed=failed))
+
+
+@app.post(
+    "/api/analyze/stream",
+    response_class=NDJSONStreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}}
+        }
+    }
+)
+@limiter.limit("5/minute")
+async def analyze_stream(request: Request):
+    """
+    Потоковый анализ: по одному плану RenovationPlan в строке (NDJSON)
+
+    Результаты (формат элемента пакетного анализа) отдаются построчно
+    по мере готовности и в порядке входных строк. Число одновременно
+    анализируемых фрагментов ограничено, поэтому тело запроса читается
+    по мере обработки. Клиент должен читать ответ параллельно с отправкой.
+    """
+    max_in_flight = settings.stream_max_in_flight or 2 * batch_analyzer.workers
+
+    async def results():
+        lines = iter_lines(request.stream(), settings.stream_max_line_bytes)
+        count = 0
+        try:
+            async for item in batch_analyzer.analyze_stream(lines, max_in_flight, settings.stream_chunk_size):
+                count += 1
+                yield item.model_dump_json() + "\n"
+        except LineTooLongError as e:
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+        except ClientDisconnect:
+            logger.warning(f"Client disconnected during stream analysis after {count} plans")
+            return
+        logger.info(f"Stream analysis complete. Plans: {count}")
+
+    return NDJSONStreamingResponse(results())
+
+
+@app.post("/api/analyze/building", response_model=BuildingAnalysisResult)
+@limiter.limit("10/minute")
+async def analyze_building(request: Request, building: BuildingPlan):
+    """
+    Анализ подъезда целиком: мокрые зоны над жилыми комнатами нижних этажей
+
+    Используются контуры помещений (polygon) в общей для всех этажей системе координат.
+    """
+    try:
+        result = await analysis_executor.run(building_analyzer.analyze, building)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Building analysis complete. Floors: {result.floorsAnalyzed}, overlaps: {len(result.overlaps)}")
+    return json_response(result)
+
+
+def create_session_with_result(plan: RenovationPlan) -> Tuple[str, AnalysisSession, AnalysisResult]:
+    session_id, session = session_store.create(plan)
+    return session_id, session, session.result()
+
+
+@app.post("/api/sessions", response_model=SessionAnalysisResponse)
+@limiter.limit("20/minute")
+async def create_session(request: Request, plan: RenovationPlan):
+    """
+    Создание сессии редактора с полным анализом плана
+    """
+    try:
+        session_id, session, result = await analysis_executor.run(create_session_with_result, plan)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Editor session created: {session_id}")
+    return json_response(SessionAnalysisResponse(sessionId=session_id, version=session.version, result=result))
+
+
+@app.post("/api/sessions/{session_id}/delta", response_model=SessionAnalysisResponse)
+@limiter.limit("300/minute")
+async def apply_session_delta(request: Request, session_id: str, delta: PlanDelta):
+    """
+    Инкрементальный анализ: применение одного изменения действия или помещения
+
+    Пересчитываются только проверки, затронутые изменением.
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found")
+    try:
+        result = await analysis_executor.run(session.apply, delta)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(SessionAnalysisResponse(sessionId=session_id, version=session.version, result=result))
+
+
+@app.delete("/api/sessions/{session_id}")
+@limiter.limit("60/minute")
+async def delete_session(request: Request, session_id: str):
+    """
+    Завершение сессии редактора
+    """
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found")
+    return {"sessionId": session_id, "deleted": True}
+
+
+@app.get("/api/cache/stats")
+@limiter.limit("30/minute")
+async def get_cache_stats(request: Request):
+    """
+    Статистика кэша результатов анализа (попадания, промахи, размер)
+    """
+    return json_response(analysis_cache.stats())
+
+
+@app.get("/api/render-cache/stats")
+@limiter.limit("30/minute")
+async def get_render_cache_stats(request: Request):
+    """
+    Статистика кэша PDF/DOCX на диске и доступность форматов
+    """
+    renderer = get_document_renderer()
+    stats = renderer.cache.stats() if renderer.cache else {"enabled": False}
+    stats["formats"] = {name: renderer.available(name) for name in MEDIA_TYPES}
+    return json_response(stats)
+
+
+@app.get("/api/executor/stats")
+@limiter.limit("30/minute")
+async def get_executor_stats(request: Request):
+    """
+    Загрузка исполнителя анализа: глубина очереди, занятые потоки, отказы
+    """
+    return analysis_executor.stats()
+
+
 @app.get("/api/rules")
 @limiter.limit("30/minute")
 async def get_rules(request: Request):
     """
     Получить все правила и законодательные требования
     """
-    rules_path = Path(__file__).parent.parent / "data" / "renovation_rules.json"
-    with open(rules_path, 'r', encoding='utf-8') as f:
-        rules = json.load(f)
-    return rules
+    snapshot = rules_store.snapshot()
+    return rules_responses.get(snapshot.version, None, lambda: snapshot.data).response(request)
 
 
 @app.get("/api/rules/{category}")
@@ -124,14 +430,38 @@ async def get_rule_category(request: Request, category: str):
     """
     Получить правила по категории
     """
-    rules_path = Path(__file__).parent.parent / "data" / "renovation_rules.json"
-    with open(rules_path, 'r', encoding='utf-8') as f:
-        rules = json.load(f)
+    snapshot = rules_store.snapshot()
+    rules = snapshot.data
 
     if category not in rules.get('rules', {}):
         raise HTTPException(status_code=404, detail=f"Category '{category}' not found")
 
-    return rules['rules'][category]
+    return rules_responses.get(snapshot.version, category, lambda: rules['rules'][category]).response(request)
+
+
+# Примеры типовых планировок: ответ сериализуется и сжимается один раз
+examples_response = PrecomputedJSON({
+    "examples": [
+        {
+            "name": "Хрущевка 2-комнатная",
+            "type": "2-room",
+            "area": 45,
+            "description": "Типовая двухкомнатная квартира в панельном доме"
+        },
+        {
+            "name": "Брежневка 3-комнатная",
+            "type": "3-room",
+            "area": 65,
+            "description": "Трехкомнатная квартира улучшенной планировки"
+        },
+        {
+            "name": "Студия современная",
+            "type": "studio",
+            "area": 35,
+            "description": "Современная квартира-студия"
+        }
+    ]
+})
 
 
 @app.get("/api/examples")
@@ -140,59 +470,58 @@ async def get_examples(request: Request):
     """
     Примеры типовых планировок
     """
-    return {
-        "examples": [
-            {
-                "name": "Хрущевка 2-комнатная",
-                "type": "2-room",
-                "area": 45,
-                "description": "Типовая двухкомнатная квартира в панельном доме"
-            },
-            {
-                "name": "Брежневка 3-комнатная",
-                "type": "3-room",
-                "area": 65,
-                "description": "Трехкомнатная квартира улучшенной планировки"
-            },
-            {
-                "name": "Студия современная",
-                "type": "studio",
-                "area": 35,
-                "description": "Современная квартира-студия"
-            }
-        ]
-    }
+    return examples_response.response(request)
 
 
 @app.post("/api/quick-check")
 @limiter.limit("30/minute")
 async def quick_check(request: Request, action: dict):
     """
-    Быстрая проверка одного действия
-    """
-    action_type = action.get('type')
-    action_data = action.get('data', {})
-
-    # Создаем упрощенный план для проверки
-    simple_plan = RenovationPlan(
-        originalPlan=FloorPlan(
-            walls=[],
-            doors=[],
-            windows=[],
-            rooms=[],
-            hasGasSupply=action_data.get('hasGas', False)
-        ),
-        actions=[action],
-        description=f"Проверка: {action_type}"
-    )
+    Быстрая проверка одного действия по таблице готовых вердиктов
+    """
+    try:
+        return json_response(await analysis_executor.run(verdict_table.check, action))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    result = analyzer.analyze(simple_plan)
-    return {
-        "action": action_type,
-        "isLegal": result.isLegal,
-        "requiresApproval": result.requiresApproval,
-        "mainWarning": result.warnings[0] if result.warnings else None
-    }
+
+@app.post("/api/quick-check/batch")
+@limiter.limit("30/minute")
+async def quick_check_batch(request: Request, batch: QuickCheckBatchRequest):
+    """
+    Быстрая проверка набора действий за один запрос
+    """
+    if len(batch.actions) > settings.quick_check_batch_max:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком много действий в запросе (максимум {settings.quick_check_batch_max})"
+        )
+    try:
+        return json_response({"results": await analysis_executor.run(verdict_table.check_many, batch.actions)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def render_document(doc_request: DocumentData, document_type: str) -> str:
+    """Текст документа по запросу (выполняется в исполнителе анализа)"""
+    try:
+        return get_doc_generator().generate(document_type, doc_request)
+    except UnknownDocumentTypeError:
+        raise HTTPException(status_code=400, detail="Invalid document type")
+
+
+def render_file(doc_request: DocumentData, document_type: str) -> Union[str, BinaryIO]:
+    """Текст документа или открытый файл PDF/DOCX (из кэша рендеринга)"""
+    document = render_document(doc_request, document_type)
+    if doc_request.format == "txt":
+        return document
+    return get_document_renderer().open(document, doc_request.format)
+
+
+def check_format_available(file_format: str) -> None:
+    renderer = get_document_renderer()
+    if file_format != "txt" and not renderer.available(file_format):
+        raise HTTPException(status_code=501, detail=renderer.unavailable_reason(file_format))
 
 
 @app.post("/api/generate-document", response_class=PlainTextResponse)
@@ -207,91 +536,150 @@ async def generate_document(request: Request, doc_request: DocumentRequest):
     - completion_act: Акт о завершении перепланировки
     - bti_application: Заявление в БТИ
     - checklist: Чек-лист документов
+
+    Формат (format): txt - текст (по умолчанию), pdf или docx - файл,
+    повторный запрос с тем же текстом документа берется из кэша рендеринга.
     """
+    check_format_available(doc_request.format)
     try:
-        logger.info(f"Generating document type: {doc_request.document_type}")
-        apartment_data_dict = doc_request.apartment_data.model_dump()
-        owner_data_dict = doc_request.owner_data.model_dump()
-
-        if doc_request.document_type == "application":
-            document = doc_generator.generate_application(
-                apartment_data_dict,
-                owner_data_dict,
-                doc_request.plan,
-                doc_request.analysis
-            )
-        elif doc_request.document_type == "technical_conclusion":
-            document = doc_generator.generate_technical_conclusion(
-                apartment_data_dict,
-                doc_request.plan,
-                doc_request.analysis
-            )
-        elif doc_request.document_type == "completion_act":
-            completion_date = doc_request.completion_date or doc_generator.current_date
-            document = doc_generator.generate_completion_act(
-                apartment_data_dict,
-                owner_data_dict,
-                completion_date
-            )
-        elif doc_request.document_type == "bti_application":
-            document = doc_generator.generate_bti_application(
-                apartment_data_dict,
-                owner_data_dict
-            )
-        elif doc_request.document_type == "checklist":
-            document = doc_generator.generate_document_checklist()
-        else:
-            raise HTTPException(status_code=400, detail="Invalid document type")
-
+        logger.info(f"Generating document type: {doc_request.document_type} ({doc_request.format})")
+        document = await analysis_executor.run(render_file, doc_request, doc_request.document_type)
         logger.info(f"Document generated successfully")
-        return document
-    except HTTPException:
+        if isinstance(document, str):
+            return document
+        return StreamingResponse(
+            iter_file(document),
+            media_type=MEDIA_TYPES[doc_request.format],
+            headers={"Content-Disposition": f'attachment; filename="{doc_request.document_type}.{doc_request.format}"'}
+        )
+    except (HTTPException, OverloadedError):
         raise
     except Exception as e:
         logger.error(f"Error generating document: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post(
+    "/api/generate-document/bundle",
+    response_class=StreamingResponse,
+    responses={200: {"content": {ZIP_MEDIA_TYPE: {}}}}
+)
+@limiter.limit("10/minute")
+async def generate_document_bundle(request: Request, bundle: DocumentBundleRequest):
+    """
+    Пакет документов одним ZIP-архивом (<тип>.<формат> для каждого типа)
+
+    Документы генерируются параллельно в исполнителе анализа и попадают
+    в архив по мере готовности. Первый готовый документ ожидается до начала
+    ответа, поэтому перегрузка исполнителя дает 503; ошибки остальных
+    документов перечисляются в errors.txt в конце архива.
+    """
+    check_format_available(bundle.format)
+    document_types = list(dict.fromkeys(bundle.document_types))
+    logger.info(f"Generating document bundle: {', '.join(document_types)} ({bundle.format})")
+
+    def discard(document: Union[str, BinaryIO, None]) -> None:
+        # Готовый, но не попавший в архив файл закрывается сразу
+        if document is not None and not isinstance(document, str):
+            document.close()
+
+    async def render(document_type: str) -> Tuple[str, Optional[Union[str, BinaryIO]], Optional[Exception]]:
+        try:
+            document = await analysis_executor.run(render_file, bundle, document_type, discard=discard)
+            return document_type, document, None
+        except Exception as e:
+            return document_type, None, e
+
+    def cancel_tasks() -> None:
+        # Ожидающие документы отменяются, готовые закрываются (в архиве они уже закрыты)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                discard(task.result()[1])
+
+    tasks = [asyncio.ensure_future(render(document_type)) for document_type in document_types]
+    completed = asyncio.as_completed(tasks)
+    try:
+        first = await next(completed)
+        if isinstance(first[2], OverloadedError):
+            raise first[2]
+    except BaseException:
+        cancel_tasks()
+        raise
+
+    async def results():
+        yield first
+        for future in completed:
+            yield await future
+
+    async def members():
+        errors = []
+        try:
+            async for document_type, document, error in results():
+                if error is None:
+                    yield f"{document_type}.{bundle.format}", document
+                else:
+                    logger.error(f"Error generating document {document_type}: {error}", exc_info=error)
+                    errors.append(f"{document_type}: {error}")
+        finally:
+            # Клиент отключился: ожидающие документы больше не нужны
+            cancel_tasks()
+        if errors:
+            yield "errors.txt", "\n".join(errors) + "\n"
+        logger.info(f"Document bundle complete. Documents: {len(document_types) - len(errors)}, failed: {len(errors)}")
+
+    return StreamingResponse(
+        stream_zip(members()),
+        media_type=ZIP_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="documents.zip"'}
+    )
+
+
+# Типы документов: ответ сериализуется и сжимается один раз
+document_types_response = PrecomputedJSON({
+    "document_types": [
+        {
+            "id": "application",
+            "name": "Заявление на перепланировку",
+            "description": "Заявление в жилищную инспекцию о согласовании перепланировки (ПП РФ №266)",
+            "requires_analysis": True
+        },
+        {
+            "id": "technical_conclusion",
+            "name": "Техническое заключение",
+            "description": "Техническое заключение о возможности и безопасности перепланировки",
+            "requires_analysis": True
+        },
+        {
+            "id": "completion_act",
+            "name": "Акт о завершении перепланировки",
+            "description": "Акт приемочной комиссии о завершенной перепланировке",
+            "requires_analysis": False
+        },
+        {
+            "id": "bti_application",
+            "name": "Заявление в БТИ",
+            "description": "Заявление о внесении изменений в технический паспорт",
+            "requires_analysis": False
+        },
+        {
+            "id": "checklist",
+            "name": "Чек-лист документов",
+            "description": "Полный список необходимых документов для всех этапов",
+            "requires_analysis": False
+        }
+    ]
+})
+
+
 @app.get("/api/document-types")
 @limiter.limit("30/minute")
 async def get_document_types(request: Request):
     """
     Получить список доступных типов документов
     """
-    return {
-        "document_types": [
-            {
-                "id": "application",
-                "name": "Заявление на перепланировку",
-                "description": "Заявление в жилищную инспекцию о согласовании перепланировки (ПП РФ №266)",
-                "requires_analysis": True
-            },
-            {
-                "id": "technical_conclusion",
-                "name": "Техническое заключение",
-                "description": "Техническое заключение о возможности и безопасности перепланировки",
-                "requires_analysis": True
-            },
-            {
-                "id": "completion_act",
-                "name": "Акт о завершении перепланировки",
-                "description": "Акт приемочной комиссии о завершенной перепланировке",
-                "requires_analysis": False
-            },
-            {
-                "id": "bti_application",
-                "name": "Заявление в БТИ",
-                "description": "Заявление о внесении изменений в технический паспорт",
-                "requires_analysis": False
-            },
-            {
-                "id": "checklist",
-                "name": "Чек-лист документов",
-                "description": "Полный список необходимых документов для всех этапов",
-                "requires_analysis": False
-            }
-        ]
-    }
+    return document_types_response.response(request)
 
 
 @app.get("/health")
@@ -301,6 +689,121 @@ async def health_check(request: Request):
     return {"status": "healthy", "service": "renovation-planner"}
 
 
+# Записей задания в одном запросе к хранилищу при выдаче результатов
+JOB_RESULTS_PAGE = 20
+
+
+def get_tenant(request: Request) -> str:
+    """Клиент для лимитов и доступа к заданиям: разрешенный ключ API или адрес
+
+    Заголовки, которые сервер не проверяет, клиента не определяют: иначе
+    их подмена обходила бы лимит заданий и открывала чужие результаты.
+    """
+    return client_identity(request)
+
+
+async def get_job_status(request: Request, job_id: str) -> DocumentJobStatus:
+    status = await run_in_threadpool(get_job_queue().status, job_id, get_tenant(request))
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return status
+
+
+@app.post("/api/jobs", response_model=DocumentJobStatus, status_code=201)
+@limiter.limit("10/minute")
+async def create_document_job(request: Request, job: DocumentJobRequest):
+    """
+    Задание на генерацию документов для многих квартир
+
+    Записи (apartment_data, owner_data, plan - RenovationPlan, completion_date)
+    обрабатываются в фоне: анализ плана и документы выбранных типов.
+    Задание сохраняется в очереди и переживает перезапуск сервера;
+    задания одного клиента (ключ API или адрес) выполняются по очереди.
+    """
+    if len(job.records) > settings.jobs_max_records:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком много записей в задании (максимум {settings.jobs_max_records})"
+        )
+    check_format_available(job.format)
+    tenant = get_tenant(request)
+    job_id = await run_in_threadpool(
+        get_job_queue().submit, tenant, job.records, list(dict.fromkeys(job.document_types)), job.format
+    )
+    logger.info(f"Document job {job_id} queued. Records: {len(job.records)}")
+    return json_response(await get_job_status(request, job_id), status_code=201)
+
+
+@app.get("/api/jobs/{job_id}", response_model=DocumentJobStatus)
+@limiter.limit("120/minute")
+async def get_document_job(request: Request, job_id: str):
+    """
+    Прогресс задания: обработано записей, ошибок, курсор готовых результатов
+    """
+    return json_response(await get_job_status(request, job_id))
+
+
+@app.get(
+    "/api/jobs/{job_id}/results",
+    response_class=StreamingResponse,
+    responses={200: {"content": {ZIP_MEDIA_TYPE: {}}}}
+)
+@limiter.limit("60/minute")
+async def get_document_job_results(
+    request: Request,
+    job_id: str,
+    after: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Очередная порция готовых результатов задания ZIP-архивом
+
+    В архиве до limit записей, обработанных после курсора after:
+    <номер записи>/<тип>.<формат>; ошибки записей - в errors.txt.
+    Курсор конца порции - в заголовке X-Results-Cursor, его передают
+    в after следующего запроса. Записи выдаются в порядке обработки.
+    """
+    await get_job_status(request, job_id)
+    cursor = await run_in_threadpool(get_job_queue().results_cursor, job_id, after, limit)
+
+    async def members():
+        errors = []
+        start = after
+        while start < cursor:
+            end = min(start + JOB_RESULTS_PAGE, cursor)
+            for idx, error, documents in await run_in_threadpool(get_job_queue().results, job_id, start, end):
+                if error is not None:
+                    errors.append(f"{idx}: {error}")
+                for name, content in documents:
+                    yield f"{idx:04d}/{name}", io.BytesIO(content)
+            start = end
+        if errors:
+            yield "errors.txt", "\n".join(errors) + "\n"
+
+    return StreamingResponse(
+        stream_zip(members()),
+        media_type=ZIP_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="job-{job_id}-{after}-{cursor}.zip"',
+            "X-Results-Cursor": str(cursor)
+        }
+    )
+
+
+@app.delete("/api/jobs/{job_id}", response_model=DocumentJobStatus)
+@limiter.limit("30/minute")
+async def cancel_document_job(request: Request, job_id: str):
+    """
+    Отмена задания; уже готовые результаты остаются доступны
+    """
+    status = await run_in_threadpool(get_job_queue().cancel, job_id, get_tenant(request))
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    logger.info(f"Document job {job_id} cancelled")
+    return json_response(status)
+
+
 if __name__ == "__main__":
+    # Один процесс для разработки; продакшн - python -m app.server
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host=settings.api_host, port=settings.api_port)
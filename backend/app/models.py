@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional, Literal
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, List, Optional, Literal, Union, get_args
+from typing_extensions import Annotated
 from enum import Enum
 
 
@@ -19,7 +20,17 @@ class RoomType(str, Enum):
     STORAGE = "storage"
 
 
+class Point(BaseModel):
+    # Бесконечные и NaN координаты не принимаются: на них ломается геометрический индекс
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    x: float
+    y: float
+
+
 class Wall(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
     id: str
     type: WallType
     x1: float
@@ -50,6 +61,7 @@ class Room(BaseModel):
     hasGas: bool = False
     hasVentilation: bool = True
     hasNaturalLight: bool = True
+    polygon: Optional[List[Point]] = None  # контур помещения в координатах стен
 
 
 class FloorPlan(BaseModel):
@@ -75,12 +87,96 @@ class RenovationAction(str, Enum):
     ADD_BALCONY_GLAZING = "add_balcony_glazing"
 
 
+class ActionData(BaseModel):
+    """Данные действия без параметров (неизвестные поля игнорируются)"""
+
+
+class WallActionData(ActionData):
+    wallId: Optional[str] = None
+
+
+class DoorActionData(WallActionData):
+    """Стена проема: wallId или ближайшая к точке (x, y) стена"""
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    x: Optional[float] = None
+    y: Optional[float] = None
+
+
+class CombineRoomsData(ActionData):
+    room1Type: Optional[RoomType] = None
+    room2Type: Optional[RoomType] = None
+
+
+class ChangeWindowData(ActionData):
+    changeSize: bool = False
+
+
+class RemoveWallAction(BaseModel):
+    type: Literal[RenovationAction.REMOVE_WALL]
+    data: WallActionData = Field(default_factory=WallActionData)
+
+
+class MoveDoorAction(BaseModel):
+    type: Literal[RenovationAction.MOVE_DOOR]
+    data: DoorActionData = Field(default_factory=DoorActionData)
+
+
+class CombineRoomsAction(BaseModel):
+    type: Literal[RenovationAction.COMBINE_ROOMS]
+    data: CombineRoomsData = Field(default_factory=CombineRoomsData)
+
+
+class ChangeWindowAction(BaseModel):
+    type: Literal[RenovationAction.CHANGE_WINDOW]
+    data: ChangeWindowData = Field(default_factory=ChangeWindowData)
+
+
+class SimpleAction(BaseModel):
+    """Действия, проверка которых не зависит от данных"""
+    type: Literal[
+        RenovationAction.ADD_WALL,
+        RenovationAction.MOVE_KITCHEN,
+        RenovationAction.MOVE_BATHROOM,
+        RenovationAction.EXPAND_BATHROOM,
+        RenovationAction.ADD_BALCONY_GLAZING
+    ]
+    data: ActionData = Field(default_factory=ActionData)
+
+
+# Действие перепланировки: модель выбирается по полю type
+Action = Annotated[
+    Union[RemoveWallAction, MoveDoorAction, CombineRoomsAction, ChangeWindowAction, SimpleAction],
+    Field(discriminator="type")
+]
+
+
 class RenovationPlan(BaseModel):
     originalPlan: FloorPlan
-    actions: List[dict]
+    actions: List[Action]
     description: str = ""
 
 
+class PlanDelta(BaseModel):
+    """
+    Одно изменение плана в сессии редактора
+
+    Действия адресуются позицией в списке (index), помещения - по id
+    (roomId, по умолчанию room.id): при обновлении room может сменить id.
+    """
+    target: Literal["action", "room"]
+    op: Literal["add", "remove", "update"]
+    index: Optional[int] = None
+    action: Optional[Action] = None
+    roomId: Optional[str] = None
+    room: Optional[Room] = None
+
+
+class QuickCheckBatchRequest(BaseModel):
+    """Набор действий для быстрой проверки"""
+    actions: List[dict] = Field(..., min_length=1)
+
+
 class RiskLevel(str, Enum):
     CRITICAL = "critical"  # Запрещено законом
     HIGH = "high"  # Требует обязательного согласования
@@ -107,6 +203,60 @@ class AnalysisResult(BaseModel):
     estimatedCost: Optional[str] = None
 
 
+class BatchAnalysisRequest(BaseModel):
+    """Запрос на пакетный анализ планов
+
+    Планы валидируются поштучно в рабочих процессах, поэтому ошибка в одном
+    плане не отклоняет весь пакет.
+    """
+    plans: List[Any] = Field(..., min_length=1)
+
+
+class BatchAnalysisItem(BaseModel):
+    """Результат анализа одного плана из пакета"""
+    index: int
+    result: Optional[AnalysisResult] = None
+    errors: List[str] = []
+
+
+class BatchAnalysisResponse(BaseModel):
+    """Результаты пакетного анализа в порядке входных планов"""
+    results: List[BatchAnalysisItem]
+    total: int
+    failed: int
+
+
+class SessionAnalysisResponse(BaseModel):
+    """Результат анализа в сессии редактора"""
+    sessionId: str
+    version: int
+    result: AnalysisResult
+
+
+class BuildingPlan(BaseModel):
+    """Планы этажей одного подъезда (этажи различаются по полю floor)"""
+    floors: List[FloorPlan] = Field(..., min_length=1)
+    description: str = ""
+
+
+class StackingOverlap(BaseModel):
+    """Перекрытие мокрой зоны и жилой комнаты на нижнем этаже"""
+    floor: int
+    roomId: str
+    roomType: RoomType
+    belowFloor: int
+    belowRoomId: str
+    overlapArea: float  # в квадратных единицах координат плана
+
+
+class BuildingAnalysisResult(BaseModel):
+    isLegal: bool
+    requiresApproval: bool
+    warnings: List[Warning]
+    overlaps: List[StackingOverlap]
+    floorsAnalyzed: int
+
+
 class OwnerData(BaseModel):
     """Данные собственника квартиры"""
     full_name: str
@@ -129,11 +279,56 @@ class ApartmentData(BaseModel):
     building_series: Optional[str] = None
 
 
-class DocumentRequest(BaseModel):
-    """Запрос на генерацию документов"""
+DocumentType = Literal["application", "technical_conclusion", "completion_act", "bti_application", "checklist"]
+DocumentFormat = Literal["txt", "pdf", "docx"]
+
+
+class DocumentData(BaseModel):
+    """Исходные данные для генерации документов"""
     apartment_data: ApartmentData
     owner_data: OwnerData
     plan: FloorPlan
     analysis: AnalysisResult
-    document_type: Literal["application", "technical_conclusion", "completion_act", "bti_application", "checklist"]
     completion_date: Optional[str] = None
+    format: DocumentFormat = "txt"
+
+
+class DocumentRequest(DocumentData):
+    """Запрос на генерацию документов"""
+    document_type: DocumentType
+
+
+class DocumentBundleRequest(DocumentData):
+    """Запрос на генерацию пакета документов одним архивом"""
+    document_types: List[DocumentType] = Field(default_factory=lambda: list(get_args(DocumentType)), min_length=1)
+
+
+class DocumentJobRecord(BaseModel):
+    """Квартира в задании на генерацию документов: анализ и документы по плану"""
+    apartment_data: ApartmentData
+    owner_data: OwnerData
+    plan: RenovationPlan
+    completion_date: Optional[str] = None
+
+
+class DocumentJobRequest(BaseModel):
+    """Задание на генерацию документов для многих квартир
+
+    Записи (DocumentJobRecord) валидируются поштучно при обработке, поэтому
+    ошибка в одной записи не отклоняет задание.
+    """
+    records: List[Any] = Field(..., min_length=1)
+    document_types: List[DocumentType] = Field(default_factory=lambda: list(get_args(DocumentType)), min_length=1)
+    format: DocumentFormat = "txt"
+
+
+class DocumentJobStatus(BaseModel):
+    """Состояние задания: прогресс и курсор готовых результатов"""
+    jobId: str
+    status: Literal["queued", "running", "completed", "cancelled"]
+    total: int
+    completed: int
+    failed: int
+    resultsCursor: int  # номер последней обработанной записи в порядке завершения
+    createdAt: float
+    updatedAt: float
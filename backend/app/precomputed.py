@@ -0,0 +1,135 @@
+"""
+Предвычисленные ответы для редко меняющихся данных API
+
+Полезная нагрузка сериализуется в JSON и сжимается (gzip, brotli) один раз
+на версию данных. Запрос обслуживается готовыми байтами: выбирается
+вариант по Accept-Encoding, а совпадение ETag из If-None-Match дает 304.
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Ответы можно кэшировать, но перед использованием нужно проверить ETag
+CACHE_CONTROL = "public, no-cache"
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Предпочтение кодировок при равных весах в Accept-Encoding
+ENCODING_PREFERENCE = ("br", "gzip")
+
+
+def _serialize(content: Any) -> bytes:
+    """JSON в том же виде, что и стандартный JSONResponse"""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _accepted_encodings(header: str) -> Set[str]:
+    """Кодировки из Accept-Encoding с ненулевым весом"""
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name)
+    if "*" in accepted:
+        accepted.update(ENCODING_PREFERENCE)
+    return accepted
+
+
+def _etag_values(header: str) -> Set[str]:
+    """Значения If-None-Match (слабые теги сравниваются по значению)"""
+    values = set()
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            values.add(tag)
+    return values
+
+
+class PrecomputedJSON:
+    """Сериализованный JSON-ответ с предсжатыми вариантами и строгими ETag"""
+
+    def __init__(self, content: Any):
+        self.body = _serialize(content)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+
+        # Вариант: кодировка -> (тело, ETag); у разных кодировок разные строгие ETag
+        self.variants: Dict[str, Tuple[bytes, str]] = {"identity": (self.body, f'"{digest}"')}
+        self.variants["gzip"] = (gzip.compress(self.body, GZIP_LEVEL, mtime=0), f'"{digest}-gzip"')
+        if brotli is not None:
+            self.variants["br"] = (
+                brotli.compress(self.body, quality=BROTLI_QUALITY),
+                f'"{digest}-br"',
+            )
+        self.etags = {etag for _, etag in self.variants.values()}
+
+    def _choose(self, accept_encoding: str) -> str:
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ENCODING_PREFERENCE:
+            if encoding in accepted and encoding in self.variants:
+                # Сжатие не используется, если оно не уменьшает ответ
+                if len(self.variants[encoding][0]) < len(self.body):
+                    return encoding
+        return "identity"
+
+    def response(self, request: Request) -> Response:
+        """Ответ на запрос: 304 при совпадении ETag, иначе подходящий вариант"""
+        encoding = self._choose(request.headers.get("accept-encoding", ""))
+        body, etag = self.variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = _etag_values(if_none_match)
+            if "*" in tags or tags & self.etags:
+                return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+class PrecomputedCache:
+    """Предвычисленные ответы по ключу, сбрасываемые при смене версии данных"""
+
+    def __init__(self):
+        # Версия и ответы хранятся вместе, чтобы подменяться одним присваиванием
+        self._state: Tuple[Optional[Hashable], Dict[Hashable, PrecomputedJSON]] = (None, {})
+
+    def get(self, version: Hashable, key: Hashable, content: Callable[[], Any]) -> PrecomputedJSON:
+        """Готовый ответ для ключа; content вызывается только при первом обращении"""
+        state = self._state
+        if version != state[0]:
+            state = self._state = (version, {})
+        payloads = state[1]
+        payload = payloads.get(key)
+        if payload is None:
+            payload = payloads[key] = PrecomputedJSON(content())
+        return payload
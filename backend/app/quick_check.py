@@ -0,0 +1,144 @@
+"""
+Таблица готовых вердиктов для быстрой проверки одного действия
+
+Результат проверки одного действия зависит только от небольшого ключа:
+типа действия и нескольких полей его данных. Все комбинации вычисляются
+при старте по текущим правилам, после чего проверка - это поиск в словаре.
+При смене версии правил таблица строится заново.
+"""
+
+from itertools import product
+from typing import Any, Dict, List, Optional, Tuple
+
+from .analyzer import RenovationAnalyzer
+from .models import FloorPlan, RenovationAction, RenovationPlan, RoomType, Wall, WallType
+
+# Поля данных действия, от которых зависит вердикт
+VERDICT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    RenovationAction.REMOVE_WALL.value: ("wallType",),
+    RenovationAction.ADD_WALL.value: (),
+    RenovationAction.MOVE_DOOR.value: ("wallType",),
+    RenovationAction.MOVE_KITCHEN.value: ("hasGas",),
+    RenovationAction.MOVE_BATHROOM.value: (),
+    RenovationAction.EXPAND_BATHROOM.value: (),
+    RenovationAction.COMBINE_ROOMS.value: ("hasGas", "room1Type", "room2Type"),
+    RenovationAction.CHANGE_WINDOW.value: ("changeSize",),
+    RenovationAction.ADD_BALCONY_GLAZING.value: (),
+}
+
+# Допустимые значения полей ключа (None - поле не указано)
+FIELD_VALUES: Dict[str, List[Any]] = {
+    "wallType": [None] + [wall_type.value for wall_type in WallType],
+    "hasGas": [False, True],
+    "room1Type": [None] + [room_type.value for room_type in RoomType],
+    "room2Type": [None] + [room_type.value for room_type in RoomType],
+    "changeSize": [False, True],
+}
+
+# Значения по умолчанию для отсутствующих полей
+FIELD_DEFAULTS = {"hasGas": False, "changeSize": False}
+
+# Условный id стены, по которой проверяются действия со стенами
+QUICK_CHECK_WALL_ID = "quick-check-wall"
+
+VerdictKey = Tuple[Any, ...]
+
+
+def build_check_plan(action_type: str, fields: Dict[str, Any]) -> RenovationPlan:
+    """Минимальный план для проверки одного действия с заданными полями"""
+    data = {name: value for name, value in fields.items() if value is not None}
+    walls = []
+    wall_type = data.pop("wallType", None)
+    if wall_type is not None:
+        walls.append(Wall(id=QUICK_CHECK_WALL_ID, type=wall_type, x1=0, y1=0, x2=1, y2=0))
+        data["wallId"] = QUICK_CHECK_WALL_ID
+
+    return RenovationPlan(
+        originalPlan=FloorPlan(
+            walls=walls, doors=[], windows=[], rooms=[], hasGasSupply=data.get("hasGas", False)
+        ),
+        actions=[{"type": action_type, "data": data}],
+        description=f"Проверка: {action_type}",
+    )
+
+
+class VerdictTable:
+    """Предвычисленные вердикты быстрой проверки по ключу действия"""
+
+    def __init__(self, analyzer: RenovationAnalyzer):
+        self.analyzer = analyzer
+        # Версия правил и таблица хранятся вместе, чтобы подменяться одним присваиванием
+        self._state = self._build()
+
+    def _build(self) -> Tuple[int, Dict[VerdictKey, Dict[str, Any]]]:
+        """Все вердикты по одному снимку правил"""
+        table: Dict[VerdictKey, Dict[str, Any]] = {}
+        with self.analyzer.pinned_rules() as snapshot:
+            for action_type, fields in VERDICT_FIELDS.items():
+                for values in product(*(FIELD_VALUES[name] for name in fields)):
+                    table[(action_type, *values)] = self._compute(
+                        action_type, dict(zip(fields, values))
+                    )
+        return snapshot.version, table
+
+    def _current_table(self) -> Dict[VerdictKey, Dict[str, Any]]:
+        state = self._state
+        if self.analyzer.rules_snapshot().version != state[0]:
+            # Параллельная пересборка безвредна: побеждает последнее присваивание
+            state = self._state = self._build()
+        return state[1]
+
+    def __len__(self) -> int:
+        return len(self._state[1])
+
+    def _compute(self, action_type: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Вердикт по проверкам самого действия (без общих требований к пустому плану)"""
+        plan = build_check_plan(action_type, fields)
+        with self.analyzer.pinned_rules():
+            warnings = self.analyzer.check_actions(plan)
+            result = self.analyzer.build_result(plan, warnings)
+        return {
+            "isLegal": result.isLegal,
+            "requiresApproval": result.requiresApproval,
+            "mainWarning": warnings[0] if warnings else None,
+        }
+
+    def _key(self, action_type: Any, data: Dict[str, Any]) -> Optional[VerdictKey]:
+        """Ключ таблицы или None, если значения полей вне таблицы"""
+        key = [action_type]
+        for name in VERDICT_FIELDS[action_type]:
+            value = data.get(name, FIELD_DEFAULTS.get(name))
+            # bool - подкласс int: сравнение по типу исключает совпадения 1 == True
+            if not any(
+                value == allowed and type(value) is type(allowed) for allowed in FIELD_VALUES[name]
+            ):
+                return None
+            key.append(value)
+        return tuple(key)
+
+    def check(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Вердикт для одного действия за O(1)
+
+        ValueError - действие не объект, неизвестный тип или данные не объект.
+        """
+        if not isinstance(action, dict):
+            raise ValueError("Действие должно быть объектом")
+        action_type = action.get("type")
+        if not isinstance(action_type, str) or action_type not in VERDICT_FIELDS:
+            raise ValueError(f"Неизвестный тип действия: {action_type}")
+        data = action.get("data")
+        if data is None:
+            data = {}
+        elif not isinstance(data, dict):
+            raise ValueError("Данные действия (data) должны быть объектом")
+        key = self._key(action_type, data)
+        verdict = self._current_table().get(key) if key is not None else None
+        if verdict is None:
+            # Значения вне таблицы проверяются напрямую
+            fields = {name: data.get(name) for name in VERDICT_FIELDS[action_type]}
+            verdict = self._compute(action_type, fields)
+        return {"action": action_type, **verdict}
+
+    def check_many(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Вердикты для набора действий"""
+        return [self.check(action) for action in actions]
@@ -0,0 +1,360 @@
+"""
+Общие для процессов счетчики ограничения частоты запросов
+
+slowapi хранит счетчики в памяти процесса: при нескольких рабочих
+процессах uvicorn каждый считает запросы сам и фактический лимит
+умножается на число процессов. Здесь - хранилище limits со схемой
+shm://, которое держит счетчики в файле, отображенном в память всеми
+процессами хоста (по умолчанию в /dev/shm - без записи на диск).
+
+Файл - хэш-таблица с открытой адресацией из слотов фиксированного
+размера: 64-битный хэш ключа, счетчик и время истечения. Истекшие слоты
+переиспользуются; если свободных слотов на пути поиска нет, вытесняется
+слот с самым ранним истечением. Операция выполняется под блокировкой
+записи файла (lockf) и занимает единицы микросекунд.
+
+Кроме фиксированного окна (fixed-window) хранилище поддерживает
+стратегию token-bucket: корзина емкостью в лимит пополняется равномерно
+за период лимита (GCRA - в слоте хранится одно время, когда корзина
+снова будет полной). Всплески ограничиваются емкостью, а не границами
+окна.
+
+Лимиты считаются по адресу клиента. Ключи API из RATE_LIMIT_API_KEYS
+(заголовок RATE_LIMIT_API_KEY_HEADER) получают дополнительный счетчик
+на ключ - KeyedLimiter; непроверенные ключи игнорируются.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import urllib.parse
+from functools import lru_cache
+from math import floor
+from pathlib import Path
+from typing import FrozenSet, Optional, Tuple
+
+from limits.errors import ConfigurationError
+from limits.storage import Storage
+from limits.strategies import STRATEGIES, RateLimiter
+from limits.util import WindowStats
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+from .config import settings
+
+try:
+    import fcntl
+except ImportError:  # fcntl есть только на POSIX: хранилище shm:// недоступно
+    fcntl = None
+
+MAGIC = b"RLSHM001"
+HEADER = struct.Struct("<8sQ")  # метка формата, число слотов
+SLOT = struct.Struct("<Qqd")  # хэш ключа (0 - пустой слот), счетчик, время истечения
+MAX_PROBE = 32  # слотов на пути поиска ключа
+DEFAULT_SLOTS = 65536  # 1.5 МиБ
+
+DEFAULT_DIR = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+DEFAULT_PATH = DEFAULT_DIR / "renovation-rate-limit.shm"
+
+# Допуск сравнения времен: N запросов по 1/N периода укладываются в период
+EPSILON = 1e-6
+
+
+def key_hash(key: str) -> int:
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+
+class SharedMemoryStorage(Storage):
+    """Хранилище limits в общем файле: shm:///путь/к/файлу?slots=65536
+
+    Файл открывается заново в каждом процессе (в том числе после fork):
+    блокировки lockf принадлежат процессу, потоки процесса дополнительно
+    разделяет threading.Lock.
+    """
+
+    STORAGE_SCHEME = ["shm"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        if fcntl is None:
+            raise ConfigurationError("Хранилище shm:// требует POSIX (модуль fcntl)")
+        parsed = urllib.parse.urlparse(uri or "shm://")
+        query = urllib.parse.parse_qs(parsed.query)
+        self.path = Path(parsed.path) if parsed.path else DEFAULT_PATH
+        self.slots = int(options.get("slots") or query.get("slots", [DEFAULT_SLOTS])[0])
+        if self.slots < MAX_PROBE:
+            raise ConfigurationError(f"Слишком мало слотов хранилища shm:// (минимум {MAX_PROBE})")
+        self._pid: Optional[int] = None
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._open()
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    def _open(self) -> None:
+        """Открытие и при необходимости разметка файла (под блокировкой)"""
+        inherited_fd, inherited_map = self._fd, self._map
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = HEADER.size + self.slots * SLOT.size
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, HEADER.size, 0)
+            if len(header) < HEADER.size or HEADER.unpack(header) != (MAGIC, self.slots):
+                # Новый файл или другой формат: размечается заново
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, HEADER.pack(MAGIC, self.slots), 0)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN)
+        if inherited_fd is not None:
+            # Файл и отображение, унаследованные от родительского процесса
+            inherited_map.close()
+            os.close(inherited_fd)
+        self._fd = fd
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _locked(self) -> "_Locked":
+        if self._pid != os.getpid():
+            self._open()
+        return _Locked(self)
+
+    def _find(self, hashed: int, now: float, create: bool) -> Optional[int]:
+        """Смещение слота ключа; при create - слот для нового ключа"""
+        free = None
+        oldest = None
+        oldest_expiry = float("inf")
+        index = hashed % self.slots
+        for _ in range(MAX_PROBE):
+            offset = HEADER.size + index * SLOT.size
+            slot_hash, _, expiry = SLOT.unpack_from(self._map, offset)
+            if slot_hash == hashed:
+                return offset
+            if slot_hash == 0:
+                # Дальше по цепочке ключей нет: пустые слоты не появляются внутри цепочек
+                return (free if free is not None else offset) if create else None
+            if free is None and expiry <= now:
+                free = offset
+            if expiry < oldest_expiry:
+                oldest, oldest_expiry = offset, expiry
+            index = (index + 1) % self.slots
+        if not create:
+            return None
+        return free if free is not None else oldest
+
+    def _read(self, key: str, now: float) -> Tuple[int, Optional[int], int, float]:
+        """Хэш, смещение слота и действующие счетчик и истечение ключа"""
+        hashed = key_hash(key)
+        offset = self._find(hashed, now, create=False)
+        if offset is None:
+            return hashed, None, 0, 0.0
+        _, count, expiry = SLOT.unpack_from(self._map, offset)
+        if expiry <= now:
+            return hashed, offset, 0, 0.0
+        return hashed, offset, count, expiry
+
+    def incr(self, key: str, expiry: int, amount: int = 1, elastic_expiry: bool = False) -> int:
+        now = time.time()
+        with self._locked():
+            hashed, offset, count, expires = self._read(key, now)
+            if offset is None:
+                offset = self._find(hashed, now, create=True)
+            if count == 0 or elastic_expiry:
+                expires = now + expiry
+            count += amount
+            SLOT.pack_into(self._map, offset, hashed, count, expires)
+        return count
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        now = time.time()
+        with self._locked():
+            hashed, offset, count, expires = self._read(key, now)
+            if offset is None or count == 0:
+                return 0
+            count = max(count - amount, 0)
+            SLOT.pack_into(self._map, offset, hashed, count, expires)
+        return count
+
+    def get(self, key: str) -> int:
+        with self._locked():
+            return self._read(key, time.time())[2]
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        with self._locked():
+            expires = self._read(key, now)[3]
+        return expires or now
+
+    def clear(self, key: str) -> None:
+        with self._locked():
+            hashed, offset, _, _ = self._read(key, time.time())
+            if offset is not None:
+                # Хэш остается в слоте: цепочки поиска не разрываются
+                SLOT.pack_into(self._map, offset, hashed, 0, 0.0)
+
+    def check(self) -> bool:
+        return True
+
+    def reset(self) -> Optional[int]:
+        now = time.time()
+        with self._locked():
+            live = 0
+            for index in range(self.slots):
+                offset = HEADER.size + index * SLOT.size
+                slot_hash, _, expiry = SLOT.unpack_from(self._map, offset)
+                live += slot_hash != 0 and expiry > now
+            self._map[HEADER.size :] = bytes(self.slots * SLOT.size)
+        return live
+
+    def acquire_token(self, key: str, limit: int, period: float, amount: int = 1) -> bool:
+        """Списание amount жетонов из корзины емкостью limit на период period"""
+        now = time.time()
+        interval = period / limit
+        with self._locked():
+            hashed, offset, _, full_at = self._read(key, now)
+            full_at = max(full_at, now) + amount * interval
+            if full_at - now > period + EPSILON:
+                return False
+            if offset is None:
+                offset = self._find(hashed, now, create=True)
+            SLOT.pack_into(self._map, offset, hashed, 0, full_at)
+        return True
+
+    def get_token_bucket(self, key: str, limit: int, period: float) -> Tuple[float, int]:
+        """Время, когда корзина снова полна, и число оставшихся жетонов"""
+        now = time.time()
+        with self._locked():
+            full_at = max(self._read(key, now)[3], now)
+        return full_at, floor((period - (full_at - now)) / (period / limit) + EPSILON)
+
+
+class _Locked:
+    """Блокировка потоков процесса и записи файла между процессами"""
+
+    __slots__ = ("storage",)
+
+    def __init__(self, storage: SharedMemoryStorage):
+        self.storage = storage
+
+    def __enter__(self) -> None:
+        self.storage._lock.acquire()
+        try:
+            fcntl.lockf(self.storage._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self.storage._lock.release()
+            raise
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            fcntl.lockf(self.storage._fd, fcntl.LOCK_UN)
+        finally:
+            self.storage._lock.release()
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """Стратегия token-bucket: лимит "10/minute" - корзина на 10 запросов,
+    один жетон возвращается каждые 6 секунд"""
+
+    def __init__(self, storage: Storage):
+        if not hasattr(storage, "acquire_token"):
+            raise NotImplementedError(
+                "Стратегия token-bucket не поддерживается хранилищем "
+                f"{type(storage).__name__} (нужно shm://)"
+            )
+        super().__init__(storage)
+
+    def hit(self, item, *identifiers: str, cost: int = 1) -> bool:
+        return self.storage.acquire_token(
+            item.key_for(*identifiers), item.amount, item.get_expiry(), cost
+        )
+
+    def test(self, item, *identifiers: str, cost: int = 1) -> bool:
+        return self.get_window_stats(item, *identifiers).remaining >= cost
+
+    def get_window_stats(self, item, *identifiers: str) -> WindowStats:
+        return WindowStats(
+            *self.storage.get_token_bucket(
+                item.key_for(*identifiers), item.amount, item.get_expiry()
+            )
+        )
+
+
+# Стратегия доступна по имени в Limiter(strategy="token-bucket")
+STRATEGIES["token-bucket"] = TokenBucketRateLimiter
+
+
+@lru_cache(maxsize=1)
+def _allowed_key_hashes(keys: str) -> FrozenSet[str]:
+    return frozenset(_hash_api_key(key.strip()) for key in keys.split(",") if key.strip())
+
+
+def _hash_api_key(api_key: str) -> str:
+    return hashlib.blake2b(api_key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def api_key_id(request: Request) -> Optional[str]:
+    """Хэш ключа API из заголовка, если ключ есть в RATE_LIMIT_API_KEYS (иначе None)
+
+    Непроверенный ключ ничего не меняет: иначе клиент получал бы новый
+    счетчик, подставляя каждый раз другой ключ.
+    """
+    header = settings.rate_limit_api_key_header
+    api_key = request.headers.get(header) if header else None
+    if not api_key:
+        return None
+    hashed = _hash_api_key(api_key)
+    return hashed if hashed in _allowed_key_hashes(settings.rate_limit_api_keys) else None
+
+
+def rate_limit_key(request: Request) -> str:
+    """Ключ лимита по адресу клиента: действует на все запросы"""
+    return get_remote_address(request)
+
+
+def api_key_limit_key(request: Request) -> str:
+    """Ключ отдельного лимита ключа API (в счетчиках - хэш ключа)"""
+    key_id = api_key_id(request)
+    return f"key:{key_id}" if key_id else "key:-"
+
+
+def api_key_limit_cost(request: Request) -> int:
+    """Запрос без разрешенного ключа не расходует лимит ключа"""
+    return 1 if api_key_id(request) else 0
+
+
+def client_identity(request: Request) -> str:
+    """Клиент, которому сервер доверяет: разрешенный ключ API или адрес"""
+    key_id = api_key_id(request)
+    return f"key:{key_id}" if key_id else get_remote_address(request)
+
+
+class KeyedLimiter(Limiter):
+    """Limiter с лимитом маршрута на адрес клиента и, если заданы
+    RATE_LIMIT_API_KEYS, тем же лимитом отдельно на каждый разрешенный ключ
+
+    Лимит по адресу проверяется всегда и первым; запрос с ключом должен
+    уложиться в оба лимита.
+    """
+
+    def limit(self, limit_value, key_func=None, **kwargs):
+        by_address = super().limit(limit_value, key_func=key_func, **kwargs)
+        if (
+            key_func is not None
+            or not settings.rate_limit_api_key_header
+            or not settings.rate_limit_api_keys
+        ):
+            return by_address
+        kwargs["cost"] = api_key_limit_cost
+        by_key = super().limit(limit_value, key_func=api_key_limit_key, **kwargs)
+        return lambda func: by_key(by_address(func))
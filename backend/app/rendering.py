@@ -0,0 +1,305 @@
+"""
+Рендеринг документов в PDF и DOCX с кэшем на диске
+
+Текст документа верстается моноширинным шрифтом: выравнивание в шаблонах
+сделано пробелами. PDF строит fpdf2 со встроенным TTF-шрифтом с кириллицей,
+DOCX - python-docx (строка текста - абзац). Обе библиотеки работают без сети;
+если библиотека или шрифт не найдены, формат недоступен. Библиотеки
+импортируются при первом рендеринге: их импорт занимает сотни
+миллисекунд и замедлял бы запуск сервера.
+
+Рендеринг на порядки медленнее генерации текста, поэтому готовые файлы
+хранятся в закрытом каталоге кэша. Ключ - SHA-256 от формата, версии верстки,
+шрифта и текста: одинаковый текст не верстается повторно. При превышении
+размера кэша удаляются давно не использованные файлы. Результат
+отдается открытым файлом и читается фрагментами, целиком в память
+не загружается.
+"""
+
+import contextlib
+import hashlib
+import importlib.util
+import io
+import os
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # fcntl есть только на POSIX: настольное приложение - один процесс
+    fcntl = None
+
+# fpdf2 и python-docx - необязательные зависимости
+HAS_FPDF = importlib.util.find_spec("fpdf") is not None
+HAS_DOCX = importlib.util.find_spec("docx") is not None
+
+# Увеличивается при изменении верстки: старые файлы кэша перестают совпадать
+RENDER_VERSION = 1
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+# Моноширинные шрифты с кириллицей: Linux (fonts-dejavu), macOS, Windows
+FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+    "/usr/share/fonts/TTF/DejaVuSansMono.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSansMono.ttf",
+    "/System/Library/Fonts/Supplemental/Courier New.ttf",
+    "C:/Windows/Fonts/cour.ttf",
+)
+DOCX_FONT = "Courier New"
+
+FONT_SIZE = 10  # пункты: строка шаблона до 84 символов помещается в ширину A4
+LINE_HEIGHT = 4.5  # мм
+MARGIN = 15  # мм
+
+CHUNK_SIZE = 64 * 1024
+
+# Файл блокировки каталога кэша (файлы с точкой в начале не входят в кэш)
+LOCK_NAME = ".lock"
+
+
+class RenderingUnavailableError(Exception):
+    """Формат не поддерживается: не установлена библиотека или нет шрифта"""
+
+
+def find_font(path: str = "") -> Optional[Path]:
+    """Путь к TTF-шрифту для PDF: заданный явно или первый найденный"""
+    if path:
+        return Path(path) if Path(path).is_file() else None
+    for candidate in FONT_CANDIDATES:
+        if Path(candidate).is_file():
+            return Path(candidate)
+    return None
+
+
+def iter_file(file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Чтение файла фрагментами с закрытием по окончании"""
+    with file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class RenderCache:
+    """Кэш готовых файлов на диске с вытеснением по размеру (LRU)
+
+    В документах персональные данные владельцев, поэтому каталог
+    создается при первом обращении с правами 0700, а существующий каталог
+    должен принадлежать пользователю процесса и быть закрыт на запись
+    для остальных. Порядок использования - время изменения файла,
+    попадание обновляет это время. Файлы записываются атомарно (временный
+    файл и os.replace), а размер кэша считается по каталогу под файловой
+    блокировкой, поэтому каталог и общий лимит разделяют все процессы.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._ready = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _prepare(self) -> None:
+        """Создание и проверка каталога при первом обращении"""
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+                check_private_dir(self.directory)
+                self._ready = True
+
+    @contextlib.contextmanager
+    def _directory_lock(self) -> Iterator[None]:
+        """Блокировка каталога для всех процессов (без fcntl - для потоков процесса)"""
+        with self._lock, open(self.directory / LOCK_NAME, "ab") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _entries(self) -> List[Tuple[float, str, int]]:
+        """Файлы кэша: (время использования, имя, размер)"""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    info = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, entry.name, info.st_size))
+        return entries
+
+    def open(self, name: str) -> Optional[BinaryIO]:
+        """Открытый файл из кэша или None"""
+        self._prepare()
+        try:
+            file = open(self.directory / name, "rb")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        try:
+            _touch(self.directory / name)
+        except OSError:
+            pass
+        return file
+
+    def put(self, name: str, data: bytes) -> BinaryIO:
+        """Сохранение файла; возвращается открытый на чтение файл"""
+        self._prepare()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".render-")
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                temp.write(data)
+            _touch(temp_path)
+            os.replace(temp_path, self.directory / name)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        # Файл открыт до вытеснения: уже открытые файлы удаление не прерывает
+        file = open(self.directory / name, "rb")
+
+        with self._directory_lock():
+            entries = sorted(self._entries())
+            total = sum(size for _, _, size in entries)
+            for _, evicted, size in entries:
+                if total <= self.max_bytes:
+                    break
+                if evicted == name:
+                    continue
+                try:
+                    (self.directory / evicted).unlink()
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+        return file
+
+    def stats(self) -> Dict[str, Any]:
+        self._prepare()
+        entries = self._entries()
+        total = self.hits + self.misses
+        return {
+            "directory": str(self.directory),
+            "files": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def _touch(path: Union[str, Path]) -> None:
+    """Время использования файла кэша: точные часы, а не грубые часы ядра"""
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def check_private_dir(path: Path) -> None:
+    """Каталог принадлежит пользователю процесса и закрыт для остальных (POSIX)
+
+    Каталог, доступный другим на запись, отклоняется: в нем могли
+    подменить файлы. Права каталога пользователя сужаются до 0700.
+    """
+    if os.name != "posix":
+        return
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise PermissionError(
+            f"Каталог кэша документов {path} должен принадлежать текущему пользователю "
+            "и быть закрыт на запись для остальных"
+        )
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+class DocumentRenderer:
+    """Рендеринг текста документа в PDF и DOCX через кэш (None - без кэша)"""
+
+    def __init__(self, cache: Optional[RenderCache] = None, font_path: str = ""):
+        self.cache = cache
+        self.font = find_font(font_path)
+
+    def available(self, file_format: str) -> bool:
+        if file_format == "pdf":
+            return HAS_FPDF and self.font is not None
+        if file_format == "docx":
+            return HAS_DOCX
+        return False
+
+    def render(self, text: str, file_format: str) -> bytes:
+        """Файл документа без обращения к кэшу"""
+        if not self.available(file_format):
+            raise RenderingUnavailableError(self.unavailable_reason(file_format))
+        if file_format == "pdf":
+            return self._render_pdf(text)
+        return self._render_docx(text)
+
+    def open(self, text: str, file_format: str) -> BinaryIO:
+        """Открытый файл документа: из кэша или после рендеринга"""
+        if self.cache is None:
+            return io.BytesIO(self.render(text, file_format))
+        name = f"{self.cache_key(text, file_format)}.{file_format}"
+        file = self.cache.open(name)
+        if file is None:
+            file = self.cache.put(name, self.render(text, file_format))
+        return file
+
+    def cache_key(self, text: str, file_format: str) -> str:
+        digest = hashlib.sha256(f"{file_format}:{RENDER_VERSION}:{self.font}\n".encode("utf-8"))
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def unavailable_reason(self, file_format: str) -> str:
+        if file_format == "pdf" and not HAS_FPDF:
+            return "Формат PDF не поддерживается: не установлен fpdf2"
+        if file_format == "pdf":
+            return "Формат PDF не поддерживается: не найден шрифт с кириллицей (DOCUMENT_FONT_PATH)"
+        if file_format == "docx":
+            return "Формат DOCX не поддерживается: не установлен python-docx"
+        return f"Неизвестный формат {file_format}"
+
+    def _render_pdf(self, text: str) -> bytes:
+        from fpdf import FPDF
+
+        pdf = FPDF(format="A4")
+        pdf.set_margins(MARGIN, MARGIN, MARGIN)
+        pdf.set_auto_page_break(True, MARGIN)
+        pdf.add_font("mono", fname=str(self.font))
+        pdf.set_font("mono", size=FONT_SIZE)
+        pdf.add_page()
+        pdf.multi_cell(0, LINE_HEIGHT, text)
+        return bytes(pdf.output())
+
+    def _render_docx(self, text: str) -> bytes:
+        import docx
+        from docx.shared import Pt
+
+        document = docx.Document()
+        style = document.styles["Normal"]
+        style.font.name = DOCX_FONT
+        style.font.size = Pt(FONT_SIZE)
+        style.paragraph_format.space_before = Pt(0)
+        style.paragraph_format.space_after = Pt(0)
+        for line in text.split("\n"):
+            document.add_paragraph(line)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
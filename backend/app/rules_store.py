@@ -0,0 +1,117 @@
+"""
+Общее хранилище правил законодательства с перезагрузкой при изменении файла
+
+Файл правил читается один раз; далее при обращении не чаще раза в
+check_interval секунд сравнивается его подпись (inode, размер, mtime).
+Новая версия разбирается одним потоком и подменяет снимок целиком,
+остальные запросы в это время продолжают работать со старым снимком.
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from .cache import file_signature
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = Path(__file__).parent.parent / "data" / "renovation_rules.json"
+
+# Минимальный интервал между проверками файла, секунды
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+class RulesSnapshot(NamedTuple):
+    """Неизменяемый снимок правил: номер версии и разобранный JSON"""
+
+    version: int
+    data: Dict[str, Any]
+
+
+class RulesStore:
+    """Версионированные правила с дешевой проверкой изменений файла"""
+
+    def __init__(
+        self,
+        path: Path = RULES_PATH,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._clock = clock
+        self._reload_lock = threading.Lock()
+        self._signature = file_signature(self.path)
+        # Первичная загрузка: ошибка в файле правил не дает запустить сервер
+        self._snapshot = RulesSnapshot(version=1, data=self._load())
+        self._checked_at = clock()
+        self.reloads = 0
+        self.failed_reloads = 0
+
+    def _load(self) -> Dict[str, Any]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def snapshot(self) -> RulesSnapshot:
+        """Актуальный снимок правил (при необходимости - после перезагрузки)"""
+        now = self._clock()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            if file_signature(self.path) != self._signature:
+                self._reload()
+        return self._snapshot
+
+    def _reload(self) -> None:
+        # Перезагрузку выполняет один поток, остальные не ждут его
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            signature = file_signature(self.path)
+            if signature == self._signature:
+                return
+            # Подпись запоминается и при ошибке: файл разбирается снова
+            # только после нового изменения
+            self._signature = signature
+            try:
+                data = self._load()
+            except (OSError, ValueError) as e:
+                self.failed_reloads += 1
+                logger.error(
+                    f"Failed to reload rules from {self.path}, keeping version "
+                    f"{self._snapshot.version}: {e}"
+                )
+                return
+            self._snapshot = RulesSnapshot(version=self._snapshot.version + 1, data=data)
+            self.reloads += 1
+            logger.info(f"Rules reloaded from {self.path}, version {self._snapshot.version}")
+        finally:
+            self._reload_lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self._snapshot.version,
+            "reloads": self.reloads,
+            "failedReloads": self.failed_reloads,
+        }
+
+
+_shared_store: Optional[RulesStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_rules_store() -> RulesStore:
+    """Общее хранилище правил процесса (создается при первом обращении)"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = RulesStore(RULES_PATH, check_interval=settings.rules_check_interval)
+    return _shared_store
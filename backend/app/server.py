@@ -0,0 +1,252 @@
+"""
+Продакшн-запуск: предзагрузка в родительском процессе и fork рабочих
+
+    python -m app.server
+
+Родительский процесс импортирует приложение (анализатор, правила,
+таблицу вердиктов, скомпилированные шаблоны документов), замораживает
+созданные объекты для сборщика мусора (gc.freeze - иначе обход
+поколений записывает в каждый объект и страницы копируются) и
+открывает слушающий сокет. Рабочие процессы создаются fork и делят
+эти страницы памяти copy-on-write; соединения между ними распределяет
+ядро на общем сокете.
+
+Рабочий процесс завершается штатно (незавершенные запросы дорабатываются)
+после SERVER_MAX_REQUESTS запросов или при превышении SERVER_MAX_MEMORY_MB
+резидентной памяти; родитель сразу запускает замену. SIGTERM/SIGINT
+останавливают все процессы, SIGHUP по очереди перезапускает рабочие.
+
+Кэши анализа и сессии редактора у каждого процесса свои; очередь
+заданий и кэш рендеринга общие (файлы). Без явной настройки лимиты
+запросов переводятся на общее хранилище shm://, а пул пакетного анализа
+делит ядра между рабочими процессами.
+"""
+
+import gc
+import logging
+import os
+import random
+import resource
+import signal
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from .config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+# Рабочий процесс, завершившийся быстрее, перезапускается с паузой
+MIN_WORKER_LIFETIME = 1.0
+
+
+def current_rss() -> int:
+    """Резидентная память процесса в байтах"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Не Linux: пиковое значение (Linux - КиБ, macOS - байты)
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if os.uname().sysname == "Darwin" else usage * 1024
+
+
+def configure_for_workers(config: Settings, workers: int) -> None:
+    """Настройки по умолчанию, зависящие от числа рабочих процессов
+
+    Меняются только значения, не заданные в окружении или .env.
+    """
+    if workers <= 1:
+        return
+    if "rate_limit_storage_uri" not in config.model_fields_set:
+        config.rate_limit_storage_uri = "shm://"
+    if "batch_workers" not in config.model_fields_set:
+        config.batch_workers = max(1, (os.cpu_count() or 1) // workers)
+
+
+def create_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class MemoryWatchdog(threading.Thread):
+    """Штатная остановка сервера рабочего процесса при превышении памяти"""
+
+    def __init__(self, server: uvicorn.Server, max_bytes: int, interval: float):
+        super().__init__(name="memory-watchdog", daemon=True)
+        self.server = server
+        self.max_bytes = max_bytes
+        self.interval = interval
+
+    def run(self) -> None:
+        while not self.server.should_exit:
+            rss = current_rss()
+            if rss > self.max_bytes:
+                logger.info(f"Worker {os.getpid()} uses {rss // 2 ** 20} MiB, recycling")
+                self.server.should_exit = True
+                return
+            time.sleep(self.interval)
+
+
+class PreforkServer:
+    """Родительский процесс: сокет, запуск и замена рабочих процессов"""
+
+    def __init__(self, app, config: Settings, workers: int):
+        self.app = app
+        self.config = config
+        self.workers = max(1, workers)
+        self.children: Dict[int, float] = {}  # pid - время запуска
+        self.sock: Optional[socket.socket] = None
+        self._stopping = False
+        self._recycle = False
+
+    def run(self) -> None:
+        self.sock = create_socket(
+            self.config.api_host, self.config.api_port, self.config.server_backlog
+        )
+        # Объекты, созданные при импорте, больше не обходятся сборщиком мусора
+        gc.collect()
+        gc.freeze()
+        logger.info(
+            f"Listening on {self.config.api_host}:{self.config.api_port}, "
+            f"{self.workers} workers (master {os.getpid()})"
+        )
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_recycle)
+
+        for _ in range(self.workers):
+            self._spawn()
+        try:
+            while self.children:
+                self._reap()
+                if self._recycle:
+                    self._recycle = False
+                    self._recycle_all()
+                if not self._stopping:
+                    while len(self.children) < self.workers:
+                        self._spawn()
+                time.sleep(0.2)
+        finally:
+            self.sock.close()
+        logger.info("Server stopped")
+
+    def _handle_stop(self, signum, frame) -> None:
+        if not self._stopping:
+            self._stopping = True
+            logger.info("Stopping workers")
+            self._signal_children(signal.SIGTERM)
+
+    def _handle_recycle(self, signum, frame) -> None:
+        self._recycle = True
+
+    def _signal_children(self, signum: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self) -> None:
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and not self._stopping:
+                logger.warning(f"Worker {pid} exited with code {code}")
+            if not self._stopping and time.monotonic() - started < MIN_WORKER_LIFETIME:
+                # Процесс падает при запуске: не перезапускаем в цикле без паузы
+                time.sleep(MIN_WORKER_LIFETIME)
+
+    def _recycle_all(self) -> None:
+        """Поочередная замена рабочих процессов: остальные продолжают обслуживать"""
+        for pid in list(self.children):
+            if self._stopping:
+                return
+            self._spawn()
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                continue
+            while pid in self.children and not self._stopping:
+                self._reap()
+                time.sleep(0.1)
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return
+        code = 0
+        try:
+            self._run_worker()
+        except BaseException:
+            logger.exception(f"Worker {os.getpid()} failed")
+            code = 1
+        finally:
+            logging.shutdown()
+            os._exit(code)
+
+    def _run_worker(self) -> None:
+        # Состояние генератора скопировано из родителя: у каждого процесса свое
+        random.seed()
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, signal.SIG_DFL)
+
+        max_requests = self.config.server_max_requests
+        if max_requests and self.config.server_max_requests_jitter:
+            max_requests += random.randint(0, self.config.server_max_requests_jitter)
+        server = uvicorn.Server(
+            uvicorn.Config(
+                self.app,
+                limit_max_requests=max_requests or None,
+                timeout_graceful_shutdown=self.config.server_graceful_timeout,
+                proxy_headers=True,
+                log_config=None,
+            )
+        )
+        if self.config.server_max_memory_mb:
+            MemoryWatchdog(
+                server,
+                self.config.server_max_memory_mb * 2**20,
+                self.config.server_memory_check_interval,
+            ).start()
+        logger.info(f"Worker {os.getpid()} started")
+        server.run(sockets=[self.sock])
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    workers = settings.server_worker_count
+    configure_for_workers(settings, workers)
+
+    # Предзагрузка: правила, анализатор, шаблоны и таблицы создаются при импорте
+    started = time.perf_counter()
+    from .main import app
+
+    logger.info(f"Application preloaded in {time.perf_counter() - started:.2f}s")
+
+    PreforkServer(app, settings, workers).run()
+
+
+if __name__ == "__main__":
+    main()
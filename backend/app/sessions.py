@@ -0,0 +1,216 @@
+"""
+Инкрементальный анализ плана в сессиях редактора
+
+Сессия хранит последний план и предупреждения по каждому действию и
+помещению. При изменении одного действия или помещения пересчитываются
+только затронутые проверки.
+После перезагрузки правил все проверки сессии пересчитываются заново.
+"""
+
+import threading
+import uuid
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+
+from .analyzer import RenovationAnalyzer
+from .cache import LRUCache
+from .geometry import PlanGeometry
+from .models import Action, AnalysisResult, PlanDelta, RenovationPlan, Room, RoomType, Warning
+
+BATHROOM_TYPES = (RoomType.BATHROOM, RoomType.TOILET)
+
+
+class AnalysisSession:
+    """Состояние инкрементального анализа одного плана"""
+
+    def __init__(self, analyzer: RenovationAnalyzer, plan: RenovationPlan):
+        self.analyzer = analyzer
+        self.plan = plan
+        self.version = 0
+        self._lock = threading.Lock()
+
+        # Геометрический индекс плана: стены в сессии не меняются
+        self._geometry = PlanGeometry(plan.originalPlan)
+
+        with analyzer.pinned_rules() as snapshot:
+            # Версия правил, по которой посчитаны сохраненные предупреждения
+            self._rules_version = snapshot.version
+            self._actions: List[Action] = list(plan.actions)
+            self._action_warnings: List[List[Warning]] = [
+                analyzer.check_action(action, plan, self._geometry) for action in self._actions
+            ]
+
+            self._rooms: Dict[str, Room] = {}
+            self._room_warnings: Dict[str, List[Warning]] = {}
+            # Число помещений с вентиляцией: санузлы и кухни
+            self._bathroom_vents = 0
+            self._kitchen_vents = 0
+            for room in plan.originalPlan.rooms:
+                if room.id in self._rooms:
+                    raise ValueError(f"Duplicate room id '{room.id}'")
+                self._add_room(room)
+
+    def _add_room(self, room: Room) -> None:
+        self._rooms[room.id] = room
+        self._room_warnings[room.id] = self.analyzer.check_room(room)
+        self._count_ventilation(room, 1)
+
+    def _count_ventilation(self, room: Room, sign: int) -> None:
+        if not room.hasVentilation:
+            return
+        if room.type in BATHROOM_TYPES:
+            self._bathroom_vents += sign
+        elif room.type == RoomType.KITCHEN:
+            self._kitchen_vents += sign
+
+    def _recheck_if_rules_changed(self, version: int) -> None:
+        """Полный пересчет сохраненных предупреждений по новой версии правил"""
+        if version == self._rules_version:
+            return
+        self._action_warnings = [
+            self.analyzer.check_action(action, self.plan, self._geometry)
+            for action in self._actions
+        ]
+        self._room_warnings = {
+            room_id: self.analyzer.check_room(room) for room_id, room in self._rooms.items()
+        }
+        self._rules_version = version
+
+    def apply(self, delta: PlanDelta) -> AnalysisResult:
+        """Применение одного изменения и пересчет затронутых проверок"""
+        with self._lock, self.analyzer.pinned_rules() as snapshot:
+            self._recheck_if_rules_changed(snapshot.version)
+            if delta.target == "action":
+                self._apply_action_delta(delta)
+            else:
+                self._apply_room_delta(delta)
+            self.version += 1
+            return self._result()
+
+    def _apply_action_delta(self, delta: PlanDelta) -> None:
+        size = len(self._actions)
+
+        if delta.op == "add":
+            if delta.action is None:
+                raise ValueError("Field 'action' is required to add an action")
+            index = size if delta.index is None else delta.index
+            if not 0 <= index <= size:
+                raise ValueError(f"Action index {index} is out of range")
+            self._actions.insert(index, delta.action)
+            self._action_warnings.insert(
+                index, self.analyzer.check_action(delta.action, self.plan, self._geometry)
+            )
+            return
+
+        if delta.index is None or not 0 <= delta.index < size:
+            raise ValueError(f"Action index {delta.index} is out of range")
+
+        if delta.op == "remove":
+            del self._actions[delta.index]
+            del self._action_warnings[delta.index]
+        else:
+            if delta.action is None:
+                raise ValueError("Field 'action' is required to update an action")
+            self._actions[delta.index] = delta.action
+            self._action_warnings[delta.index] = self.analyzer.check_action(
+                delta.action, self.plan, self._geometry
+            )
+
+    def _apply_room_delta(self, delta: PlanDelta) -> None:
+        if delta.op == "add":
+            if delta.room is None:
+                raise ValueError("Field 'room' is required to add a room")
+            if delta.room.id in self._rooms:
+                raise ValueError(f"Room '{delta.room.id}' already exists")
+            self._add_room(delta.room)
+            return
+
+        # roomId - заменяемое помещение: новое значение может сменить его id
+        room_id = delta.roomId
+        if room_id is None and delta.room is not None:
+            room_id = delta.room.id
+        if room_id is None:
+            raise ValueError("Field 'room' or 'roomId' is required")
+        old_room = self._rooms.get(room_id)
+        if old_room is None:
+            raise ValueError(f"Room '{room_id}' not found")
+
+        if delta.op == "remove":
+            self._count_ventilation(old_room, -1)
+            del self._rooms[room_id]
+            del self._room_warnings[room_id]
+            return
+
+        room = delta.room
+        if room is None:
+            raise ValueError("Field 'room' is required to update a room")
+        if room.id != room_id and room.id in self._rooms:
+            raise ValueError(f"Room '{room.id}' already exists")
+        self._count_ventilation(old_room, -1)
+        warnings = self.analyzer.check_room(room)
+        if room.id == room_id:
+            # Замена значения сохраняет позицию помещения в плане
+            self._rooms[room_id] = room
+            self._room_warnings[room_id] = warnings
+        else:
+            # Смена id: словари пересобираются в прежнем порядке помещений
+            self._rooms = {
+                room.id if key == room_id else key: room if key == room_id else value
+                for key, value in self._rooms.items()
+            }
+            self._room_warnings = {
+                room.id if key == room_id else key: warnings if key == room_id else value
+                for key, value in self._room_warnings.items()
+            }
+        self._count_ventilation(room, 1)
+
+    def result(self) -> AnalysisResult:
+        """Текущий результат анализа сессии"""
+        with self._lock, self.analyzer.pinned_rules() as snapshot:
+            self._recheck_if_rules_changed(snapshot.version)
+            return self._result()
+
+    def _result(self) -> AnalysisResult:
+        # Порядок предупреждений совпадает с полным анализом
+        warnings = list(chain.from_iterable(self._action_warnings))
+        warnings.extend(
+            self.analyzer.check_ventilation(self._bathroom_vents > 0, self._kitchen_vents > 0)
+        )
+        warnings.extend(chain.from_iterable(self._room_warnings.values()))
+        return self.analyzer.build_result(self.plan, warnings)
+
+    def current_plan(self) -> RenovationPlan:
+        """Текущий план с учетом всех примененных изменений"""
+        with self._lock:
+            floor_plan = self.plan.originalPlan.model_copy(
+                update={"rooms": list(self._rooms.values())}
+            )
+            return self.plan.model_copy(
+                update={"originalPlan": floor_plan, "actions": list(self._actions)}
+            )
+
+
+class SessionStore:
+    """Хранилище сессий с ограничением числа и временем жизни"""
+
+    def __init__(self, analyzer: RenovationAnalyzer, maxsize: int, ttl: Optional[float]):
+        self.analyzer = analyzer
+        self._sessions = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def create(self, plan: RenovationPlan) -> Tuple[str, AnalysisSession]:
+        """Создание сессии с полным первичным анализом"""
+        session = AnalysisSession(self.analyzer, plan)
+        session_id = uuid.uuid4().hex
+        self._sessions.set(session_id, session)
+        return session_id, session
+
+    def get(self, session_id: str) -> Optional[AnalysisSession]:
+        """Получение сессии (продлевает срок жизни при обращении)"""
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.set(session_id, session)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        """Удаление сессии"""
+        return self._sessions.pop(session_id)
@@ -0,0 +1,54 @@
+"""
+Потоковый ввод и вывод NDJSON (JSON, разделенный переводами строк)
+"""
+
+from typing import AsyncIterable, AsyncIterator
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class LineTooLongError(ValueError):
+    """Строка входного потока превышает допустимый размер"""
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    """Разбиение потока байтов на непустые строки без буферизации всего тела"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        search_from = len(buffer)
+        buffer += chunk
+        line_start = 0
+        while True:
+            end = buffer.find(b"\n", search_from)
+            if end < 0:
+                break
+            line = bytes(buffer[line_start:end])
+            if line.strip():
+                yield line
+            line_start = search_from = end + 1
+        del buffer[:line_start]
+        if len(buffer) > max_line_bytes:
+            raise LineTooLongError(f"Строка превышает {max_line_bytes} байт")
+    if buffer.strip():
+        yield bytes(buffer)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Потоковый ответ, читающий тело запроса во время отправки
+
+    Стандартный StreamingResponse параллельно ждет http.disconnect через
+    receive() и перехватил бы сообщения с телом запроса. Здесь тело читает
+    сам генератор ответа; разрыв соединения обнаруживается при чтении
+    (ClientDisconnect).
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,152 @@
+"""
+Компилируемые шаблоны документов
+
+Тексты документов хранятся в data/templates/*.txt и редактируются без
+изменения кода. Подстановка записывается как {имя_поля}, фигурные скобки
+в самом тексте удваиваются: {{ и }}.
+
+Шаблон разбирается один раз при загрузке на статические фрагменты и места
+подстановки и компилируется в функцию render(*, поле=...), которая склеивает
+готовые фрагменты со значениями за одну операцию - как f-строка, записанная
+в коде. Шаблон без подстановок (в том числе после bind) возвращает готовую
+строку.
+"""
+
+from keyword import iskeyword
+from pathlib import Path
+from string import Formatter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple, Union
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "data" / "templates"
+TEMPLATE_SUFFIX = ".txt"
+
+# Фрагмент шаблона: (текст, None) или (None, имя поля)
+Segment = Tuple[Optional[str], Optional[str]]
+
+
+class TemplateError(ValueError):
+    """Ошибка в тексте шаблона или в наборе его полей"""
+
+
+def _is_field_name(name: str) -> bool:
+    return name.isidentifier() and not iskeyword(name)
+
+
+def _parse(name: str, source: str) -> List[Segment]:
+    """Разбор текста на статические фрагменты и поля подстановки"""
+    segments: List[Segment] = []
+    try:
+        parsed = list(Formatter().parse(source))
+    except ValueError as e:
+        raise TemplateError(f"Шаблон {name}: {e}") from None
+
+    for literal, field, spec, conversion in parsed:
+        if literal:
+            segments.append((literal, None))
+        if field is None:
+            continue
+        if not _is_field_name(field) or spec or conversion:
+            raise TemplateError(f"Шаблон {name}: недопустимая подстановка {{{field}}}")
+        segments.append((None, field))
+    return segments
+
+
+def _merge(segments: Iterable[Segment]) -> Tuple[Segment, ...]:
+    """Склейка соседних статических фрагментов"""
+    merged: List[Segment] = []
+    for text, field in segments:
+        if field is None and merged and merged[-1][1] is None:
+            merged[-1] = (merged[-1][0] + text, None)
+        elif field is not None or text:
+            merged.append((text, field))
+    return tuple(merged)
+
+
+def _compile(
+    name: str, segments: Tuple[Segment, ...], fields: FrozenSet[str]
+) -> Callable[..., str]:
+    """Функция отрисовки: статические фрагменты - константы, поля - аргументы
+
+    Текст шаблона попадает в код только через repr(), имена полей проверены
+    как идентификаторы, поэтому содержимое файла не исполняется.
+    """
+    body = (
+        " ".join(repr(text) if field is None else f'f"{{{field}}}"' for text, field in segments)
+        or "''"
+    )
+    params = f"*, {', '.join(sorted(fields))}" if fields else ""
+    source = f"def render({params}):\n    return ({body})\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<template {name}>", "exec"), namespace)
+    return namespace["render"]
+
+
+class DocumentTemplate:
+    """Скомпилированный шаблон документа
+
+    fields - поля, которые принимает render; шаблон может использовать
+    любое их подмножество, обращение к другим полям - TemplateError.
+    """
+
+    __slots__ = ("name", "fields", "segments", "render")
+
+    def __init__(
+        self, name: str, source: Union[str, Iterable[Segment]], fields: Iterable[str] = ()
+    ):
+        self.name = name
+        self.fields = frozenset(fields)
+        invalid = [field for field in self.fields if not _is_field_name(field)]
+        if invalid:
+            raise TemplateError(
+                f"Шаблон {name}: недопустимые имена полей {', '.join(sorted(invalid))}"
+            )
+
+        self.segments = _merge(_parse(name, source) if isinstance(source, str) else source)
+        unknown = self.used_fields - self.fields
+        if unknown:
+            raise TemplateError(
+                f"Шаблон {name}: неизвестные поля {', '.join(sorted(unknown))}; "
+                f"доступны: {', '.join(sorted(self.fields)) or 'нет'}"
+            )
+        self.render: Callable[..., str] = _compile(name, self.segments, self.fields)
+
+    @property
+    def used_fields(self) -> FrozenSet[str]:
+        """Поля, которые встречаются в тексте шаблона"""
+        return frozenset(field for _, field in self.segments if field is not None)
+
+    @property
+    def is_static(self) -> bool:
+        """Шаблон без подстановок: render() возвращает готовую строку"""
+        return not self.used_fields
+
+    def bind(self, **values: Any) -> "DocumentTemplate":
+        """Новый шаблон, в котором переданные поля уже подставлены в текст"""
+        return DocumentTemplate(
+            self.name,
+            (
+                (f"{values[field]}", None) if field in values else (text, field)
+                for text, field in self.segments
+            ),
+            self.fields - values.keys(),
+        )
+
+
+def load_template(
+    name: str, fields: Iterable[str] = (), directory: Path = TEMPLATES_DIR
+) -> DocumentTemplate:
+    """Загрузка и компиляция шаблона <directory>/<name>.txt"""
+    path = Path(directory) / f"{name}{TEMPLATE_SUFFIX}"
+    try:
+        source = path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise TemplateError(f"Шаблон {name} не загружен: {e}") from None
+    # Завершающий перевод строки файла не относится к тексту документа
+    return DocumentTemplate(name, source.rstrip("\n"), fields)
+
+
+def load_templates(
+    fields: Mapping[str, Iterable[str]], directory: Path = TEMPLATES_DIR
+) -> Dict[str, DocumentTemplate]:
+    """Загрузка набора шаблонов: {имя шаблона: допустимые поля}"""
+    return {name: load_template(name, allowed, directory) for name, allowed in fields.items()}
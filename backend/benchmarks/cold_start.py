@@ -0,0 +1,130 @@
+"""
+Бенчмарк холодного запуска backend: время до первого ответа
+
+Запускает сервер в новом процессе и измеряет от запуска процесса:
+- до строки готовности на stdout (только режим desktop);
+- до первого успешного ответа GET /health (опрос каждые 5 мс).
+
+Режимы:
+- desktop: python -m app.desktop (запуск настольного приложения);
+- uvicorn: python -m uvicorn app.main:app (прежний запуск из Electron).
+
+Запуск из каталога backend:
+    python -m benchmarks.cold_start --runs 5
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.desktop import READY_PREFIX
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+POLL_INTERVAL = 0.005
+TIMEOUT = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def command(mode: str, port: int) -> List[str]:
+    if mode == "desktop":
+        return [sys.executable, "-m", "app.desktop", "--port", str(port)]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+
+
+def health_ok(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def measure(mode: str, env: dict) -> Tuple[Optional[float], float]:
+    """Время до строки готовности (или None) и до первого ответа, секунды"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command(mode, port),
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        ready = None
+        if mode == "desktop":
+            for line in process.stdout:
+                if line.startswith(READY_PREFIX):
+                    ready = time.perf_counter() - start
+                    break
+            else:
+                raise RuntimeError("Процесс завершился без строки готовности")
+        while not health_ok(port):
+            if process.poll() is not None or time.perf_counter() - start > TIMEOUT:
+                raise RuntimeError(f"Сервер ({mode}) не ответил на /health")
+            time.sleep(POLL_INTERVAL)
+        return ready, time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def report(name: str, values: List[float]) -> None:
+    print(f"{name:<32}{min(values) * 1000:>10.0f}{statistics.median(values) * 1000:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--modes", nargs="+", choices=["desktop", "uvicorn"], default=["desktop", "uvicorn"]
+    )
+    args = parser.parse_args()
+
+    # Отдельные файлы очереди и лимитов: запуски не мешают работающему серверу
+    workdir = tempfile.mkdtemp(prefix="cold-start-")
+    env = {
+        **os.environ,
+        "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "PYTHONUNBUFFERED": "1",
+    }
+
+    print(f"{args.runs} runs, {sys.executable}")
+    print(f"{'':<32}{'min,ms':>10}{'median,ms':>12}")
+    for mode in args.modes:
+        measure(mode, env)  # прогрев файлового кэша ОС
+        results = [measure(mode, env) for _ in range(args.runs)]
+        if mode == "desktop":
+            report(f"{mode}: ready line", [ready for ready, _ in results])
+        report(f"{mode}: first /health response", [first for _, first in results])
+
+
+if __name__ == "__main__":
+    main()
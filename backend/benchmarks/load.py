@@ -0,0 +1,358 @@
+"""
+Нагрузочный прогон API: воспроизведение записанной или синтетической смеси запросов
+
+Смесь по умолчанию - /api/analyze, /api/quick-check, /api/generate-document
+и /api/rules (с категориями) в пропорции --mix. Планы синтетические
+(benchmarks.plans, от комнаты до этажа на 100 помещений); --unique-plans
+задает число разных планов - от него зависит доля попаданий в кэш анализа.
+
+Запросы выполняются --concurrency параллельными клиентами до --requests
+запросов или --duration секунд. Цель - приложение в этом же процессе (без
+сети, lifespan не запускается: очередь заданий не нужна) или работающий
+сервер по --url. Отчет по каждому эндпоинту: число запросов, пропускная
+способность, задержки p50/p95/p99 и доля ошибок (статус 4xx/5xx или сбой
+соединения), отдельно - доля ответов 429.
+
+Лимиты запросов: --no-rate-limit отключает их в процессе; сервер для
+прогона по --url запускается с RATE_LIMIT_ENABLED=false.
+
+Запись трафика (NDJSON, строка - {"endpoint", "method", "path", "body"}):
+--record сохраняет синтетическую смесь, --replay воспроизводит файл -
+записанный здесь или собранный из журнала реальных запросов.
+
+Запуск из каталога backend:
+    python -m benchmarks.load --requests 2000 --concurrency 32 --no-rate-limit
+    python -m benchmarks.load --url http://127.0.0.1:8000 --duration 60 --concurrency 64
+    python -m benchmarks.load --record traffic.ndjson --requests 5000
+    python -m benchmarks.load --replay traffic.ndjson --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, get_args
+
+import httpx
+
+from app.analyzer import RenovationAnalyzer
+from app.models import DocumentType, RenovationPlan
+from app.rules_store import RULES_PATH
+from benchmarks.plans import SIZES, generate_plan
+from benchmarks.suite import APARTMENT, OWNER
+
+ENDPOINTS = ("analyze", "quick-check", "generate-document", "rules")
+DEFAULT_MIX = "analyze=5,quick-check=3,generate-document=1,rules=1"
+# Размеры планов в синтетическом трафике и их доли
+PLAN_SIZES = {"room": 2, "apartment": 6, "floor": 1}
+
+
+class LoadRequest(NamedTuple):
+    """Запрос трафика; endpoint - имя строки отчета"""
+
+    endpoint: str
+    method: str
+    path: str
+    body: Optional[Any] = None
+
+
+class EndpointStats:
+    """Задержки и статусы ответов одного эндпоинта"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()  # код ответа, 0 - сбой соединения
+        self.errors = 0
+
+    def add(self, latency: float, status: int) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] += 1
+        if status == 0 or status >= 400:
+            self.errors += 1
+
+    def merge(self, other: "EndpointStats") -> None:
+        self.latencies.extend(other.latencies)
+        self.statuses.update(other.statuses)
+        self.errors += other.errors
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "rps": count / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "error_rate": self.errors / count if count else 0.0,
+            "rate_limited": self.statuses[429] / count if count else 0.0,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+        }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """ "analyze=5,rules=1" -> доли эндпоинтов"""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(
+                f"Неизвестный эндпоинт в смеси: {name} (доступны: {', '.join(ENDPOINTS)})"
+            )
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("В смеси нет эндпоинтов с ненулевой долей")
+    return mix
+
+
+def synthetic_traffic(
+    count: int, mix: Dict[str, float], seed: int = 0, unique_plans: int = 50
+) -> List[LoadRequest]:
+    """count запросов синтетической смеси; результат зависит только от аргументов"""
+    rng = random.Random(seed)
+    sizes = rng.choices(list(PLAN_SIZES), list(PLAN_SIZES.values()), k=max(1, unique_plans))
+    plans = [generate_plan(SIZES[size], seed=seed + i) for i, size in enumerate(sizes)]
+    with open(RULES_PATH, encoding="utf-8") as f:
+        rule_paths = ["/api/rules"] + [
+            f"/api/rules/{category}" for category in sorted(json.load(f)["rules"])
+        ]
+
+    # Анализ для документов считается один раз на план
+    analyzer = RenovationAnalyzer()
+    analyses: Dict[int, dict] = {}
+
+    def analysis(index: int) -> dict:
+        if index not in analyses:
+            result = analyzer.analyze(RenovationPlan.model_validate(plans[index]))
+            analyses[index] = result.model_dump(mode="json")
+        return analyses[index]
+
+    endpoints = list(mix)
+    weights = list(mix.values())
+    traffic = []
+    for _ in range(count):
+        endpoint = rng.choices(endpoints, weights)[0]
+        index = rng.randrange(len(plans))
+        if endpoint == "analyze":
+            traffic.append(LoadRequest(endpoint, "POST", "/api/analyze", plans[index]))
+        elif endpoint == "quick-check":
+            traffic.append(
+                LoadRequest(
+                    endpoint, "POST", "/api/quick-check", rng.choice(plans[index]["actions"])
+                )
+            )
+        elif endpoint == "generate-document":
+            traffic.append(
+                LoadRequest(
+                    endpoint,
+                    "POST",
+                    "/api/generate-document",
+                    {
+                        "document_type": rng.choice(get_args(DocumentType)),
+                        "apartment_data": APARTMENT,
+                        "owner_data": OWNER,
+                        "plan": plans[index]["originalPlan"],
+                        "analysis": analysis(index),
+                    },
+                )
+            )
+        else:
+            traffic.append(LoadRequest(endpoint, "GET", rng.choice(rule_paths)))
+    return traffic
+
+
+def load_traffic(path: Path) -> List[LoadRequest]:
+    """Трафик из NDJSON; без поля endpoint строкой отчета служит путь"""
+    traffic = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            traffic.append(
+                LoadRequest(
+                    item.get("endpoint") or item["path"],
+                    item.get("method", "GET").upper(),
+                    item["path"],
+                    item.get("body"),
+                )
+            )
+    return traffic
+
+
+def save_traffic(path: Path, traffic: List[LoadRequest]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for request in traffic:
+            f.write(json.dumps(request._asdict(), ensure_ascii=False) + "\n")
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    traffic: List[LoadRequest],
+    concurrency: int,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Прогон трафика по кругу: до requests запросов и/или duration секунд
+    (без ограничений - один проход по трафику)
+    """
+    if requests is None and duration is None:
+        requests = len(traffic)
+    stats: Dict[str, EndpointStats] = {}
+    issued = 0
+    started = time.perf_counter()
+    deadline = started + duration if duration is not None else None
+
+    async def worker() -> None:
+        nonlocal issued
+        while (requests is None or issued < requests) and (
+            deadline is None or time.perf_counter() < deadline
+        ):
+            request = traffic[issued % len(traffic)]
+            issued += 1
+            begin = time.perf_counter()
+            try:
+                response = await client.request(request.method, request.path, json=request.body)
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            stats.setdefault(request.endpoint, EndpointStats()).add(
+                time.perf_counter() - begin, status
+            )
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+
+    total = EndpointStats()
+    for endpoint_stats in stats.values():
+        total.merge(endpoint_stats)
+    return {
+        "elapsed": elapsed,
+        "concurrency": concurrency,
+        "endpoints": {name: stats[name].summary(elapsed) for name in sorted(stats)},
+        "total": total.summary(elapsed),
+    }
+
+
+def report(result: Dict[str, Any]) -> None:
+    print(
+        f"{result['total']['requests']} requests in {result['elapsed']:.1f}s, "
+        f"concurrency {result['concurrency']}"
+    )
+    print(
+        f"{'':<28}{'requests':>10}{'req/s':>10}{'p50,ms':>10}{'p95,ms':>10}{'p99,ms':>10}"
+        f"{'errors':>9}{'429':>8}"
+    )
+    rows = list(result["endpoints"].items()) + [("total", result["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<28}{row['requests']:>10}{row['rps']:>10.1f}"
+            f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            f"{row['error_rate']:>9.1%}{row['rate_limited']:>8.1%}"
+        )
+
+
+def client_for(url: Optional[str], concurrency: int, timeout: float) -> httpx.AsyncClient:
+    """Клиент работающего сервера или приложения в этом процессе"""
+    if url:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        return httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits)
+    from app.main import app
+
+    return httpx.AsyncClient(app=app, base_url="http://load-test", timeout=timeout)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", help="адрес сервера; без него - приложение в этом процессе")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--requests", type=int, help="число запросов (по умолчанию 1000 или весь файл --replay)"
+    )
+    parser.add_argument("--duration", type=float, help="длительность прогона, секунды")
+    parser.add_argument("--warmup", type=int, default=0, help="запросов до начала замеров")
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help=f"доли эндпоинтов (по умолчанию {DEFAULT_MIX})"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--unique-plans", type=int, default=50)
+    parser.add_argument("--replay", type=Path, help="воспроизвести трафик из NDJSON")
+    parser.add_argument(
+        "--record", type=Path, help="сохранить синтетический трафик в NDJSON и завершиться"
+    )
+    parser.add_argument(
+        "--no-rate-limit", action="store_true", help="отключить лимиты (только в процессе)"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="ожидание ответа, секунды")
+    parser.add_argument("--json", type=Path, help="сохранить отчет в JSON")
+    parser.add_argument(
+        "--max-error-rate", type=float, help="код выхода 1, если доля ошибок больше"
+    )
+    args = parser.parse_args(argv)
+
+    if args.no_rate_limit and args.url:
+        parser.error(
+            "--no-rate-limit работает только в процессе: "
+            "запустите сервер с RATE_LIMIT_ENABLED=false"
+        )
+    if args.replay:
+        traffic = load_traffic(args.replay)
+    else:
+        try:
+            mix = parse_mix(args.mix)
+        except ValueError as e:
+            parser.error(str(e))
+        traffic = synthetic_traffic(args.requests or 1000, mix, args.seed, args.unique_plans)
+    if args.record:
+        save_traffic(args.record, traffic)
+        print(f"{len(traffic)} requests saved to {args.record}")
+        return 0
+    if not traffic:
+        parser.error("Нет запросов для прогона")
+
+    if not args.url:
+        # Журнал запросов и превышений лимитов не смешивается с отчетом
+        logging.disable(logging.WARNING)
+        if args.no_rate_limit:
+            from app.main import limiter
+
+            limiter.enabled = False
+
+    async def run() -> Dict[str, Any]:
+        async with client_for(args.url, args.concurrency, args.timeout) as client:
+            if args.warmup:
+                await run_load(client, traffic, args.concurrency, requests=args.warmup)
+            requests = args.requests or (None if args.duration else len(traffic))
+            return await run_load(client, traffic, args.concurrency, requests, args.duration)
+
+    result = asyncio.run(run())
+    report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if args.max_error_rate is not None and result["total"]["error_rate"] > args.max_error_rate:
+        print(f"\nError rate {result['total']['error_rate']:.1%} exceeds {args.max_error_rate:.1%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Генератор синтетических планов для бенчмарков
+
+План - сетка помещений (прямоугольники разной ширины и глубины) в
+координатах, мм. Каждая сторона помещения - отдельная стена: наружный
+контур и каждая третья внутренняя ось несущие, остальное - перегородки.
+Помещения получают тип, площадь по размерам ячейки, контур, дверь во
+внутренней стене и окно в наружной. Действия покрывают все типы
+перепланировки; перенос двери задан точкой без wallId (поиск стены по
+пространственной сетке).
+
+Результат зависит только от размеров и seed: одинаковые аргументы дают
+одинаковый план на любой машине.
+"""
+
+import random
+from typing import Dict, List, NamedTuple, Tuple
+
+# Доли типов помещений (балконы - только у наружной стены)
+ROOM_TYPES = [
+    ("living", 0.45),
+    ("kitchen", 0.15),
+    ("corridor", 0.15),
+    ("bathroom", 0.1),
+    ("toilet", 0.05),
+    ("storage", 0.05),
+    ("balcony", 0.05),
+]
+WET_ROOMS = {"kitchen", "bathroom", "toilet"}
+
+
+class PlanSize(NamedTuple):
+    """Сетка помещений: ряды x столбцы"""
+
+    rows: int
+    cols: int
+
+    @property
+    def rooms(self) -> int:
+        return self.rows * self.cols
+
+    @property
+    def walls(self) -> int:
+        return (self.rows + 1) * self.cols + (self.cols + 1) * self.rows
+
+
+# Размеры от одной комнаты до целого этажа-"муравейника" (~10 000 стен)
+SIZES: Dict[str, PlanSize] = {
+    "room": PlanSize(1, 1),  # 4 стены
+    "apartment": PlanSize(2, 3),  # 17 стен
+    "floor": PlanSize(10, 10),  # 220 стен
+    "walls-10k": PlanSize(56, 88),  # 10 000 стен
+}
+
+
+def _axes(rng: random.Random, count: int, low: int, high: int) -> List[int]:
+    """Координаты осей сетки с шагом от low до high мм (кратно 100)"""
+    axes = [0]
+    for _ in range(count):
+        axes.append(axes[-1] + rng.randrange(low, high + 1, 100))
+    return axes
+
+
+def _room_type(rng: random.Random, exterior: bool) -> str:
+    types, weights = zip(*ROOM_TYPES)
+    room_type = rng.choices(types, weights)[0]
+    return "living" if room_type == "balcony" and not exterior else room_type
+
+
+def generate_plan(size: PlanSize, seed: int = 0, actions: int = 0) -> dict:
+    """
+    Данные запроса анализа (RenovationPlan) для сетки size
+
+    actions - число действий (по умолчанию - по одному на каждые 20
+    помещений, не меньше одного действия каждого типа).
+    """
+    rng = random.Random(seed)
+    xs = _axes(rng, size.cols, 2500, 5500)
+    ys = _axes(rng, size.rows, 2500, 6000)
+
+    walls: List[dict] = []
+    # Стена между узлами сетки: (ось, индекс) -> id
+    horizontal: Dict[Tuple[int, int], str] = {}
+    vertical: Dict[Tuple[int, int], str] = {}
+
+    def add_wall(
+        index: Dict[Tuple[int, int], str],
+        key: Tuple[int, int],
+        outer: bool,
+        bearing_axis: bool,
+        x1: int,
+        y1: int,
+        x2: int,
+        y2: int,
+    ) -> None:
+        bearing = outer or bearing_axis
+        wall_id = f"w{len(walls) + 1}"
+        walls.append(
+            {
+                "id": wall_id,
+                "type": (
+                    "load_bearing"
+                    if bearing
+                    else rng.choice(["non_load_bearing"] * 9 + ["unknown"])
+                ),
+                "x1": x1,
+                "y1": y1,
+                "x2": x2,
+                "y2": y2,
+                "thickness": 400 if outer else 200 if bearing else 100,
+            }
+        )
+        index[key] = wall_id
+
+    for row in range(size.rows + 1):
+        for col in range(size.cols):
+            add_wall(
+                horizontal,
+                (row, col),
+                row in (0, size.rows),
+                row % 3 == 0,
+                xs[col],
+                ys[row],
+                xs[col + 1],
+                ys[row],
+            )
+    for col in range(size.cols + 1):
+        for row in range(size.rows):
+            add_wall(
+                vertical,
+                (col, row),
+                col in (0, size.cols),
+                col % 3 == 0,
+                xs[col],
+                ys[row],
+                xs[col],
+                ys[row + 1],
+            )
+
+    rooms: List[dict] = []
+    doors: List[dict] = []
+    windows: List[dict] = []
+    has_gas = rng.random() < 0.6
+    for row in range(size.rows):
+        for col in range(size.cols):
+            sides = {
+                horizontal[row, col]: row == 0,
+                horizontal[row + 1, col]: row == size.rows - 1,
+                vertical[col, row]: col == 0,
+                vertical[col + 1, row]: col == size.cols - 1,
+            }
+            outer = [wall_id for wall_id, exterior in sides.items() if exterior]
+            inner = [wall_id for wall_id, exterior in sides.items() if not exterior]
+            room_type = _room_type(rng, bool(outer))
+            x1, x2, y1, y2 = xs[col], xs[col + 1], ys[row], ys[row + 1]
+            rooms.append(
+                {
+                    "id": f"r{len(rooms) + 1}",
+                    "type": room_type,
+                    "area": round((x2 - x1) * (y2 - y1) / 1e6, 2),
+                    "hasGas": has_gas and room_type == "kitchen",
+                    "hasVentilation": room_type not in WET_ROOMS or rng.random() < 0.9,
+                    "hasNaturalLight": bool(outer) or room_type not in ("living", "kitchen"),
+                    "polygon": [
+                        {"x": x1, "y": y1},
+                        {"x": x2, "y": y1},
+                        {"x": x2, "y": y2},
+                        {"x": x1, "y": y2},
+                    ],
+                }
+            )
+            if inner:
+                doors.append(
+                    {
+                        "id": f"d{len(doors) + 1}",
+                        "wallId": rng.choice(inner),
+                        "position": round(rng.uniform(0.2, 0.8), 2),
+                        "width": rng.choice([700, 800, 900]),
+                    }
+                )
+            if outer and room_type not in ("corridor", "storage"):
+                windows.append(
+                    {
+                        "id": f"win{len(windows) + 1}",
+                        "wallId": rng.choice(outer),
+                        "position": round(rng.uniform(0.3, 0.7), 2),
+                        "width": rng.choice([1200, 1400, 1800]),
+                    }
+                )
+
+    return {
+        "originalPlan": {
+            "walls": walls,
+            "doors": doors,
+            "windows": windows,
+            "rooms": rooms,
+            "hasGasSupply": has_gas,
+            "floor": rng.randint(1, 16),
+            "totalFloors": 17,
+            "buildingType": rng.choice(["panel", "brick", "monolith"]),
+        },
+        "actions": _actions(rng, walls, xs, ys, actions or max(9, size.rooms // 20)),
+        "description": f"Синтетический план {size.rows}x{size.cols}, seed {seed}",
+    }
+
+
+def _actions(
+    rng: random.Random, walls: List[dict], xs: List[int], ys: List[int], count: int
+) -> List[dict]:
+    """count действий: сначала по одному каждого типа, затем случайные"""
+
+    def remove_wall() -> dict:
+        return {"type": "remove_wall", "data": {"wallId": rng.choice(walls)["id"]}}
+
+    def move_door() -> dict:
+        # Точка на случайной стене: стена находится поиском по сетке
+        wall = rng.choice(walls)
+        t = rng.uniform(0.2, 0.8)
+        return {
+            "type": "move_door",
+            "data": {
+                "x": round(wall["x1"] + (wall["x2"] - wall["x1"]) * t),
+                "y": round(wall["y1"] + (wall["y2"] - wall["y1"]) * t),
+            },
+        }
+
+    def add_wall() -> dict:
+        x = rng.randint(xs[0], xs[-1])
+        return {"type": "add_wall", "data": {"x1": x, "y1": ys[0], "x2": x, "y2": ys[-1]}}
+
+    def combine_rooms() -> dict:
+        types = [room_type for room_type, _ in ROOM_TYPES]
+        first, second = rng.sample(types, 2)
+        return {"type": "combine_rooms", "data": {"room1Type": first, "room2Type": second}}
+
+    def change_window() -> dict:
+        return {"type": "change_window", "data": {"changeSize": rng.random() < 0.5}}
+
+    def simple(action_type: str):
+        return lambda: {"type": action_type, "data": {}}
+
+    makers = [
+        remove_wall,
+        move_door,
+        add_wall,
+        combine_rooms,
+        change_window,
+        simple("move_kitchen"),
+        simple("move_bathroom"),
+        simple("expand_bathroom"),
+        simple("add_balcony_glazing"),
+    ]
+    # Демонтаж стен и перенос дверей - самые частые действия
+    weights = [4, 3, 1, 1, 1, 1, 1, 1, 1]
+    actions = [make() for make in makers[:count]]
+    while len(actions) < count:
+        actions.append(rng.choices(makers, weights)[0]())
+    return actions
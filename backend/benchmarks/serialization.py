@@ -0,0 +1,129 @@
+"""
+Бенчмарк сериализации ответа /api/analyze
+
+Сравнивает стоимость одного ответа в двух режимах:
+- стандартный путь FastAPI: повторная валидация по response_model,
+  jsonable_encoder и json.dumps;
+- быстрый путь (FAST_JSON_RESPONSES): сериализация pydantic-core.
+
+Также измеряется полный запрос через ASGI-приложение (результат анализа
+берется из кэша, поэтому разница определяется сериализацией).
+
+Запуск из каталога backend:
+    python -m benchmarks.serialization --iterations 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.fast_json import FastJSONResponse
+from app.main import analyzer, app, limiter
+from app.models import RenovationPlan
+
+# План с несколькими действиями: ответ содержит длинные списки рекомендаций
+PLAN = {
+    "originalPlan": {
+        "walls": [
+            {
+                "id": f"wall{i}",
+                "type": "load_bearing" if i % 2 else "non_load_bearing",
+                "x1": i * 1000,
+                "y1": 0,
+                "x2": i * 1000,
+                "y2": 3000,
+            }
+            for i in range(6)
+        ],
+        "doors": [],
+        "windows": [],
+        "rooms": [
+            {"id": "room1", "type": "living", "area": 8.5, "hasNaturalLight": False},
+            {"id": "kitchen", "type": "kitchen", "area": 7, "hasVentilation": False},
+            {"id": "bath", "type": "bathroom", "area": 4},
+        ],
+        "hasGasSupply": True,
+    },
+    "actions": [{"type": "remove_wall", "data": {"wallId": f"wall{i}"}} for i in range(6)]
+    + [
+        {"type": "move_kitchen", "data": {}},
+        {"type": "move_bathroom", "data": {}},
+        {"type": "combine_rooms", "data": {"room1Type": "kitchen", "room2Type": "living"}},
+        {"type": "change_window", "data": {"changeSize": True}},
+    ],
+    "description": "Бенчмарк сериализации",
+}
+
+
+def measure(func: Callable[[], object], iterations: int) -> float:
+    """Среднее время вызова, микросекунды"""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def report(name: str, standard: float, fast: float) -> None:
+    print(f"{name:<28}{standard:>12.1f}{fast:>12.1f}{standard / fast:>10.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    result = analyzer.analyze(RenovationPlan.model_validate(PLAN))
+    route = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == "/api/analyze")
+    loop = asyncio.new_event_loop()
+
+    def standard_serialization():
+        content = loop.run_until_complete(
+            serialize_response(field=route.response_field, response_content=result)
+        )
+        return JSONResponse(content).body
+
+    def fast_serialization():
+        return FastJSONResponse(result).body
+
+    assert standard_serialization() == fast_serialization()
+    body_size = len(fast_serialization())
+
+    # Полный запрос: лимиты и журнал запросов отключены, результат берется из кэша
+    limiter.enabled = False
+    logging.disable(logging.INFO)
+    client = TestClient(app)
+
+    def request():
+        response = client.post("/api/analyze", json=PLAN)
+        assert response.status_code == 200
+
+    settings.fast_json_responses = False
+    standard_request = measure(request, args.iterations)
+    settings.fast_json_responses = True
+    fast_request = measure(request, args.iterations)
+
+    print(
+        f"Response size: {body_size} bytes, {len(result.warnings)} warnings, "
+        f"{args.iterations} iterations"
+    )
+    print(f"{'':<28}{'standard,us':>12}{'fast,us':>12}{'speedup':>11}")
+    report(
+        "serialization",
+        measure(standard_serialization, args.iterations),
+        measure(fast_serialization, args.iterations),
+    )
+    report("POST /api/analyze (cached)", standard_request, fast_request)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Набор микробенчмарков с базовыми результатами для поиска регрессий
+
+Случаи (для каждого размера плана из benchmarks.plans.SIZES):
+- analyze[size] - RenovationAnalyzer.analyze целиком;
+- _check_*[size] - каждая проверка анализатора отдельно (геометрический
+  индекс плана построен заранее, как внутри analyze);
+- generate_*[size] - каждый метод DocumentGenerator без кэша разделов
+  (документы, не зависящие от плана, - один случай без размера);
+- RenovationPlan/AnalysisResult.validate_json/dump_json[size] - разбор и
+  сериализация моделей pydantic.
+
+Время случая - минимум из --repeat замеров по timeit, микросекунды на
+вызов. Набор проверяет, что у каждого метода _check_* и generate_* есть
+случай: новый метод без бенчмарка - ошибка.
+
+Запуск из каталога backend:
+    python -m benchmarks.suite                   # только таблица
+    python -m benchmarks.suite --save            # сохранить базу
+    python -m benchmarks.suite --compare         # сравнить с базой
+    python -m benchmarks.suite -k analyze --compare /tmp/main.json
+
+Без пути используется benchmarks/baselines/default.json.
+
+При --compare код выхода 1, если хотя бы один случай медленнее базы
+больше чем на --threshold (доля) и на --min-delta мкс. Базы сравнимы
+только на той же машине и версии Python: перед сравнением ветки
+сохраните базу на основной ветке.
+"""
+
+import argparse
+import inspect
+import json
+import logging
+import platform
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.analyzer import RenovationAnalyzer
+from app.document_generator import DocumentGenerator
+from app.geometry import PlanGeometry
+from app.models import AnalysisResult, RenovationPlan
+from benchmarks.plans import SIZES, generate_plan
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_BASELINE = BASELINES_DIR / "default.json"
+
+Case = Tuple[str, Callable[[], object]]
+
+APARTMENT = {
+    "address": "г. Москва, ул. Тверская, д. 1",
+    "apartment_number": "15",
+    "cadastral_number": "77:01:0001001:1234",
+    "total_area": "54.3",
+}
+OWNER = {
+    "full_name": "Иванов Иван Иванович",
+    "passport_series": "4510",
+    "passport_number": "123456",
+    "passport_issued_by": "ОВД района Тверской г. Москвы",
+    "passport_issued_date": "01.01.2015",
+    "phone": "+7 900 000-00-00",
+    "email": "owner@example.com",
+}
+
+
+def size_cases(
+    analyzer: RenovationAnalyzer, generator: DocumentGenerator, size_name: str, seed: int
+) -> List[Case]:
+    """Случаи, зависящие от плана"""
+    plan_json = json.dumps(generate_plan(SIZES[size_name], seed), ensure_ascii=False)
+    plan = RenovationPlan.model_validate_json(plan_json)
+    result = analyzer.analyze(plan)
+    result_json = result.model_dump_json()
+    geometry = PlanGeometry(plan.originalPlan)
+    suffix = f"[{size_name}]"
+
+    cases: List[Case] = [
+        ("analyze" + suffix, lambda: analyzer.analyze(plan)),
+        (
+            "RenovationPlan.validate_json" + suffix,
+            lambda: RenovationPlan.model_validate_json(plan_json),
+        ),
+        ("RenovationPlan.dump_json" + suffix, plan.model_dump_json),
+        (
+            "AnalysisResult.validate_json" + suffix,
+            lambda: AnalysisResult.model_validate_json(result_json),
+        ),
+        ("AnalysisResult.dump_json" + suffix, result.model_dump_json),
+    ]
+
+    # Проверки действий: первое действие плана каждого типа
+    checked = set()
+    for action_type, checker in analyzer._action_checkers.items():
+        if checker.__name__ in checked:
+            continue
+        checked.add(checker.__name__)
+        action = next(action for action in plan.actions if action.type == action_type)
+        cases.append(
+            (
+                checker.__name__ + suffix,
+                lambda checker=checker, data=action.data: checker(data, plan, geometry),
+            )
+        )
+    cases.append(
+        (
+            "_check_general_requirements" + suffix,
+            lambda: analyzer._check_general_requirements(geometry.plan),
+        )
+    )
+
+    floor_plan = plan.originalPlan
+    cases += [
+        (
+            "generate_application" + suffix,
+            lambda: generator.generate_application(APARTMENT, OWNER, floor_plan, result),
+        ),
+        (
+            "generate_technical_conclusion" + suffix,
+            lambda: generator.generate_technical_conclusion(APARTMENT, floor_plan, result),
+        ),
+    ]
+    return cases
+
+
+def static_cases(generator: DocumentGenerator) -> List[Case]:
+    """Документы, не зависящие от плана"""
+    return [
+        (
+            "generate_completion_act",
+            lambda: generator.generate_completion_act(APARTMENT, OWNER, "01.06.2025"),
+        ),
+        ("generate_bti_application", lambda: generator.generate_bti_application(APARTMENT, OWNER)),
+        ("generate_document_checklist", generator.generate_document_checklist),
+    ]
+
+
+def build_cases(sizes: Iterable[str], seed: int = 0) -> List[Case]:
+    analyzer = RenovationAnalyzer()
+    generator = DocumentGenerator(section_cache_size=0)
+    cases = static_cases(generator)
+    for size_name in sizes:
+        cases += size_cases(analyzer, generator, size_name, seed)
+    return cases
+
+
+def uncovered(cases: Iterable[Case]) -> List[str]:
+    """Методы _check_* и generate_* без случая в наборе"""
+    covered = {name.split("[")[0] for name, _ in cases}
+    methods = [
+        name
+        for name, _ in inspect.getmembers(RenovationAnalyzer, inspect.isfunction)
+        if name.startswith("_check_")
+    ] + [
+        name
+        for name, _ in inspect.getmembers(DocumentGenerator, inspect.isfunction)
+        if name.startswith("generate_")
+    ]
+    return sorted(set(methods) - covered)
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """Минимальное время вызова из repeat замеров, микросекунды"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def run(cases: List[Case], repeat: int, keyword: Optional[str] = None) -> Dict[str, float]:
+    results = {}
+    for name, func in cases:
+        if keyword and keyword not in name:
+            continue
+        results[name] = measure(func, repeat)
+        print(f"{name:<52}{results[name]:>14.1f}", flush=True)
+    return results
+
+
+def compare(
+    baseline: Dict[str, float], current: Dict[str, float], threshold: float, min_delta: float = 0.0
+) -> List[str]:
+    """Таблица сравнения на stdout; возвращает случаи с регрессией"""
+    regressions = []
+    print(f"\n{'':<52}{'base,us':>14}{'now,us':>14}{'change':>10}")
+    for name, value in current.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<52}{'-':>14}{value:>14.1f}{'new':>10}")
+            continue
+        change = value / base - 1
+        regressed = change > threshold and value - base > min_delta
+        if regressed:
+            regressions.append(name)
+        mark = "  REGRESSION" if regressed else ""
+        print(f"{name:<52}{base:>14.1f}{value:>14.1f}{change:>+10.0%}{mark}")
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, float]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["cases"]
+
+
+def save_baseline(path: Path, results: Dict[str, float], repeat: int, seed: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "repeat": repeat,
+        "seed": seed,
+        "unit": "us",
+        "cases": {name: round(value, 3) for name, value in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", dest="keyword", help="только случаи, содержащие подстроку")
+    parser.add_argument(
+        "--save",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help="сохранить результаты как базу (JSON)",
+    )
+    parser.add_argument(
+        "--compare", type=Path, nargs="?", const=DEFAULT_BASELINE, help="сравнить с базой (JSON)"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="допустимое замедление, доля (0.25 = 25%%)"
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=1.0,
+        help="допустимое замедление, мкс (шум быстрых случаев)",
+    )
+    args = parser.parse_args(argv)
+
+    # Предупреждения анализатора и правил не смешиваются с таблицей
+    logging.disable(logging.WARNING)
+    cases = build_cases(args.sizes, args.seed)
+    missing = uncovered(cases)
+    if missing:
+        print(f"Нет бенчмарков для методов: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    print(f"Python {platform.python_version()}, repeat {args.repeat}, seed {args.seed}")
+    print(f"{'':<52}{'us/call':>14}")
+    results = run(cases, args.repeat, args.keyword)
+
+    if args.save:
+        save_baseline(args.save, results, args.repeat, args.seed)
+        print(f"\nBaseline saved to {args.save}")
+    if args.compare:
+        regressions = compare(load_baseline(args.compare), results, args.threshold, args.min_delta)
+        if regressions:
+            print(
+                f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: "
+                f"{', '.join(regressions)}"
+            )
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
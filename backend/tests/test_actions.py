@@ -0,0 +1,70 @@
+import pytest
+from httpx import AsyncClient
+from pydantic import ValidationError
+
+from app.analyzer import RenovationAnalyzer
+from app.main import app
+from app.models import (
+    ChangeWindowAction,
+    CombineRoomsAction,
+    RenovationAction,
+    RenovationPlan,
+    RoomType,
+    SimpleAction,
+)
+
+FLOOR_PLAN = {"walls": [], "doors": [], "windows": [], "rooms": []}
+
+
+def make_plan(*actions):
+    return RenovationPlan.model_validate({"originalPlan": FLOOR_PLAN, "actions": list(actions)})
+
+
+def test_actions_are_parsed_into_typed_models():
+    plan = make_plan(
+        {
+            "type": "combine_rooms",
+            "data": {"room1Type": "kitchen", "room2Type": "living", "extra": 1},
+        },
+        {"type": "change_window", "data": {"changeSize": "true"}},
+        {"type": "move_kitchen"},
+    )
+    combine, window, kitchen = plan.actions
+
+    assert isinstance(combine, CombineRoomsAction)
+    assert combine.data.room1Type == RoomType.KITCHEN
+    assert isinstance(window, ChangeWindowAction) and window.data.changeSize is True
+    assert isinstance(kitchen, SimpleAction) and kitchen.type == RenovationAction.MOVE_KITCHEN
+
+
+def test_every_action_type_is_accepted():
+    plan = make_plan(*({"type": action.value, "data": {}} for action in RenovationAction))
+    assert [action.type for action in plan.actions] == list(RenovationAction)
+    RenovationAnalyzer().analyze(plan)
+
+
+@pytest.mark.parametrize(
+    "action",
+    [
+        {"type": "demolish_house", "data": {}},
+        {"data": {"wallId": "w1"}},
+        {"type": "combine_rooms", "data": {"room1Type": "garage"}},
+        {"type": "change_window", "data": {"changeSize": "maybe"}},
+        {"type": "move_door", "data": {"x": "left"}},
+    ],
+)
+def test_malformed_actions_are_rejected(action):
+    with pytest.raises(ValidationError):
+        make_plan(action)
+
+
+@pytest.mark.asyncio
+async def test_malformed_action_rejected_by_api():
+    plan = {"originalPlan": FLOOR_PLAN, "actions": [{"type": "demolish_house", "data": {}}]}
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/analyze", json=plan)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][:3] == ["body", "actions", 0]
+
+        response = await client.post("/api/quick-check", json={"type": "demolish_house"})
+        assert response.status_code == 400
@@ -0,0 +1,77 @@
+import pytest
+from httpx import AsyncClient
+
+from app.analyzer import RenovationAnalyzer
+from app.batch import BatchAnalyzer
+from app.main import app
+from app.models import RenovationPlan
+
+
+def make_plan(wall_type="non_load_bearing", has_gas=False):
+    """План с одной стеной и действием демонтажа"""
+    return {
+        "originalPlan": {
+            "walls": [{"id": "wall1", "type": wall_type, "x1": 0, "y1": 0, "x2": 3000, "y2": 0}],
+            "doors": [],
+            "windows": [],
+            "rooms": [
+                {"id": "room1", "type": "kitchen", "area": 10},
+                {"id": "room2", "type": "bathroom", "area": 4},
+            ],
+            "hasGasSupply": has_gas,
+        },
+        "actions": [{"type": "remove_wall", "data": {"wallId": "wall1"}}],
+        "description": "Пакетный тест",
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2])
+async def test_batch_analyzer_preserves_order(workers):
+    """Результаты пакета совпадают с последовательным анализом и идут по порядку"""
+    plans = [
+        make_plan("load_bearing" if i % 3 == 0 else "non_load_bearing", i % 2 == 0)
+        for i in range(7)
+    ]
+    batch = BatchAnalyzer(workers=workers, chunk_size=2)
+    try:
+        results = await batch.analyze(plans)
+    finally:
+        batch.shutdown()
+
+    analyzer = RenovationAnalyzer()
+    assert [item.index for item in results] == list(range(7))
+    for raw, item in zip(plans, results):
+        assert item.errors == []
+        assert item.result == analyzer.analyze(RenovationPlan.model_validate(raw))
+
+
+@pytest.mark.asyncio
+async def test_batch_analyzer_item_errors():
+    """Ошибка валидации относится только к своему плану"""
+    broken = make_plan()
+    del broken["originalPlan"]["walls"]
+    batch = BatchAnalyzer(workers=1)
+    results = await batch.analyze([make_plan(), broken, make_plan()])
+
+    assert results[0].result is not None
+    assert results[1].result is None
+    assert any("walls" in error for error in results[1].errors)
+    assert results[2].result is not None
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_endpoint():
+    """Тест endpoint пакетного анализа"""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/analyze/batch",
+            json={"plans": [make_plan("load_bearing"), {"actions": []}, make_plan()]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert data["failed"] == 1
+        assert [item["index"] for item in data["results"]] == [0, 1, 2]
+        assert data["results"][0]["result"]["warnings"][0]["level"] == "critical"
+        assert data["results"][1]["errors"]
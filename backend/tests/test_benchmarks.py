@@ -0,0 +1,33 @@
+from app.models import RenovationAction, RenovationPlan
+from benchmarks.plans import SIZES, PlanSize, generate_plan
+from benchmarks.suite import build_cases, compare, uncovered
+
+
+def test_generated_plans_are_deterministic_and_valid():
+    plan = generate_plan(SIZES["apartment"], seed=7)
+    assert plan == generate_plan(SIZES["apartment"], seed=7)
+    assert plan != generate_plan(SIZES["apartment"], seed=8)
+
+    model = RenovationPlan.model_validate(plan)
+    assert len(model.originalPlan.walls) == SIZES["apartment"].walls
+    assert len(model.originalPlan.rooms) == SIZES["apartment"].rooms
+    assert {action.type for action in model.actions} == set(RenovationAction)
+    assert SIZES["walls-10k"].walls == 10000
+    assert len(generate_plan(PlanSize(3, 4))["originalPlan"]["walls"]) == PlanSize(3, 4).walls
+
+
+def test_every_checker_and_generator_has_a_case():
+    cases = build_cases(["room"])
+    assert uncovered(cases) == []
+    names = [name for name, _ in cases]
+    assert "analyze[room]" in names
+    assert "_check_wall_removal[room]" in names
+    for _, func in cases:
+        func()
+
+
+def test_compare_reports_regressions_over_threshold():
+    baseline = {"fast": 10.0, "slow": 100.0, "tiny": 0.5}
+    current = {"fast": 12.0, "slow": 130.0, "tiny": 1.0, "new": 5.0}
+    assert compare(baseline, current, threshold=0.25, min_delta=1.0) == ["slow"]
+    assert compare(baseline, current, threshold=0.1) == ["fast", "slow", "tiny"]
@@ -0,0 +1,133 @@
+import msgpack
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from app.binary_plan import validate_plan
+from app.cache import plan_fingerprint
+from app.compact import CompactRenovationPlan
+from app.main import app
+from app.models import RenovationPlan
+
+MSGPACK_HEADERS = {"Content-Type": "application/msgpack"}
+
+WALLS = [
+    {
+        "id": "wall1",
+        "type": "load_bearing",
+        "x1": 0,
+        "y1": 0,
+        "x2": 4000,
+        "y2": 0,
+        "thickness": 380,
+    },
+    {"id": "wall2", "type": "non_load_bearing", "x1": 4000, "y1": 0, "x2": 4000, "y2": 3000.5},
+    {"id": "wall3", "type": "unknown", "x1": 4000, "y1": 3000, "x2": 0, "y2": 3000},
+]
+
+PLAN = {
+    "originalPlan": {
+        "walls": WALLS,
+        "doors": [{"id": "d1", "wallId": "wall2", "position": 0.5}],
+        "windows": [{"id": "win1", "wallId": "wall3", "position": 0.5}],
+        "rooms": [
+            {"id": "room1", "type": "living", "area": 8, "hasNaturalLight": False},
+            {"id": "kitchen", "type": "kitchen", "area": 9, "hasVentilation": False},
+        ],
+        "hasGasSupply": True,
+    },
+    "actions": [
+        {"type": "remove_wall", "data": {"wallId": "wall1"}},
+        {"type": "move_door", "data": {"wallId": "wall2"}},
+        {"type": "move_door", "data": {"x": 10, "y": 20}},
+        {"type": "combine_rooms", "data": {"room1Type": "kitchen", "room2Type": "living"}},
+    ],
+    "description": "Бинарный формат",
+}
+
+
+def columnar_plan(plan=PLAN):
+    """План со стенами колонками (упакованные float64)"""
+    walls = plan["originalPlan"]["walls"]
+    columns = {
+        "id": [wall["id"] for wall in walls],
+        "type": [wall["type"] for wall in walls],
+        "coords": np.array(
+            [[w["x1"], w["y1"], w["x2"], w["y2"]] for w in walls], dtype="<f8"
+        ).tobytes(),
+        "thickness": np.array([w.get("thickness", 200) for w in walls], dtype="<f8").tobytes(),
+    }
+    return {**plan, "originalPlan": {**plan["originalPlan"], "walls": columns}}
+
+
+def test_columnar_walls_decode_to_compact_plan():
+    plan = validate_plan(msgpack.unpackb(msgpack.packb(columnar_plan()), raw=False))
+
+    assert isinstance(plan, CompactRenovationPlan)
+    assert plan.originalPlan.to_model() == RenovationPlan.model_validate(PLAN).originalPlan
+    assert isinstance(validate_plan(PLAN), RenovationPlan)
+
+    # Ключ кэша стабилен и зависит от координат
+    assert plan_fingerprint(plan) == plan_fingerprint(validate_plan(columnar_plan()))
+    moved = dict(
+        PLAN, originalPlan=dict(PLAN["originalPlan"], walls=[dict(WALLS[0], x2=4001)] + WALLS[1:])
+    )
+    assert plan_fingerprint(plan) != plan_fingerprint(validate_plan(columnar_plan(moved)))
+
+
+@pytest.mark.asyncio
+async def test_msgpack_analysis_matches_json():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        expected = await client.post("/api/analyze", json=PLAN)
+        assert expected.status_code == 200
+
+        for payload in (columnar_plan(), PLAN):
+            response = await client.post(
+                "/api/analyze", content=msgpack.packb(payload), headers=MSGPACK_HEADERS
+            )
+            assert response.status_code == 200
+            assert response.json() == expected.json()
+
+
+@pytest.mark.asyncio
+async def test_invalid_binary_body():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/analyze", content=b"\xc1", headers=MSGPACK_HEADERS)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "msgpack_invalid"
+
+        broken = columnar_plan()
+        broken["originalPlan"]["walls"]["coords"] = b"\x00" * 8
+        response = await client.post(
+            "/api/analyze", content=msgpack.packb(broken), headers=MSGPACK_HEADERS
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "originalPlan", "walls"]
+
+        # NaN и бесконечность в упакованных колонках отклоняются так же
+        for value in (np.nan, np.inf):
+            broken = columnar_plan()
+            coords = np.frombuffer(broken["originalPlan"]["walls"]["coords"], dtype="<f8").copy()
+            coords[2] = value
+            broken["originalPlan"]["walls"]["coords"] = coords.tobytes()
+            response = await client.post(
+                "/api/analyze", content=msgpack.packb(broken), headers=MSGPACK_HEADERS
+            )
+            assert response.status_code == 422
+            assert "конечными" in response.json()["detail"][0]["msg"]
+
+
+@pytest.mark.asyncio
+async def test_msgpack_batch():
+    batch = {"plans": [columnar_plan(), {"actions": []}, PLAN]}
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/analyze/batch", content=msgpack.packb(batch), headers=MSGPACK_HEADERS
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["failed"] == 1
+    assert data["results"][1]["errors"]
+    assert data["results"][0]["result"] == data["results"][2]["result"]
+    assert data["results"][0]["result"]["requiresApproval"] is True
@@ -0,0 +1,135 @@
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.analyzer import RenovationAnalyzer
+from app.building import BuildingAnalyzer, FloorIndex
+from app.main import app
+from app.models import BuildingPlan, FloorPlan, RiskLevel
+
+
+def rect(x, y, w, h):
+    return [{"x": x, "y": y}, {"x": x + w, "y": y}, {"x": x + w, "y": y + h}, {"x": x, "y": y + h}]
+
+
+def make_floor(number, rooms):
+    return {
+        "walls": [],
+        "doors": [],
+        "windows": [],
+        "rooms": rooms,
+        "floor": number,
+        "totalFloors": 17,
+    }
+
+
+def standard_rooms(prefix):
+    """Типовой этаж: кухня и санузел над кухней и санузлом нижнего этажа"""
+    return [
+        {"id": f"{prefix}-living", "type": "living", "area": 18, "polygon": rect(0, 0, 4000, 4500)},
+        {
+            "id": f"{prefix}-kitchen",
+            "type": "kitchen",
+            "area": 9,
+            "polygon": rect(4000, 0, 3000, 3000),
+        },
+        {
+            "id": f"{prefix}-bath",
+            "type": "bathroom",
+            "area": 4,
+            "polygon": rect(4000, 3000, 2000, 2000),
+        },
+    ]
+
+
+@pytest.fixture
+def building_analyzer():
+    return BuildingAnalyzer(RenovationAnalyzer())
+
+
+def test_standard_stack_has_no_overlaps(building_analyzer):
+    building = BuildingPlan.model_validate(
+        {"floors": [make_floor(n, standard_rooms(f"f{n}")) for n in range(1, 18)]}
+    )
+    result = building_analyzer.analyze(building)
+    assert result.isLegal is True
+    assert result.overlaps == []
+    assert result.floorsAnalyzed == 17
+
+
+def test_kitchen_over_living_room(building_analyzer):
+    """Кухня, перенесенная на место жилой комнаты, обнаруживается над соседями"""
+    moved = standard_rooms("f5")
+    moved[1]["polygon"] = rect(1000, 1000, 3000, 3000)
+    floors = [make_floor(n, standard_rooms(f"f{n}")) for n in range(1, 18) if n != 5]
+    floors.append(make_floor(5, moved))
+
+    result = building_analyzer.analyze(BuildingPlan.model_validate({"floors": floors}))
+    assert result.isLegal is False
+    assert len(result.overlaps) == 1
+    overlap = result.overlaps[0]
+    assert (overlap.floor, overlap.roomId, overlap.belowRoomId) == (5, "f5-kitchen", "f4-living")
+    assert overlap.overlapArea == pytest.approx(3000 * 3000)
+    assert result.warnings[0].level == RiskLevel.CRITICAL
+
+
+def test_duplicate_floor_rejected(building_analyzer):
+    building = BuildingPlan.model_validate({"floors": [make_floor(2, []), make_floor(2, [])]})
+    with pytest.raises(ValueError):
+        building_analyzer.analyze(building)
+
+
+def test_huge_wet_room_query_is_clamped_to_index():
+    """Габарит огромной мокрой зоны не перебирается по ячейкам целиком"""
+    tiny = {"id": "tiny", "type": "living", "area": 1, "polygon": rect(0, 0, 1, 1)}
+    floor = FloorPlan.model_validate(make_floor(1, [tiny]))
+    index = FloorIndex(floor)
+    started = time.perf_counter()
+    assert [room.id for room, _ in index.candidates((-1e9, -1e9, 1e9, 1e9))] == ["tiny"]
+    assert index.candidates((5, 5, 1e9, 1e9)) == []
+    assert time.perf_counter() - started < 1
+
+
+def test_large_floor_uses_index(building_analyzer):
+    """Сотни помещений на этаже обрабатываются без попарного перебора"""
+    rooms_below = [
+        {
+            "id": f"l{i}-{j}",
+            "type": "living",
+            "area": 9,
+            "polygon": rect(i * 3000, j * 3000, 3000, 3000),
+        }
+        for i in range(30)
+        for j in range(30)
+    ]
+    rooms_above = [
+        {
+            "id": f"b{i}-{j}",
+            "type": "bathroom",
+            "area": 4,
+            "polygon": rect(i * 3000 + 500, j * 3000 + 500, 2000, 2000),
+        }
+        for i in range(30)
+        for j in range(30)
+    ]
+    building = BuildingPlan.model_validate(
+        {"floors": [make_floor(1, rooms_below), make_floor(2, rooms_above)]}
+    )
+    start = time.perf_counter()
+    result = building_analyzer.analyze(building)
+    assert len(result.overlaps) == 900
+    assert time.perf_counter() - start < 5
+
+
+@pytest.mark.asyncio
+async def test_analyze_building_endpoint():
+    moved = standard_rooms("f2")
+    moved[2]["polygon"] = rect(0, 0, 2000, 2000)
+    payload = {"floors": [make_floor(1, standard_rooms("f1")), make_floor(2, moved)]}
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/analyze/building", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["overlaps"][0]["belowRoomId"] == "f1-living"
+        assert data["requiresApproval"] is True
@@ -0,0 +1,192 @@
+import asyncio
+import gc
+import io
+import json
+import threading
+import zipfile
+
+import pytest
+from httpx import AsyncClient
+
+from app import main
+from app.bundle import stream_zip
+from app.executor import AnalysisExecutor
+
+DOCUMENT_DATA = {
+    "apartment_data": {
+        "address": "г. Москва, ул. Тестовая, д. 1",
+        "apartment_number": "10",
+        "cadastral_number": "77:01:0001001:1234",
+        "total_area": "60.5",
+    },
+    "owner_data": {
+        "full_name": "Иванов Иван Иванович",
+        "passport_series": "1234",
+        "passport_number": "567890",
+        "passport_issued_by": "ОВД Тестовского района",
+        "passport_issued_date": "15.01.2010",
+        "phone": "+7 (999) 123-45-67",
+        "email": "test@example.com",
+    },
+    "plan": {"walls": [], "doors": [], "windows": [], "rooms": []},
+    "analysis": {"isLegal": True, "requiresApproval": False, "warnings": [], "recommendations": []},
+    "completion_date": "15.06.2025",
+}
+
+
+@pytest.mark.asyncio
+async def test_zip_is_streamed_per_member():
+    produced = []
+
+    async def members():
+        for i in range(3):
+            produced.append(i)
+            yield f"doc{i}.txt", f"Документ {i}\n" * 100
+
+    chunks = []
+    async for chunk in stream_zip(members()):
+        # Файл отдан до того, как запрошен следующий
+        chunks.append((len(produced), chunk))
+
+    assert [count for count, _ in chunks] == [1, 2, 3, 3]
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunk for _, chunk in chunks)))
+    assert archive.testzip() is None
+    assert archive.namelist() == ["doc0.txt", "doc1.txt", "doc2.txt"]
+    assert archive.read("doc1.txt").decode("utf-8") == "Документ 1\n" * 100
+
+
+@pytest.mark.asyncio
+async def test_bundle_contains_requested_documents():
+    async with AsyncClient(app=main.app, base_url="http://test") as client:
+        response = await client.post("/api/generate-document/bundle", json=DOCUMENT_DATA)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert sorted(archive.namelist()) == sorted(
+            f"{name}.txt"
+            for name in (
+                "application",
+                "technical_conclusion",
+                "completion_act",
+                "bti_application",
+                "checklist",
+            )
+        )
+
+        single = await client.post(
+            "/api/generate-document", json={**DOCUMENT_DATA, "document_type": "completion_act"}
+        )
+        assert archive.read("completion_act.txt").decode("utf-8") == single.text
+
+        response = await client.post(
+            "/api/generate-document/bundle",
+            json={**DOCUMENT_DATA, "document_types": ["checklist", "checklist", "bti_application"]},
+        )
+        assert sorted(zipfile.ZipFile(io.BytesIO(response.content)).namelist()) == [
+            "bti_application.txt",
+            "checklist.txt",
+        ]
+
+        response = await client.post(
+            "/api/generate-document/bundle", json={**DOCUMENT_DATA, "document_types": []}
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bundle_errors_and_overload(monkeypatch):
+    render_document = main.render_document
+
+    def failing_render(doc_request, document_type):
+        if document_type == "technical_conclusion":
+            raise RuntimeError("шаблон недоступен")
+        return render_document(doc_request, document_type)
+
+    monkeypatch.setattr(main, "render_document", failing_render)
+    async with AsyncClient(app=main.app, base_url="http://test") as client:
+        response = await client.post("/api/generate-document/bundle", json=DOCUMENT_DATA)
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert len(archive.namelist()) == 5
+        assert "technical_conclusion.txt" not in archive.namelist()
+        assert (
+            archive.read("errors.txt").decode("utf-8")
+            == "technical_conclusion: шаблон недоступен\n"
+        )
+
+        # Исполнитель занят, очереди нет: отказ до начала ответа
+        executor = AnalysisExecutor(workers=1, queue_size=0, queue_timeout=1)
+        gate = threading.Event()
+        monkeypatch.setattr(main, "analysis_executor", executor)
+        try:
+            running = asyncio.ensure_future(executor.run(gate.wait))
+            while executor.stats()["running"] == 0:
+                await asyncio.sleep(0.01)
+            response = await client.post("/api/generate-document/bundle", json=DOCUMENT_DATA)
+            assert response.status_code == 503
+            gate.set()
+            await running
+        finally:
+            gate.set()
+            executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_closes_rendered_files(monkeypatch):
+    executor = AnalysisExecutor(workers=5, queue_size=0, queue_timeout=1)
+    gate = threading.Event()
+    files = []
+
+    def render_file(doc_request, document_type):
+        # Последний документ еще в потоке, когда клиент отключается
+        if document_type == "checklist":
+            gate.wait()
+        file = io.BytesIO(document_type.encode("utf-8") * 1000)
+        files.append(file)
+        return file
+
+    monkeypatch.setattr(main, "analysis_executor", executor)
+    monkeypatch.setattr(main, "render_file", render_file)
+    monkeypatch.setattr(main.limiter, "enabled", False)
+    monkeypatch.setattr(main, "check_format_available", lambda file_format: None)
+
+    body = json.dumps({**DOCUMENT_DATA, "format": "pdf"}).encode("utf-8")
+    requests = [{"type": "http.request", "body": body, "more_body": False}]
+    first_chunk = asyncio.Event()
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await first_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_chunk.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/generate-document/bundle",
+        "raw_path": b"/api/generate-document/bundle",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1),
+        "server": ("test", 80),
+    }
+    try:
+        await main.app(scope, receive, send)
+        gate.set()
+        # Незавершенный генератор архива закрывается сборщиком мусора
+        gc.collect()
+        for _ in range(200):
+            if len(files) == 5 and all(file.closed for file in files):
+                break
+            await asyncio.sleep(0.01)
+        assert len(files) == 5
+        assert all(file.closed for file in files)
+    finally:
+        gate.set()
+        executor.shutdown()
@@ -0,0 +1,95 @@
+import pytest
+from httpx import AsyncClient
+
+from app.cache import AnalysisCache, LRUCache, plan_fingerprint
+from app.main import app
+from app.models import AnalysisResult, RenovationPlan
+
+
+def make_plan(area=15.0, actions=None):
+    """Минимальный план для проверки ключа кэша"""
+    return RenovationPlan.model_validate(
+        {
+            "originalPlan": {
+                "walls": [
+                    {"id": "wall1", "type": "load_bearing", "x1": 0, "y1": 0, "x2": 3000, "y2": 0}
+                ],
+                "doors": [],
+                "windows": [],
+                "rooms": [{"id": "room1", "type": "living", "area": area}],
+            },
+            "actions": (
+                actions
+                if actions is not None
+                else [{"type": "remove_wall", "data": {"wallId": "wall1"}}]
+            ),
+        }
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_plan_fingerprint_is_canonical():
+    """Порядок ключей и запись чисел не влияют на ключ"""
+    assert plan_fingerprint(make_plan(15)) == plan_fingerprint(make_plan(15.0000000001))
+    assert plan_fingerprint(
+        make_plan(actions=[{"data": {"wallId": "wall1"}, "type": "remove_wall"}])
+    ) == plan_fingerprint(make_plan())
+    assert plan_fingerprint(make_plan(15)) != plan_fingerprint(make_plan(15.5))
+
+
+def test_lru_eviction_and_ttl():
+    """Вытеснение давних записей и истечение срока жизни"""
+    clock = FakeClock()
+    cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    clock.now = 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_analysis_cache_invalidated_on_rules_change():
+    """Смена версии правил сбрасывает кэш"""
+    version = {"value": 1}
+    cache = AnalysisCache(maxsize=10, ttl=None, rules_version=lambda: version["value"])
+    result = AnalysisResult(isLegal=True, requiresApproval=False, warnings=[], recommendations=[])
+
+    key, cached = cache.get_result(make_plan())
+    assert cached is None
+    cache.set(key, result)
+    assert cache.get_result(make_plan())[1] is result
+
+    version["value"] = 2
+    assert cache.get_result(make_plan())[1] is None
+    assert cache.stats()["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_uses_cache():
+    """Повторный анализ того же плана берется из кэша"""
+    payload = make_plan(area=12.25).model_dump(mode="json")
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        before = (await client.get("/api/cache/stats")).json()
+        first = await client.post("/api/analyze", json=payload)
+        second = await client.post("/api/analyze", json=payload)
+        after = (await client.get("/api/cache/stats")).json()
+
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"] + 1
@@ -0,0 +1,56 @@
+import random
+
+from app.analyzer import RenovationAnalyzer
+from app.columnar import analyze_many, check_general_requirements_columnar
+from app.compact import CompactFloorPlan
+from app.models import RenovationPlan
+
+ROOM_TYPES = ["living", "kitchen", "bathroom", "toilet", "corridor", "balcony", "storage"]
+
+
+def random_plan(rng):
+    rooms = [
+        {
+            "id": f"r{i}",
+            "type": rng.choice(ROOM_TYPES),
+            "area": rng.choice([5, 8.99, 9, 9.5, 20]),
+            "hasVentilation": rng.random() < 0.6,
+            "hasNaturalLight": rng.random() < 0.7,
+        }
+        for i in range(rng.randint(0, 8))
+    ]
+    return RenovationPlan.model_validate(
+        {
+            "originalPlan": {
+                "walls": [
+                    {"id": "w1", "type": "load_bearing", "x1": 0, "y1": 0, "x2": 1000, "y2": 0}
+                ],
+                "doors": [],
+                "windows": [],
+                "rooms": rooms,
+                "hasGasSupply": rng.random() < 0.5,
+            },
+            "actions": (
+                [{"type": "remove_wall", "data": {"wallId": "w1"}}] if rng.random() < 0.5 else []
+            ),
+        }
+    )
+
+
+def test_columnar_matches_per_plan_path():
+    """Колоночная проверка дает те же предупреждения, что и поштучная"""
+    rng = random.Random(3)
+    analyzer = RenovationAnalyzer()
+    plans = [random_plan(rng) for _ in range(500)]
+
+    columnar = check_general_requirements_columnar(analyzer, [plan.originalPlan for plan in plans])
+    assert columnar == [
+        analyzer._check_general_requirements(CompactFloorPlan.from_model(plan.originalPlan))
+        for plan in plans
+    ]
+    assert analyze_many(analyzer, plans) == [analyzer.analyze(plan) for plan in plans]
+
+
+def test_columnar_empty_input():
+    analyzer = RenovationAnalyzer()
+    assert check_general_requirements_columnar(analyzer, []) == []
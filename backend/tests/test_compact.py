@@ -0,0 +1,67 @@
+from app.compact import CompactFloorPlan
+from app.document_generator import DocumentGenerator
+from app.models import Door, FloorPlan, Point, Room, RoomType, Wall, WallType, Window
+
+
+def sample_plan():
+    return FloorPlan(
+        walls=[
+            Wall(id="w1", type=WallType.LOAD_BEARING, x1=0, y1=0, x2=4000, y2=0, thickness=380),
+            Wall(id="w2", type=WallType.NON_LOAD_BEARING, x1=4000, y1=0, x2=4000, y2=3000.5),
+            Wall(id="w3", type=WallType.UNKNOWN, x1=4000, y1=3000, x2=0, y2=3000),
+        ],
+        doors=[
+            Door(id="d1", wallId="w2", position=0.5),
+            Door(id="d2", wallId="missing", position=0.1, width=800),
+        ],
+        windows=[Window(id="win1", wallId="w3", position=0.25, width=1500)],
+        rooms=[
+            Room(
+                id="r1",
+                type=RoomType.LIVING,
+                area=8.5,
+                hasNaturalLight=False,
+                polygon=[Point(x=0, y=0), Point(x=4000, y=0), Point(x=4000, y=3000)],
+            ),
+            Room(id="r2", type=RoomType.KITCHEN, area=7, hasGas=True, hasVentilation=True),
+        ],
+        hasGasSupply=True,
+        floor=3,
+        totalFloors=12,
+        buildingType="brick",
+    )
+
+
+def test_round_trip_is_lossless():
+    plan = sample_plan()
+    compact = CompactFloorPlan.from_model(plan)
+
+    assert compact.to_model() == plan
+    assert CompactFloorPlan.of(compact) is compact
+    assert compact.find_wall("w2") == 1
+    assert compact.find_wall("missing") == -1
+    assert compact.wall_type(0) == WallType.LOAD_BEARING
+    assert compact.count_walls(WallType.NON_LOAD_BEARING) == 1
+
+
+def test_empty_plan():
+    plan = FloorPlan(walls=[], doors=[], windows=[], rooms=[])
+    compact = CompactFloorPlan.from_model(plan)
+
+    assert len(compact.walls) == len(compact.rooms) == len(compact.doors) == 0
+    assert compact.to_model() == plan
+
+
+def test_document_description_from_compact_plan():
+    """Описание работ одинаково для модели и компактного плана"""
+    generator = DocumentGenerator()
+    plan = sample_plan()
+
+    description = generator._format_renovation_description(plan)
+    assert description == generator._format_renovation_description(
+        CompactFloorPlan.from_model(plan)
+    )
+    assert "Количество несущих стен: 1" in description
+    assert "Количество ненесущих перегородок: 2" in description
+    assert "Количество дверных проемов: 2" in description
+    assert "газоснабжения: Да" in description
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import urllib.request
+
+from app.desktop import READY_PREFIX
+from tests.test_server import BACKEND_DIR
+
+
+def test_ready_line_after_startup(tmp_path):
+    data_dir = tmp_path / "data"
+    env = {**os.environ, "APP_DATA_DIR": str(data_dir), "PYTHONUNBUFFERED": "1"}
+    env.pop("JOBS_DB_PATH", None)
+    env.pop("RENDER_CACHE_DIR", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.desktop", "--port", "0"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        line = process.stdout.readline()
+        assert line.startswith(READY_PREFIX)
+        # Строка готовности печатается, когда сервер уже отвечает
+        url = line.split()[1]
+        with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+            assert response.status == 200
+        # Очередь заданий и кэш документов создаются при первом обращении
+        assert not data_dir.exists()
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def test_rendering_libraries_imported_lazily():
+    code = "import sys, app.main; print(sorted({'fpdf', 'docx'} & set(sys.modules)))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    assert output.stdout.strip() == "[]"
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from app import main
+from app.executor import AnalysisExecutor, OverloadedError
+
+
+async def wait_until(condition):
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_queue_is_bounded():
+    executor = AnalysisExecutor(workers=1, queue_size=1, queue_timeout=5)
+    gate = threading.Event()
+    try:
+        running = asyncio.ensure_future(executor.run(gate.wait))
+        await wait_until(lambda: executor.stats()["running"] == 1)
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await wait_until(lambda: executor.queue_depth == 1)
+
+        with pytest.raises(OverloadedError):
+            await executor.run(lambda: "rejected")
+
+        gate.set()
+        assert await running is True
+        assert await queued == "queued"
+        stats = executor.stats()
+        assert (stats["running"], stats["queueDepth"], stats["completed"], stats["rejected"]) == (
+            0,
+            0,
+            2,
+            1,
+        )
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_and_cancellation():
+    executor = AnalysisExecutor(workers=1, queue_size=5, queue_timeout=0.05)
+    gate = threading.Event()
+    try:
+        running = asyncio.ensure_future(executor.run(gate.wait))
+        await wait_until(lambda: executor.stats()["running"] == 1)
+
+        with pytest.raises(OverloadedError):
+            await executor.run(lambda: None)
+        assert executor.timeouts == 1
+
+        # Отмененное ожидание не занимает место в очереди
+        cancelled = asyncio.ensure_future(executor.run(lambda: None))
+        await wait_until(lambda: executor.queue_depth == 1)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert executor.queue_depth == 0
+
+        gate.set()
+        await running
+        assert await executor.run(lambda: 42) == 42
+        assert executor.stats()["running"] == 0
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_result_of_cancelled_run_is_discarded():
+    executor = AnalysisExecutor(workers=1, queue_size=0, queue_timeout=1)
+    gate = threading.Event()
+    discarded = []
+    try:
+        # Поток уже выполняет задачу: результат после отмены передается в discard
+        running = asyncio.ensure_future(
+            executor.run(lambda: gate.wait() and "file", discard=discarded.append)
+        )
+        await wait_until(lambda: executor.stats()["running"] == 1)
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+        assert discarded == []
+
+        gate.set()
+        await wait_until(lambda: discarded == ["file"])
+        await wait_until(lambda: executor.stats()["running"] == 0)
+    finally:
+        gate.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_and_overload_is_503(monkeypatch):
+    executor = AnalysisExecutor(workers=1, queue_size=0, queue_timeout=1)
+    gate = threading.Event()
+
+    def slow_analysis(plan):
+        gate.wait(5)
+        return main.analyzer.analyze(plan)
+
+    monkeypatch.setattr(main, "analysis_executor", executor)
+    monkeypatch.setattr(main, "analyze_cached", slow_analysis)
+    plan = {"originalPlan": {"walls": [], "doors": [], "windows": [], "rooms": []}, "actions": []}
+    try:
+        async with AsyncClient(app=main.app, base_url="http://test") as client:
+            pending = asyncio.ensure_future(client.post("/api/analyze", json=plan))
+            await wait_until(lambda: executor.stats()["running"] == 1)
+
+            health = await client.get("/health")
+            assert health.status_code == 200
+
+            overloaded = await client.post("/api/quick-check", json={"type": "move_kitchen"})
+            assert overloaded.status_code == 503
+            assert overloaded.headers["retry-after"] == "1"
+
+            stats = await client.get("/api/executor/stats")
+            assert stats.json()["rejected"] == 1
+
+            gate.set()
+            assert (await pending).status_code == 200
+    finally:
+        gate.set()
+        executor.shutdown()
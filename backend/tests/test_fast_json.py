@@ -0,0 +1,61 @@
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.main import app
+
+PLAN = {
+    "originalPlan": {
+        "walls": [{"id": "wall1", "type": "load_bearing", "x1": 0, "y1": 0, "x2": 3000.5, "y2": 0}],
+        "doors": [],
+        "windows": [],
+        "rooms": [{"id": "room1", "type": "living", "area": 8.25, "hasNaturalLight": False}],
+        "hasGasSupply": True,
+    },
+    "actions": [
+        {"type": "remove_wall", "data": {"wallId": "wall1"}},
+        {"type": "move_kitchen", "data": {}},
+    ],
+    "description": "Проверка сериализации",
+}
+
+
+async def post_both(client, monkeypatch, url, payload):
+    """Ответы обычного и быстрого пути для одного запроса"""
+    monkeypatch.setattr(settings, "fast_json_responses", False)
+    standard = await client.post(url, json=payload)
+    monkeypatch.setattr(settings, "fast_json_responses", True)
+    fast = await client.post(url, json=payload)
+    return standard, fast
+
+
+@pytest.mark.asyncio
+async def test_fast_path_is_byte_identical(monkeypatch):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for url, payload in [
+            ("/api/analyze", PLAN),
+            ("/api/quick-check", {"type": "remove_wall", "data": {"wallType": "load_bearing"}}),
+            (
+                "/api/quick-check/batch",
+                {"actions": [{"type": "move_kitchen", "data": {"hasGas": True}}]},
+            ),
+            ("/api/analyze/batch", {"plans": [PLAN, {"actions": []}]}),
+        ]:
+            standard, fast = await post_both(client, monkeypatch, url, payload)
+            assert standard.status_code == fast.status_code == 200
+            assert standard.content == fast.content
+            assert fast.headers["content-type"] == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_fast_path_keeps_error_responses(monkeypatch):
+    monkeypatch.setattr(settings, "fast_json_responses", True)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/sessions/unknown/delta", json={"target": "room", "op": "remove", "roomId": "r"}
+        )
+        assert response.status_code == 404
+
+        response = await client.post("/api/sessions", json=PLAN)
+        assert response.status_code == 200
+        assert response.json()["result"]["requiresApproval"] is True
@@ -0,0 +1,163 @@
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from app.analyzer import RenovationAnalyzer
+from app.geometry import MAX_WALL_CELLS, PlanGeometry, point_segment_distance
+from app.models import (
+    Door,
+    FloorPlan,
+    Point,
+    RenovationPlan,
+    Room,
+    RoomType,
+    Wall,
+    WallType,
+    Window,
+)
+
+
+def rect_walls(wall_type=WallType.LOAD_BEARING):
+    """Четыре стены комнаты 4000x3000"""
+    return [
+        Wall(id="south", type=wall_type, x1=0, y1=0, x2=4000, y2=0),
+        Wall(id="east", type=WallType.NON_LOAD_BEARING, x1=4000, y1=0, x2=4000, y2=3000),
+        Wall(id="north", type=wall_type, x1=4000, y1=3000, x2=0, y2=3000),
+        Wall(id="west", type=WallType.NON_LOAD_BEARING, x1=0, y1=3000, x2=0, y2=0),
+        Wall(id="far", type=WallType.NON_LOAD_BEARING, x1=9000, y1=0, x2=9000, y2=3000),
+    ]
+
+
+@pytest.fixture
+def plan():
+    return FloorPlan(
+        walls=rect_walls(),
+        doors=[
+            Door(id="d1", wallId="east", position=0.5),
+            Door(id="d2", wallId="south", position=0.25),
+        ],
+        windows=[Window(id="win1", wallId="north", position=0.5)],
+        rooms=[
+            Room(
+                id="r1",
+                type=RoomType.LIVING,
+                area=12,
+                polygon=[
+                    Point(x=0, y=0),
+                    Point(x=4000, y=0),
+                    Point(x=4000, y=3000),
+                    Point(x=0, y=3000),
+                ],
+            )
+        ],
+    )
+
+
+def test_nearest_wall_matches_brute_force():
+    """Ближайшая стена по сетке совпадает с полным перебором"""
+    rng = random.Random(7)
+    walls = []
+    for i in range(2000):
+        x, y = rng.uniform(0, 100000), rng.uniform(0, 100000)
+        walls.append(
+            Wall(
+                id=f"w{i}",
+                type=WallType.NON_LOAD_BEARING,
+                x1=x,
+                y1=y,
+                x2=x + rng.uniform(-3000, 3000),
+                y2=y + rng.uniform(-3000, 3000),
+            )
+        )
+    geometry = PlanGeometry(FloorPlan(walls=walls, doors=[], windows=[], rooms=[]))
+
+    for _ in range(200):
+        x, y = rng.uniform(-20000, 120000), rng.uniform(-20000, 120000)
+        wall, distance = geometry.nearest_wall(x, y)
+        expected = min(point_segment_distance(x, y, w.x1, w.y1, w.x2, w.y2) for w in walls)
+        assert distance == pytest.approx(expected)
+
+
+def test_long_walls_kept_out_of_grid():
+    """Длинные диагональные стены не раздувают сетку, поиск остается точным"""
+    rng = random.Random(3)
+    walls = [
+        Wall(id=f"d{i}", type=WallType.NON_LOAD_BEARING, x1=i, y1=0, x2=100000 - i, y2=100000)
+        for i in range(300)
+    ] + [
+        Wall(id=f"s{i}", type=WallType.NON_LOAD_BEARING, x1=x, y1=y, x2=x + 500, y2=y)
+        for i, (x, y) in enumerate(
+            (rng.uniform(0, 100000), rng.uniform(0, 100000)) for _ in range(300)
+        )
+    ]
+    geometry = PlanGeometry(FloorPlan(walls=walls, doors=[], windows=[], rooms=[]))
+    assert len(geometry.grid._cell_walls) <= MAX_WALL_CELLS * len(walls)
+
+    for _ in range(100):
+        x, y = rng.uniform(0, 100000), rng.uniform(0, 100000)
+        wall, distance = geometry.nearest_wall(x, y)
+        expected = min(point_segment_distance(x, y, w.x1, w.y1, w.x2, w.y2) for w in walls)
+        assert distance == pytest.approx(expected)
+    near = {w.id for w in geometry.walls_near(50000, 50000, 10)}
+    assert {"d0", "d299"} <= near
+
+
+def test_non_finite_and_huge_coordinates(plan):
+    """Бесконечные координаты отклоняются моделью, огромный размах плана не ломает сетку"""
+    for data in ({"x1": float("inf")}, {"y2": float("nan")}):
+        wall = {"id": "w", "type": "load_bearing", "x1": 0, "y1": 0, "x2": 1, "y2": 0, **data}
+        with pytest.raises(ValidationError):
+            Wall.model_validate(wall)
+    with pytest.raises(ValidationError):
+        Point(x=float("-inf"), y=0)
+
+    plan.walls[-1] = Wall(id="far", type=WallType.NON_LOAD_BEARING, x1=-1e308, y1=0, x2=1e308, y2=0)
+    renovation = RenovationPlan(
+        originalPlan=plan, actions=[{"type": "move_door", "data": {"x": 1500, "y": 40}}]
+    )
+    RenovationAnalyzer().analyze(renovation)
+    geometry = PlanGeometry(plan)
+    assert geometry.nearest_wall(2000, 50)[0].id == "south"
+    assert geometry.nearest_wall(1e308, 3000) is not None
+
+
+def test_nearest_wall_max_distance(plan):
+    geometry = PlanGeometry(plan)
+    wall, distance = geometry.nearest_wall(2000, 50)
+    assert wall.id == "south"
+    assert distance == pytest.approx(50)
+    assert geometry.nearest_wall(6500, 1500, max_distance=100) is None
+
+
+def test_openings_on_load_bearing_walls(plan):
+    geometry = PlanGeometry(plan)
+    found = {opening.id for opening, wall in geometry.openings_on_load_bearing_walls()}
+    assert found == {"d2", "win1"}
+    assert geometry.opening_point(plan.doors[1]) == (1000, 0)
+
+
+def test_walls_bounding_room(plan):
+    geometry = PlanGeometry(plan)
+    walls = geometry.walls_bounding_room(plan.rooms[0])
+    assert {w.id for w in walls} == {"south", "east", "north", "west"}
+
+
+def test_door_in_load_bearing_wall_warning(plan):
+    """Новый проем в несущей стене требует согласования"""
+    analyzer = RenovationAnalyzer()
+    by_id = RenovationPlan(
+        originalPlan=plan, actions=[{"type": "move_door", "data": {"wallId": "north"}}]
+    )
+    by_point = RenovationPlan(
+        originalPlan=plan, actions=[{"type": "move_door", "data": {"x": 1500, "y": 40}}]
+    )
+    partition = RenovationPlan(
+        originalPlan=plan, actions=[{"type": "move_door", "data": {"wallId": "east"}}]
+    )
+
+    for renovation in (by_id, by_point):
+        result = analyzer.analyze(renovation)
+        assert result.warnings[0].title == "Проем в несущей стене"
+        assert result.requiresApproval is True
+    assert all(w.title != "Проем в несущей стене" for w in analyzer.analyze(partition).warnings)
@@ -0,0 +1,147 @@
+import io
+import json
+import zipfile
+
+import pytest
+from httpx import AsyncClient
+
+from app import main
+from app.analyzer import RenovationAnalyzer
+from app.document_generator import DocumentGenerator
+from app.jobs import JobQueue
+from app.rendering import DocumentRenderer
+from tests.test_bundle import DOCUMENT_DATA
+
+RECORD = {
+    "apartment_data": DOCUMENT_DATA["apartment_data"],
+    "owner_data": DOCUMENT_DATA["owner_data"],
+    "plan": {
+        "originalPlan": {
+            "walls": [{"id": "w1", "type": "load_bearing", "x1": 0, "y1": 0, "x2": 3000, "y2": 0}],
+            "doors": [],
+            "windows": [],
+            "rooms": [{"id": "r1", "type": "kitchen", "area": 7}],
+        },
+        "actions": [{"type": "remove_wall", "data": {"wallId": "w1"}}],
+    },
+    "completion_date": "15.06.2025",
+}
+
+
+def make_queue(path, **kwargs) -> JobQueue:
+    return JobQueue(path, RenovationAnalyzer(), DocumentGenerator(), DocumentRenderer(), **kwargs)
+
+
+def stored_records(queue, job_id):
+    """Непустые записи задания в базе"""
+    with queue._connect() as conn:
+        rows = conn.execute(
+            "SELECT idx FROM job_items WHERE job_id = ? AND record != '' ORDER BY idx", (job_id,)
+        )
+        return [idx for idx, in rows]
+
+
+def test_job_survives_restart_and_lost_lease(tmp_path):
+    db_path = tmp_path / "jobs" / "jobs.sqlite3"
+    queue = make_queue(db_path, lease_seconds=60)
+    # База создается при первом обращении, а не при создании очереди
+    assert not db_path.parent.exists()
+    job_id = queue.submit(
+        "tenant", [RECORD, {"plan": {}}, RECORD], ["completion_act", "checklist"], "txt"
+    )
+    assert queue.status(job_id, "other") is None
+
+    # Процесс взял задание, сохранил одну запись и упал, не отпустив аренду
+    claimed = queue._claim()
+    idx, record = 0, json.dumps(RECORD)
+    assert queue._save(
+        job_id, claimed[1], idx, *queue._process(idx, record, claimed[2], claimed[3])
+    )
+    assert stored_records(queue, job_id) == [1, 2]
+
+    restarted = make_queue(db_path, lease_seconds=60)
+    status = restarted.status(job_id, "tenant")
+    assert (status.status, status.completed, status.resultsCursor) == ("running", 1, 1)
+    # Аренда еще действует: задание не берется повторно
+    assert restarted.work_once() is False
+
+    with restarted._transaction() as conn:
+        conn.execute("UPDATE jobs SET lease_until = 0")
+    assert restarted.work_once() is True
+    status = restarted.status(job_id, "tenant")
+    assert (status.status, status.total, status.completed, status.failed) == ("completed", 3, 2, 1)
+    assert stored_records(restarted, job_id) == []
+
+    results = restarted.results(job_id, 0, status.resultsCursor)
+    assert [idx for idx, _, _ in results] == [0, 1, 2]
+    assert "plan.originalPlan: Field required" in results[1][1] and results[1][2] == []
+    names = [name for name, _ in results[2][2]]
+    assert names == ["completion_act.txt", "checklist.txt"]
+    assert "15.06.2025" in results[2][2][0][1].decode("utf-8")
+
+
+def test_tenant_concurrency_and_cancel(tmp_path):
+    queue = make_queue(tmp_path / "jobs.sqlite3", tenant_concurrency=1)
+    first = queue.submit("a", [RECORD], ["checklist"], "txt")
+    second = queue.submit("a", [RECORD], ["checklist"], "txt")
+    other = queue.submit("b", [RECORD], ["checklist"], "txt")
+
+    # Первое задание клиента a выполняется: второе ждет, клиент b - нет
+    assert queue._claim()[0] == first
+    assert queue._claim()[0] == other
+    assert queue._claim() is None
+
+    assert queue.cancel(second, "b") is None
+    assert queue.cancel(second, "a").status == "cancelled"
+    assert stored_records(queue, second) == [] and stored_records(queue, other) == [0]
+    assert queue.cancel(first, "a").status == "cancelled"
+    assert queue.work_once() is False
+
+    queue.retention = -1
+    assert queue.purge() == 2
+    assert queue.status(first, "a") is None
+
+
+@pytest.mark.asyncio
+async def test_jobs_api(tmp_path, monkeypatch):
+    queue = make_queue(tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(main, "_job_queue", queue)
+    monkeypatch.setattr(main.settings, "rate_limit_api_key_header", "X-API-Key")
+    monkeypatch.setattr(main.settings, "rate_limit_api_keys", "company-key")
+    headers = {"X-API-Key": "company-key"}
+    async with AsyncClient(app=main.app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/jobs",
+            headers=headers,
+            json={"records": [RECORD, RECORD, "не запись"], "document_types": ["checklist"]},
+        )
+        assert response.status_code == 201
+        job = response.json()
+        assert (job["status"], job["total"], job["resultsCursor"]) == ("queued", 3, 0)
+
+        # Задание видно только по разрешенному ключу: адрес, подложный ключ
+        # или X-Tenant-ID не подходят
+        for other in ({}, {"X-API-Key": "forged"}, {"X-Tenant-ID": "company-key"}):
+            assert (await client.get(f"/api/jobs/{job['jobId']}", headers=other)).status_code == 404
+        assert queue.work_once() is True
+        status = (await client.get(f"/api/jobs/{job['jobId']}", headers=headers)).json()
+        assert (status["status"], status["completed"], status["failed"]) == ("completed", 2, 1)
+
+        response = await client.get(f"/api/jobs/{job['jobId']}/results?limit=2", headers=headers)
+        assert response.headers["X-Results-Cursor"] == "2"
+        assert zipfile.ZipFile(io.BytesIO(response.content)).namelist() == [
+            "0000/checklist.txt",
+            "0001/checklist.txt",
+        ]
+
+        response = await client.get(f"/api/jobs/{job['jobId']}/results?after=2", headers=headers)
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert response.headers["X-Results-Cursor"] == "3"
+        assert archive.namelist() == ["errors.txt"]
+        assert archive.read("errors.txt").decode("utf-8").startswith("2: ")
+
+        monkeypatch.setattr(main.settings, "jobs_max_records", 1)
+        response = await client.post(
+            "/api/jobs", headers=headers, json={"records": [RECORD, RECORD]}
+        )
+        assert response.status_code == 413
@@ -0,0 +1,49 @@
+import asyncio
+
+from app.main import limiter
+from benchmarks.load import (
+    client_for,
+    load_traffic,
+    parse_mix,
+    percentile,
+    run_load,
+    save_traffic,
+    synthetic_traffic,
+)
+
+
+def test_synthetic_traffic_roundtrip(tmp_path):
+    traffic = synthetic_traffic(
+        40, parse_mix("analyze=1,quick-check=1,generate-document=1,rules=1"), unique_plans=3
+    )
+    assert traffic == synthetic_traffic(
+        40, parse_mix("analyze=1,quick-check=1,generate-document=1,rules=1"), unique_plans=3
+    )
+    assert {request.endpoint for request in traffic} == {
+        "analyze",
+        "quick-check",
+        "generate-document",
+        "rules",
+    }
+
+    path = tmp_path / "traffic.ndjson"
+    save_traffic(path, traffic)
+    assert load_traffic(path) == traffic
+    assert percentile([1, 2, 3, 4], 50) == 2 and percentile([1, 2, 3, 4], 99) == 4
+
+
+def test_replay_in_process(monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    traffic = synthetic_traffic(
+        30, parse_mix("analyze=2,quick-check=1,generate-document=1,rules=1"), unique_plans=2
+    )
+
+    async def run():
+        async with client_for(None, 4, 30) as client:
+            return await run_load(client, traffic, concurrency=4, requests=60)
+
+    result = asyncio.run(run())
+    assert result["total"]["requests"] == 60
+    assert result["total"]["error_rate"] == 0
+    assert set(result["endpoints"]) == {"analyze", "quick-check", "generate-document", "rules"}
+    assert result["total"]["p50_ms"] <= result["total"]["p99_ms"]
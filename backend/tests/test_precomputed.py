@@ -0,0 +1,82 @@
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.precomputed import PrecomputedCache, _accepted_encodings, brotli
+
+
+def test_accepted_encodings():
+    assert _accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert _accepted_encodings("br;q=0, gzip;q=0.5") == {"gzip"}
+    assert _accepted_encodings("*") >= {"br", "gzip"}
+    assert _accepted_encodings("") == set()
+
+
+def test_cache_rebuilds_on_version_change():
+    cache = PrecomputedCache()
+    calls = []
+
+    def content():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    first = cache.get(1, "key", content)
+    assert cache.get(1, "key", content) is first
+    assert len(calls) == 1
+
+    second = cache.get(2, "key", content)
+    assert second is not first
+    assert second.body == b'{"value":2}'
+
+
+@pytest.mark.asyncio
+async def test_rules_compressed_variants_and_304():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        plain = await client.get("/api/rules", headers={"Accept-Encoding": "identity"})
+        assert plain.status_code == 200
+        assert "content-encoding" not in plain.headers
+        rules = plain.json()
+        assert "loadBearingWalls" in rules["rules"]
+
+        gzipped = await client.get("/api/rules", headers={"Accept-Encoding": "gzip"})
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert gzipped.headers["etag"] != plain.headers["etag"]
+        assert gzipped.json() == rules
+
+        if brotli is not None:
+            compressed = await client.get("/api/rules", headers={"Accept-Encoding": "gzip, br"})
+            assert compressed.headers["content-encoding"] == "br"
+            assert compressed.json() == rules
+
+        response = await client.get(
+            "/api/rules",
+            headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["etag"]},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == plain.headers["etag"]
+
+        # Тег другого варианта того же ответа тоже подтверждает актуальность
+        response = await client.get(
+            "/api/rules", headers={"If-None-Match": f'"other", W/{gzipped.headers["etag"]}'}
+        )
+        assert response.status_code == 304
+
+        response = await client.get("/api/rules", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_static_endpoints_serve_precomputed_json():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/rules/loadBearingWalls")
+        assert response.status_code == 200
+        assert "law" in response.json()
+        assert response.headers["vary"] == "Accept-Encoding"
+
+        response = await client.get("/api/examples")
+        assert len(response.json()["examples"]) == 3
+
+        response = await client.get("/api/document-types", headers={"Accept-Encoding": "identity"})
+        assert response.headers["content-type"] == "application/json"
+        assert [item["id"] for item in response.json()["document_types"]][0] == "application"
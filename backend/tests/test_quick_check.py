@@ -0,0 +1,98 @@
+import pytest
+from httpx import AsyncClient
+
+from app.analyzer import RenovationAnalyzer
+from app.main import app
+from app.quick_check import VerdictTable
+
+
+@pytest.fixture(scope="module")
+def table():
+    return VerdictTable(RenovationAnalyzer())
+
+
+def test_table_covers_all_actions(table):
+    assert len(table) > 100
+
+
+def test_verdict_ignores_empty_plan_ventilation(table):
+    """Проверка действия не включает общие требования к пустому плану"""
+    verdict = table.check({"type": "move_bathroom", "data": {}})
+    assert verdict["requiresApproval"] is True
+    assert verdict["mainWarning"].title == "Перенос/расширение санузла"
+
+    verdict = table.check({"type": "change_window", "data": {"changeSize": False}})
+    assert verdict == {
+        "action": "change_window",
+        "isLegal": True,
+        "requiresApproval": False,
+        "mainWarning": None,
+    }
+
+
+def test_verdict_by_wall_type(table):
+    verdict = table.check(
+        {"type": "remove_wall", "data": {"wallId": "w1", "wallType": "load_bearing"}}
+    )
+    assert verdict["mainWarning"].level == "critical"
+    assert (
+        table.check({"type": "remove_wall", "data": {"wallType": "non_load_bearing"}})[
+            "requiresApproval"
+        ]
+        is False
+    )
+
+
+def test_combine_rooms_with_gas(table):
+    verdict = table.check(
+        {
+            "type": "combine_rooms",
+            "data": {"room1Type": "kitchen", "room2Type": "living", "hasGas": True},
+        }
+    )
+    assert verdict["mainWarning"].title == "Объединение кухни с газом и комнаты"
+
+
+def test_values_outside_table_are_computed(table):
+    """Значения вне таблицы проверяются напрямую с тем же результатом"""
+    assert table.check({"type": "change_window", "data": {"changeSize": 1}}) == table.check(
+        {"type": "change_window", "data": {"changeSize": True}}
+    )
+    with pytest.raises(ValueError):
+        table.check({"type": "unknown_action"})
+    with pytest.raises(ValueError):
+        table.check({"type": "remove_wall", "data": {"wallType": "glass"}})
+
+
+@pytest.mark.asyncio
+async def test_quick_check_batch_endpoint():
+    actions = [
+        {"type": "remove_wall", "data": {"wallType": "load_bearing"}},
+        {"type": "move_kitchen", "data": {"hasGas": True}},
+        {"type": "change_window", "data": {}},
+    ]
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/quick-check/batch", json={"actions": actions})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["action"] for r in results] == ["remove_wall", "move_kitchen", "change_window"]
+        assert results[0]["mainWarning"]["level"] == "critical"
+        assert results[2]["mainWarning"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "action",
+    [
+        {"type": "remove_wall", "data": "load_bearing"},
+        {"type": "move_kitchen", "data": [True]},
+        {"type": ["remove_wall"]},
+        {"type": "combine_rooms", "data": {"hasGas": [True]}},
+    ],
+)
+async def test_quick_check_rejects_malformed_actions(action):
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/quick-check", json=action)
+        assert response.status_code == 400
+        response = await client.post("/api/quick-check/batch", json={"actions": [action]})
+        assert response.status_code == 400
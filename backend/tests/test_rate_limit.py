@@ -0,0 +1,146 @@
+import asyncio
+import multiprocessing
+import time
+import uuid
+from typing import List
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import STRATEGIES
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from starlette.requests import Request
+
+from app.config import settings
+from app.rate_limit import (
+    KeyedLimiter,
+    SharedMemoryStorage,
+    TokenBucketRateLimiter,
+    api_key_limit_cost,
+    api_key_limit_key,
+    client_identity,
+    rate_limit_key,
+)
+
+
+def hit_many(uri: str, strategy: str, count: int, results) -> None:
+    limiter = STRATEGIES[strategy](SharedMemoryStorage(uri))
+    item = parse("100/minute")
+    results.put(sum(limiter.hit(item, "127.0.0.1", "/api/analyze") for _ in range(count)))
+
+
+@pytest.mark.parametrize("strategy", ["fixed-window", "token-bucket"])
+def test_limit_shared_between_processes(tmp_path, strategy):
+    uri = f"shm://{tmp_path / 'limits.shm'}"
+    SharedMemoryStorage(uri)
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=hit_many, args=(uri, strategy, 60, results)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    allowed = sum(results.get(timeout=60) for _ in processes)
+    for process in processes:
+        process.join()
+    # Лимит общий: 100 запросов на все процессы, а не на каждый
+    assert allowed == 100
+
+
+def test_token_bucket_refill_and_eviction(tmp_path):
+    storage = SharedMemoryStorage(f"shm://{tmp_path / 'limits.shm'}?slots=32")
+    limiter = TokenBucketRateLimiter(storage)
+    item = parse("4/second")
+
+    assert [limiter.hit(item, "a") for _ in range(5)] == [True] * 4 + [False]
+    assert limiter.get_window_stats(item, "a").remaining == 0
+    time.sleep(0.3)
+    # За 0.3 с вернулся один жетон
+    assert limiter.get_window_stats(item, "a").remaining == 1
+    assert limiter.hit(item, "a") and not limiter.hit(item, "a")
+
+    # Ключей больше, чем слотов: вытесняются слоты с ранним истечением
+    for i in range(100):
+        assert storage.incr(f"key{i}", 60) == 1
+    assert storage.get("key99") == 1
+    assert storage.reset() == 32
+
+    with pytest.raises(NotImplementedError):
+        TokenBucketRateLimiter(MemoryStorage())
+
+
+def make_request(headers):
+    return Request(
+        {
+            "type": "http",
+            "client": ("10.0.0.1", 1234),
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        }
+    )
+
+
+def test_rate_limit_key(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_api_key_header", "X-API-Key")
+    monkeypatch.setattr(settings, "rate_limit_api_keys", "secret-1, secret-2")
+    # Лимит всегда по адресу, ключ не подменяет клиента
+    assert rate_limit_key(make_request({"X-API-Key": "secret-1"})) == "10.0.0.1"
+    first = api_key_limit_key(make_request({"X-API-Key": "secret-1"}))
+    assert first.startswith("key:") and "secret-1" not in first
+    assert first != api_key_limit_key(make_request({"X-API-Key": "secret-2"}))
+    assert client_identity(make_request({"X-API-Key": "secret-1"})) == first
+    # Неизвестный ключ не дает своего счетчика
+    assert api_key_limit_cost(make_request({"X-API-Key": "forged"})) == 0
+    assert client_identity(make_request({"X-API-Key": "forged"})) == "10.0.0.1"
+
+
+def limited_app() -> FastAPI:
+    limiter = KeyedLimiter(key_func=rate_limit_key)
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.get("/ping")
+    @limiter.limit("5/minute")
+    async def ping(request: Request):
+        return {"ok": True}
+
+    return app
+
+
+def statuses(app: FastAPI, requests) -> List[int]:
+    """Коды ответов на запросы (адрес клиента, ключ API)"""
+
+    async def run():
+        codes = []
+        for address, api_key in requests:
+            transport = httpx.ASGITransport(app=app, client=(address, 1234))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                headers = {"X-API-Key": api_key} if api_key else {}
+                codes.append((await client.get("/ping", headers=headers)).status_code)
+        return codes
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("configured", [False, True])
+def test_rotating_api_keys_hit_address_limit(monkeypatch, configured):
+    if configured:
+        monkeypatch.setattr(settings, "rate_limit_api_key_header", "X-API-Key")
+        monkeypatch.setattr(settings, "rate_limit_api_keys", "secret")
+    codes = statuses(limited_app(), [("10.0.0.1", uuid.uuid4().hex) for _ in range(10)])
+    assert codes == [200] * 5 + [429] * 5
+
+
+def test_allowed_key_has_own_limit_across_addresses(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_api_key_header", "X-API-Key")
+    monkeypatch.setattr(settings, "rate_limit_api_keys", "secret")
+    app = limited_app()
+    # Один ключ с разных адресов: общий лимит ключа
+    assert statuses(app, [(f"10.0.1.{i}", "secret") for i in range(6)]) == [200] * 5 + [429]
+    # Лимит адреса действует и для запросов с ключом
+    assert statuses(limited_app(), [("10.0.2.1", None)] * 5 + [("10.0.2.1", "secret")]) == [
+        200
+    ] * 5 + [429]
@@ -0,0 +1,131 @@
+import io
+import stat
+import zipfile
+
+import docx
+import pytest
+from httpx import AsyncClient
+
+from app import main
+from app.rendering import DocumentRenderer, RenderCache, iter_file
+from tests.test_bundle import DOCUMENT_DATA
+
+TEXT = (
+    "                ЗАЯВЛЕНИЕ\n\nПрошу согласовать перепланировку {кв. 10}\n"
+    + "Строка документа\n" * 120
+)
+
+
+def cached_files(directory):
+    return sorted(path.name for path in directory.iterdir() if not path.name.startswith("."))
+
+
+def test_render_cache_eviction(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=250)
+    assert cache.open("a.pdf") is None
+
+    for name in ("a.pdf", "b.pdf"):
+        with cache.put(name, b"x" * 100):
+            pass
+    with cache.open("a.pdf") as file:
+        assert file.read() == b"x" * 100
+
+    # Вытесняется давно не использованный b.pdf
+    with cache.put("c.pdf", b"y" * 100):
+        pass
+    assert cached_files(tmp_path) == ["a.pdf", "c.pdf"]
+    stats = cache.stats()
+    assert (stats["files"], stats["bytes"], stats["hits"], stats["misses"], stats["evictions"]) == (
+        2,
+        200,
+        1,
+        1,
+        1,
+    )
+
+    # Размер считается по каталогу: лимит общий для всех процессов
+    other = RenderCache(tmp_path, max_bytes=250)
+    assert other.stats()["bytes"] == 200
+    with other.put("d.pdf", b"z" * 100):
+        pass
+    assert cached_files(tmp_path) == ["c.pdf", "d.pdf"]
+
+
+def test_render_cache_directory_is_private(tmp_path):
+    directory = tmp_path / "cache"
+    cache = RenderCache(directory, max_bytes=1000)
+    # Каталог создается при первом обращении
+    assert not directory.exists()
+    assert cache.open("a.pdf") is None
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+
+    directory.chmod(0o755)
+    assert RenderCache(directory, max_bytes=1000).open("a.pdf") is None
+    assert stat.S_IMODE(directory.stat().st_mode) == 0o700
+
+    # Каталог, открытый другим на запись, не используется
+    directory.chmod(0o777)
+    with pytest.raises(PermissionError):
+        RenderCache(directory, max_bytes=1000).open("a.pdf")
+
+
+def test_pdf_and_docx_rendered_once(tmp_path):
+    renderer = DocumentRenderer(RenderCache(tmp_path, max_bytes=10 * 1024 * 1024))
+    assert renderer.available("pdf") and renderer.available("docx")
+
+    pdf = b"".join(iter_file(renderer.open(TEXT, "pdf")))
+    assert pdf.startswith(b"%PDF")
+
+    with renderer.open(TEXT, "docx") as file:
+        document = docx.Document(file)
+    assert [paragraph.text for paragraph in document.paragraphs][:3] == TEXT.split("\n")[:3]
+
+    assert b"".join(iter_file(renderer.open(TEXT, "pdf"))) == pdf
+    assert renderer.cache.stats()["hits"] == 1
+    assert len(cached_files(tmp_path)) == 2
+    with renderer.open(TEXT + "!", "pdf") as file:
+        assert file.read() != pdf
+
+
+@pytest.mark.asyncio
+async def test_rendered_documents_api(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        main,
+        "_document_renderer",
+        DocumentRenderer(RenderCache(tmp_path, max_bytes=10 * 1024 * 1024)),
+    )
+    async with AsyncClient(app=main.app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/generate-document",
+            json={**DOCUMENT_DATA, "document_type": "checklist", "format": "pdf"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert 'filename="checklist.pdf"' in response.headers["content-disposition"]
+        assert response.content.startswith(b"%PDF")
+
+        response = await client.post(
+            "/api/generate-document/bundle",
+            json={
+                **DOCUMENT_DATA,
+                "document_types": ["checklist", "completion_act"],
+                "format": "docx",
+            },
+        )
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert sorted(archive.namelist()) == ["checklist.docx", "completion_act.docx"]
+        act = docx.Document(io.BytesIO(archive.read("completion_act.docx")))
+        assert any("15.06.2025" in paragraph.text for paragraph in act.paragraphs)
+
+        stats = (await client.get("/api/render-cache/stats")).json()
+        assert stats["files"] == 3 and stats["formats"] == {"pdf": True, "docx": True}
+
+    monkeypatch.setattr(
+        main, "_document_renderer", DocumentRenderer(font_path=str(tmp_path / "missing.ttf"))
+    )
+    async with AsyncClient(app=main.app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/generate-document",
+            json={**DOCUMENT_DATA, "document_type": "checklist", "format": "pdf"},
+        )
+        assert response.status_code == 501
@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+
+import pytest
+from httpx import AsyncClient
+
+from app.analyzer import RenovationAnalyzer
+from app.main import app
+from app.models import PlanDelta, RenovationPlan
+from app.quick_check import VerdictTable
+from app.rules_store import RULES_PATH, RulesStore
+from app.sessions import AnalysisSession
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "renovation_rules.json"
+    shutil.copy(RULES_PATH, path)
+    return path
+
+
+def rewrite(path, update):
+    """Изменение правил с гарантированной сменой подписи файла"""
+    rules = json.loads(path.read_text(encoding="utf-8"))
+    update(rules)
+    stat = path.stat()
+    path.write_text(json.dumps(rules, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def rename_load_bearing_law(rules):
+    rules["rules"]["loadBearingWalls"]["law"] = "Новая редакция"
+
+
+def test_reload_after_check_interval(rules_file):
+    clock = FakeClock()
+    store = RulesStore(rules_file, check_interval=5, clock=clock)
+    first = store.snapshot()
+    assert first.version == 1
+
+    rewrite(rules_file, rename_load_bearing_law)
+    assert store.snapshot() is first  # интервал проверки еще не прошел
+
+    clock.now = 5
+    second = store.snapshot()
+    assert second.version == 2
+    assert second.data["rules"]["loadBearingWalls"]["law"] == "Новая редакция"
+    # Старый снимок не меняется
+    assert first.data["rules"]["loadBearingWalls"]["law"] != "Новая редакция"
+
+    clock.now = 10
+    assert store.snapshot() is second  # файл не менялся
+
+
+def test_broken_file_keeps_previous_snapshot(rules_file):
+    clock = FakeClock()
+    store = RulesStore(rules_file, check_interval=0, clock=clock)
+    first = store.snapshot()
+
+    stat = rules_file.stat()
+    rules_file.write_text("{broken", encoding="utf-8")
+    os.utime(rules_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert store.snapshot() is first
+    assert store.stats()["failedReloads"] == 1
+
+    # После исправления файл разбирается снова
+    shutil.copy(RULES_PATH, rules_file)
+    os.utime(rules_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    assert store.snapshot().version == 2
+
+
+def make_plan():
+    return RenovationPlan.model_validate(
+        {
+            "originalPlan": {
+                "walls": [
+                    {"id": "wall1", "type": "load_bearing", "x1": 0, "y1": 0, "x2": 3000, "y2": 0}
+                ],
+                "doors": [],
+                "windows": [],
+                "rooms": [],
+            },
+            "actions": [{"type": "remove_wall", "data": {"wallId": "wall1"}}],
+        }
+    )
+
+
+def test_analysis_pins_one_snapshot(rules_file):
+    """Внутри зафиксированного блока изменения файла не видны"""
+    store = RulesStore(rules_file, check_interval=0)
+    analyzer = RenovationAnalyzer(store)
+
+    with analyzer.pinned_rules() as snapshot:
+        rewrite(rules_file, rename_load_bearing_law)
+        result = analyzer.analyze(make_plan())
+        assert analyzer.rules_snapshot() is snapshot
+    assert result.warnings[0].law != "Новая редакция"
+
+    assert analyzer.analyze(make_plan()).warnings[0].law == "Новая редакция"
+
+
+def test_verdict_table_and_session_follow_reload(rules_file):
+    store = RulesStore(rules_file, check_interval=0)
+    analyzer = RenovationAnalyzer(store)
+    table = VerdictTable(analyzer)
+    session = AnalysisSession(analyzer, make_plan())
+    action = {"type": "remove_wall", "data": {"wallType": "load_bearing"}}
+    assert table.check(action)["mainWarning"].law != "Новая редакция"
+
+    rewrite(rules_file, rename_load_bearing_law)
+    assert table.check(action)["mainWarning"].law == "Новая редакция"
+    assert session.result().warnings[0].law == "Новая редакция"
+
+    result = session.apply(
+        PlanDelta(target="room", op="add", room={"id": "r1", "type": "living", "area": 20})
+    )
+    assert result.warnings[0].law == "Новая редакция"
+
+
+@pytest.mark.asyncio
+async def test_rules_endpoints_use_store():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/rules")
+        assert response.status_code == 200
+        assert "loadBearingWalls" in response.json()["rules"]
+
+        response = await client.get("/api/rules/loadBearingWalls")
+        assert response.status_code == 200
+        assert "law" in response.json()
+
+        response = await client.get("/api/rules/unknown")
+        assert response.status_code == 404
@@ -0,0 +1,82 @@
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from app.config import Settings
+from app.server import configure_for_workers, current_rss
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url: str, timeout: float = 10) -> int:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def test_configure_for_workers(monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_STORAGE_URI", raising=False)
+    monkeypatch.delenv("BATCH_WORKERS", raising=False)
+    config = Settings(_env_file=None)
+    configure_for_workers(config, 4)
+    assert config.rate_limit_storage_uri == "shm://"
+    assert config.batch_workers == max(1, (os.cpu_count() or 1) // 4)
+
+    # Явно заданные значения не меняются
+    config = Settings(_env_file=None, rate_limit_storage_uri="memory://", batch_workers=2)
+    configure_for_workers(config, 4)
+    assert (config.rate_limit_storage_uri, config.batch_workers) == ("memory://", 2)
+    assert current_rss() > 0
+
+
+def test_workers_are_recycled_and_stopped(tmp_path):
+    port = free_port()
+    env = {
+        **os.environ,
+        "API_HOST": "127.0.0.1",
+        "API_PORT": str(port),
+        "SERVER_WORKERS": "2",
+        "SERVER_MAX_REQUESTS": "2",
+        "RATE_LIMIT_STORAGE_URI": f"shm://{tmp_path / 'limits.shm'}",
+        "JOBS_DB_PATH": str(tmp_path / "jobs.sqlite3"),
+        "RENDER_CACHE_DIR": str(tmp_path / "render"),
+    }
+    log_path = tmp_path / "server.log"
+    with open(log_path, "wb") as log:
+        master = subprocess.Popen(
+            [sys.executable, "-m", "app.server"], cwd=BACKEND_DIR, env=env, stdout=log, stderr=log
+        )
+    try:
+        # Каждый процесс обслуживает 2 запроса: 10 запросов - не меньше трех замен
+        for _ in range(10):
+            assert get(f"http://127.0.0.1:{port}/api/executor/stats") == 200
+            # Лимит запросов проверяется сервером раз в 0.1 с
+            time.sleep(0.2)
+        master.send_signal(signal.SIGTERM)
+        assert master.wait(timeout=30) == 0
+    finally:
+        if master.poll() is None:
+            master.kill()
+
+    log = log_path.read_text(encoding="utf-8")
+    assert log.count("Application preloaded") == 1
+    assert len(re.findall(r"Worker \d+ started", log)) >= 5
+    assert "Server stopped" in log
@@ -0,0 +1,156 @@
+import random
+
+import pytest
+from httpx import AsyncClient
+
+from app.analyzer import RenovationAnalyzer
+from app.main import app
+from app.models import PlanDelta, RenovationPlan, Room
+from app.sessions import AnalysisSession
+
+ROOM_TYPES = ["living", "kitchen", "bathroom", "toilet", "corridor", "balcony", "storage"]
+ACTION_TYPES = ["remove_wall", "move_kitchen", "move_bathroom", "combine_rooms", "change_window"]
+
+
+@pytest.fixture
+def analyzer():
+    return RenovationAnalyzer()
+
+
+def make_plan():
+    """План с несколькими стенами, помещениями и действиями"""
+    return RenovationPlan.model_validate(
+        {
+            "originalPlan": {
+                "walls": [
+                    {"id": "w1", "type": "load_bearing", "x1": 0, "y1": 0, "x2": 3000, "y2": 0},
+                    {"id": "w2", "type": "non_load_bearing", "x1": 0, "y1": 0, "x2": 0, "y2": 3000},
+                ],
+                "doors": [],
+                "windows": [],
+                "rooms": [
+                    {"id": "r1", "type": "living", "area": 8, "hasNaturalLight": False},
+                    {"id": "r2", "type": "kitchen", "area": 7},
+                    {"id": "r3", "type": "bathroom", "area": 4, "hasVentilation": False},
+                ],
+                "hasGasSupply": True,
+            },
+            "actions": [
+                {"type": "remove_wall", "data": {"wallId": "w1"}},
+                {"type": "combine_rooms", "data": {"room1Type": "kitchen", "room2Type": "living"}},
+            ],
+        }
+    )
+
+
+def random_action(rng):
+    return {
+        "type": rng.choice(ACTION_TYPES),
+        "data": {
+            "wallId": rng.choice(["w1", "w2", "missing"]),
+            "room1Type": rng.choice(ROOM_TYPES),
+            "room2Type": rng.choice(ROOM_TYPES),
+            "changeSize": rng.random() < 0.5,
+        },
+    }
+
+
+def random_room(rng, room_id):
+    return Room(
+        id=room_id,
+        type=rng.choice(ROOM_TYPES),
+        area=rng.choice([6, 8.5, 9, 14]),
+        hasVentilation=rng.random() < 0.5,
+        hasNaturalLight=rng.random() < 0.5,
+    )
+
+
+def test_session_matches_full_analysis(analyzer):
+    """Инкрементальный результат совпадает с полным анализом после каждого изменения"""
+    rng = random.Random(42)
+    session = AnalysisSession(analyzer, make_plan())
+    assert session.result() == analyzer.analyze(make_plan())
+
+    next_room = 10
+    for _ in range(300):
+        plan = session.current_plan()
+        room_ids = [room.id for room in plan.originalPlan.rooms]
+        if rng.random() < 0.5:
+            op = rng.choice(["add", "remove", "update"] if plan.actions else ["add"])
+            index = (
+                rng.randint(0, len(plan.actions))
+                if op == "add"
+                else rng.randrange(len(plan.actions))
+            )
+            delta = PlanDelta(
+                target="action",
+                op=op,
+                index=index,
+                action=None if op == "remove" else random_action(rng),
+            )
+        else:
+            op = rng.choice(["add", "remove", "update"] if room_ids else ["add"])
+            if op == "add":
+                next_room += 1
+                delta = PlanDelta(target="room", op=op, room=random_room(rng, f"r{next_room}"))
+            elif op == "remove":
+                delta = PlanDelta(target="room", op=op, roomId=rng.choice(room_ids))
+            else:
+                delta = PlanDelta(target="room", op=op, room=random_room(rng, rng.choice(room_ids)))
+
+        result = session.apply(delta)
+        assert result == analyzer.analyze(session.current_plan())
+
+
+def test_session_rejects_invalid_delta(analyzer):
+    """Некорректные изменения отклоняются без изменения состояния"""
+    session = AnalysisSession(analyzer, make_plan())
+    with pytest.raises(ValueError):
+        session.apply(PlanDelta(target="action", op="remove", index=5))
+    with pytest.raises(ValueError):
+        session.apply(PlanDelta(target="room", op="remove", roomId="missing"))
+    assert session.version == 0
+
+
+def test_session_update_renames_room(analyzer):
+    """Обновление с roomId заменяет помещение, даже если новое значение меняет id"""
+    session = AnalysisSession(analyzer, make_plan())
+    room = Room(id="r9", type="bathroom", area=4, hasVentilation=True)
+
+    result = session.apply(PlanDelta(target="room", op="update", roomId="r3", room=room))
+
+    rooms = session.current_plan().originalPlan.rooms
+    assert [room.id for room in rooms] == ["r1", "r2", "r9"]
+    assert result == analyzer.analyze(session.current_plan())
+
+    with pytest.raises(ValueError):
+        session.apply(PlanDelta(target="room", op="update", roomId="r1", room=room))
+    assert session.version == 1
+
+
+@pytest.mark.asyncio
+async def test_session_endpoints():
+    """Создание сессии, применение изменения и удаление"""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/sessions", json=make_plan().model_dump(mode="json"))
+        assert response.status_code == 200
+        data = response.json()
+        session_id = data["sessionId"]
+        assert data["version"] == 0
+
+        response = await client.post(
+            f"/api/sessions/{session_id}/delta",
+            json={"target": "action", "op": "remove", "index": 0},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["version"] == 1
+        assert all(w["title"] != "Несущие стены" for w in data["result"]["warnings"])
+
+        response = await client.delete(f"/api/sessions/{session_id}")
+        assert response.status_code == 200
+        response = await client.post(
+            f"/api/sessions/{session_id}/delta",
+            json={"target": "room", "op": "remove", "roomId": "r1"},
+        )
+        assert response.status_code == 404
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.batch import BatchAnalyzer
+from app.main import app
+from app.streaming import LineTooLongError, iter_lines
+
+
+def make_plan(wall_type):
+    return {
+        "originalPlan": {
+            "walls": [{"id": "w1", "type": wall_type, "x1": 0, "y1": 0, "x2": 3000, "y2": 0}],
+            "doors": [],
+            "windows": [],
+            "rooms": [],
+        },
+        "actions": [{"type": "remove_wall", "data": {"wallId": "w1"}}],
+    }
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_across_chunks():
+    data = b'{"a": 1}\n\n{"b": 2}\r\n{"c": 3}'
+    lines = [line async for line in iter_lines(chunked(data, 3), max_line_bytes=100)]
+    assert lines == [b'{"a": 1}', b'{"b": 2}\r', b'{"c": 3}']
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_rejects_long_line():
+    with pytest.raises(LineTooLongError):
+        async for _ in iter_lines(chunked(b"x" * 50, 10), max_line_bytes=20):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_analyze_stream_order_and_errors():
+    """Результаты идут в порядке строк, ошибки остаются в своих элементах"""
+    lines = [
+        json.dumps(make_plan("load_bearing" if i % 2 else "non_load_bearing")).encode()
+        for i in range(23)
+    ]
+    lines[5] = b"{not json"
+
+    async def source():
+        for line in lines:
+            yield line
+
+    batch = BatchAnalyzer(workers=2, chunk_size=50)
+    try:
+        items = [
+            item async for item in batch.analyze_stream(source(), max_in_flight=2, chunk_size=4)
+        ]
+    finally:
+        batch.shutdown()
+
+    assert [item.index for item in items] == list(range(23))
+    assert items[5].errors and items[5].result is None
+    assert items[1].result.warnings[0].level == "critical"
+    assert items[2].result.warnings[0].level == "low"
+
+
+@pytest.mark.asyncio
+async def test_analyze_stream_endpoint():
+    body = b"\n".join(
+        json.dumps(make_plan(t)).encode() for t in ["load_bearing", "unknown", "non_load_bearing"]
+    )
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/analyze/stream",
+            content=chunked(body, 64),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        items = [json.loads(line) for line in response.text.splitlines()]
+        assert [item["index"] for item in items] == [0, 1, 2]
+        assert [item["result"]["warnings"][0]["level"] for item in items] == [
+            "critical",
+            "high",
+            "low",
+        ]
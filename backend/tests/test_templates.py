@@ -0,0 +1,132 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.document_generator import DocumentGenerator
+from app.models import AnalysisResult, FloorPlan, RiskLevel, Warning
+from app.templates import TEMPLATES_DIR, DocumentTemplate, TemplateError, load_templates
+
+APARTMENT = {"address": "г. Москва, ул. Тестовая, д. 1", "apartment_number": "10"}
+OWNER = {"full_name": "Иванов Иван Иванович", "phone": "+7 (999) 123-45-67"}
+
+
+def test_template_renders_segments():
+    template = DocumentTemplate(
+        "doc", "Адрес: {address}, кв. {number}. {{скобки}} {address}", {"address", "number"}
+    )
+
+    assert template.used_fields == {"address", "number"}
+    assert template.render(address="Москва", number=10) == "Адрес: Москва, кв. 10. {скобки} Москва"
+    # Шаблон может не использовать часть доступных полей
+    assert DocumentTemplate("doc", "Без полей", {"address"}).render(address="Москва") == "Без полей"
+
+
+def test_bind_makes_template_static():
+    template = DocumentTemplate("doc", "Дата: {date}, {name}", {"date", "name"})
+    dated = template.bind(date="01.01.2025")
+
+    assert dated.fields == {"name"}
+    assert dated.render(name="Иванов") == "Дата: 01.01.2025, Иванов"
+    assert not dated.is_static
+    assert dated.bind(name="Петров").is_static
+    assert dated.bind(name="Петров").render() == "Дата: 01.01.2025, Петров"
+
+
+@pytest.mark.parametrize(
+    "source",
+    ["{unknown}", "{address!r}", "{address:>10}", "{apartment.number}", "{class}", "{address", "}"],
+)
+def test_invalid_templates_rejected(source):
+    with pytest.raises(TemplateError):
+        DocumentTemplate("doc", source, {"address"})
+
+
+def test_templates_loaded_from_directory(tmp_path):
+    directory = Path(shutil.copytree(TEMPLATES_DIR, tmp_path / "templates"))
+    (directory / "bti_application.txt").write_text(
+        "Заявление от {owner_name}, {current_date}\n", encoding="utf-8"
+    )
+
+    generator = DocumentGenerator(directory)
+    assert (
+        generator.generate_bti_application(APARTMENT, OWNER)
+        == f"Заявление от {OWNER['full_name']}, {generator.current_date}"
+    )
+
+    (directory / "checklist.txt").write_text("{owner_name}", encoding="utf-8")
+    with pytest.raises(TemplateError, match="checklist"):
+        DocumentGenerator(directory)
+    with pytest.raises(TemplateError, match="не загружен"):
+        load_templates({"missing": frozenset()}, directory)
+
+
+def test_default_documents():
+    generator = DocumentGenerator()
+    assert generator.templates["checklist"].is_static
+    assert generator.generate_document_checklist() is generator.generate_document_checklist()
+
+    warning = Warning(
+        level=RiskLevel.CRITICAL,
+        title="Демонтаж несущей стены",
+        description="Запрещено",
+        law="ЖК РФ ст. 26",
+        recommendations=["Сохранить стену"],
+        actionRequired=True,
+    )
+    analysis = AnalysisResult(
+        isLegal=False, requiresApproval=True, warnings=[warning], recommendations=[]
+    )
+    plan = FloorPlan(walls=[], doors=[], windows=[], rooms=[])
+
+    conclusion = generator.generate_technical_conclusion(APARTMENT, plan, analysis)
+    assert "1. Демонтаж несущей стены. Запрещено" in conclusion
+    assert "Законодательная база: ЖК РФ ст. 26" in conclusion
+    assert "НЕ МОЖЕТ БЫТЬ СОГЛАСОВАНА" in conclusion
+    assert conclusion.count(generator.current_date) == 2
+    assert "{" not in conclusion
+
+    act = generator.generate_completion_act(APARTMENT, OWNER, "15.06.2025")
+    assert "15.06.2025" in act and f"кв. {APARTMENT['apartment_number']}" in act
+
+
+def test_sections_reused_after_header_edit():
+    generator = DocumentGenerator()
+    plan = FloorPlan.model_validate(
+        {
+            "walls": [{"id": "w1", "type": "load_bearing", "x1": 0, "y1": 0, "x2": 3000, "y2": 0}],
+            "doors": [],
+            "windows": [],
+            "rooms": [],
+            "hasGasSupply": True,
+        }
+    )
+    warning = Warning(
+        level=RiskLevel.HIGH,
+        title="Перенос кухни",
+        description="Требует согласования",
+        law="СанПиН",
+        recommendations=["Получить проект"],
+        actionRequired=True,
+    )
+    analysis = AnalysisResult(
+        isLegal=True, requiresApproval=True, warnings=[warning], recommendations=[]
+    )
+
+    first = generator.generate_technical_conclusion(APARTMENT, plan, analysis)
+    assert (generator.sections.hits, generator.sections.misses) == (0, 2)
+
+    edited = generator.generate_technical_conclusion(
+        dict(APARTMENT, apartment_number="11"), plan, analysis
+    )
+    assert (generator.sections.hits, generator.sections.misses) == (2, 2)
+    assert edited == first.replace("кв. 10", "кв. 11")
+
+    # Изменение входных данных раздела пересобирает только его
+    changed = analysis.model_copy(
+        update={"warnings": [warning.model_copy(update={"description": "Нужен проект"})]}
+    )
+    conclusion = generator.generate_technical_conclusion(APARTMENT, plan, changed)
+    assert (generator.sections.hits, generator.sections.misses) == (3, 3)
+    assert "1. Перенос кухни. Нужен проект" in conclusion
+    assert "Количество несущих стен: 1" in conclusion
@@ -24,7 +24,7 @@ function getResourcePath(relativePath) {
 function startBackend() {
   return new Promise((resolve, reject) => {
     const backendPath = getResourcePath('backend');
-    const pythonScript = path.join(backendPath, 'app', 'main.py');
+    const pythonScript = path.join(backendPath, 'app', 'desktop.py');
 
     console.log('Starting backend from:', backendPath);
     console.log('Python script:', pythonScript);
@@ -87,31 +87,52 @@ function startBackend() {
   });
 }
 
+// Строка, которую backend печатает на stdout, когда готов принимать запросы
+const BACKEND_READY_PREFIX = 'RENOVATION_BACKEND_READY';
+// Запасной таймаут, если строка готовности не пришла
+const BACKEND_READY_TIMEOUT = 30000;
+
 function launchBackend(pythonCmd, backendPath, resolve, reject) {
-  // Запуск uvicorn сервера
-  const uvicornArgs = [
-    '-m', 'uvicorn',
-    'app.main:app',
+  // Быстрый запуск для настольного приложения (app/desktop.py)
+  const backendArgs = [
+    '-m', 'app.desktop',
     '--host', '127.0.0.1',
-    '--port', String(backendPort),
-    '--log-level', 'info'
+    '--port', String(backendPort)
   ];
 
-  backendProcess = spawn(pythonCmd, uvicornArgs, {
+  backendProcess = spawn(pythonCmd, backendArgs, {
     cwd: backendPath,
     shell: true,
-    env: { ...process.env }
+    // Данные backend (очередь заданий, кэш документов) - в профиле пользователя:
+    // каталог установки может быть только для чтения
+    env: { ...process.env, APP_DATA_DIR: app.getPath('userData'), PYTHONUNBUFFERED: '1' }
   });
 
-  backendProcess.stdout.on('data', (data) => {
-    const message = data.toString();
-    console.log('Backend:', message);
-
-    // Проверяем, запустился ли сервер
-    if (message.includes('Uvicorn running') || message.includes('Application startup complete')) {
-      console.log('Backend started successfully');
+  let started = false;
+  let stdoutBuffer = '';
+  const readyTimer = setTimeout(() => {
+    if (!started) {
+      console.warn('Backend readiness line not received, continuing');
+      started = true;
       resolve();
     }
+  }, BACKEND_READY_TIMEOUT);
+
+  backendProcess.stdout.on('data', (data) => {
+    stdoutBuffer += data.toString();
+    const lines = stdoutBuffer.split('\n');
+    stdoutBuffer = lines.pop();
+
+    for (const line of lines) {
+      console.log('Backend:', line);
+      // Сервер слушает порт и завершил запуск
+      if (!started && line.startsWith(BACKEND_READY_PREFIX)) {
+        console.log('Backend started successfully:', line.slice(BACKEND_READY_PREFIX.length).trim());
+        started = true;
+        clearTimeout(readyTimer);
+        resolve();
+      }
+    }
   });
 
   backendProcess.stderr.on('data', (data) => {
@@ -120,17 +141,17 @@ function launchBackend(pythonCmd, backendPath, resolve, reject) {
 
   backendProcess.on('error', (err) => {
     console.error('Failed to start backend:', err);
+    clearTimeout(readyTimer);
     reject(err);
   });
 
   backendProcess.on('close', (code) => {
     console.log('Backend process exited with code', code);
+    if (!started) {
+      clearTimeout(readyTimer);
+      reject(new Error(`Backend exited with code ${code} before it was ready`));
+    }
   });
-
-  // Даем серверу время на запуск
-  setTimeout(() => {
-    resolve();
-  }, 3000);
 }
 
 // Создание главного окна